@@ -0,0 +1,156 @@
+"""
+Autenticação JWT sem consulta ao banco por requisição.
+
+O usuário do token é resolvido a partir de um snapshot compacto (id,
+is_active, currency e token_version) guardado em dois níveis: um LRU
+limitado no processo, com validade curta, e o cache do Django. Salvar ou
+excluir o usuário descarta o snapshot; outros processos enxergam a mudança
+em até AUTH_USER_CACHE_LOCAL_TIMEOUT segundos.
+
+Os tokens levam a claim `token_version`; trocar a senha incrementa a versão
+do usuário e revoga os tokens emitidos antes da troca.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db import transaction as db_transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import AuthenticatedUser, User
+
+SNAPSHOT_KEY = 'auth-user:{user_id}'
+SNAPSHOT_FIELDS = ['id', 'is_active', 'currency', 'token_version']
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class LRUCache:
+    """Cache em memória com número máximo de entradas e validade por entrada"""
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_snapshots = LRUCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    timeout=getattr(settings, 'AUTH_USER_CACHE_LOCAL_TIMEOUT', 5)
+)
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def get_snapshot(user_id):
+    """Snapshot do usuário ou None se ele não existir"""
+    key = SNAPSHOT_KEY.format(user_id=user_id)
+    snapshot = local_snapshots.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    cache = get_cache()
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = User.objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+    local_snapshots.set(key, snapshot)
+    return snapshot
+
+
+def forget(user_id):
+    """
+    Descarta o snapshot do usuário. Repete após o commit para descartar
+    snapshots lidos por requisições concorrentes antes da escrita.
+    """
+    key = SNAPSHOT_KEY.format(user_id=user_id)
+
+    def delete():
+        local_snapshots.delete(key)
+        get_cache().delete(key)
+
+    delete()
+    db_transaction.on_commit(delete)
+
+
+def snapshot_user(snapshot):
+    """Instância de usuário com os campos do snapshot; os demais são adiados"""
+    return AuthenticatedUser.from_db(
+        DEFAULT_DB_ALIAS,
+        SNAPSHOT_FIELDS,
+        [snapshot[field] for field in SNAPSHOT_FIELDS]
+    )
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token com a versão dos tokens do usuário (copiada para o access token)"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que resolve o usuário pelo snapshot em cache em vez
+    de buscar a linha de accounts.User a cada requisição.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        snapshot = get_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not snapshot['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Tokens sem a claim foram emitidos antes da primeira troca de senha
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != snapshot['token_version']:
+            raise AuthenticationFailed('Token revogado pela troca de senha', code='token_revoked')
+
+        return snapshot_user(snapshot)
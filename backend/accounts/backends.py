@@ -0,0 +1,29 @@
+"""
+Backend de autenticação por email: uma consulta ao usuário e a verificação
+da senha.
+"""
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+class EmailBackend(ModelBackend):
+    """
+    Autentica pelo email (`email=` ou `username=`, como no admin).
+    Herda de ModelBackend as permissões e a checagem de `is_active`.
+    """
+
+    def authenticate(self, request, email=None, password=None, username=None, **kwargs):
+        email = email or username
+        if not isinstance(email, str) or not email or password is None:
+            return None
+        try:
+            user = User._default_manager.get(email=User.objects.normalize_email(email.strip()))
+        except User.DoesNotExist:
+            # Roda o hasher mesmo sem usuário para não revelar pelo tempo
+            # de resposta se o email existe
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .hasher_policies import POLICIES
+from .hashers import missing_library
+
+
+@register()
+def check_password_hasher_policy(app_configs, **kwargs):
+    """A política de hash precisa existir e ter a biblioteca instalada"""
+    policy = settings.PASSWORD_HASHER_POLICY
+    if policy not in POLICIES:
+        return [Error(
+            f'PASSWORD_HASHER_POLICY inválida: {policy}',
+            hint=f"Use: {', '.join(POLICIES)}",
+            id='accounts.E001',
+        )]
+    message = missing_library(policy)
+    if message:
+        return [Error(
+            message,
+            hint=f'Instale a biblioteca do hasher ou troque PASSWORD_HASHER_POLICY ({policy})',
+            id='accounts.E002',
+        )]
+    return []
@@ -0,0 +1,24 @@
+"""
+Políticas de hash de senha: nome da política -> hasher (accounts/hashers.py).
+
+Módulo sem dependências do Django, importado por settings.py para montar
+PASSWORD_HASHERS; é a única tabela das políticas.
+"""
+POLICIES = {
+    'pbkdf2': 'accounts.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'accounts.hashers.ScryptPasswordHasher',
+    'argon2': 'accounts.hashers.Argon2PasswordHasher',
+    'bcrypt': 'accounts.hashers.BCryptSHA256PasswordHasher',
+}
+# Só verificam hashes antigos, regravados no próximo login
+LEGACY_HASHERS = ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+
+def policy_hashers(policy):
+    """
+    Valor de PASSWORD_HASHERS para a política: o hasher dela gera os hashes
+    novos e os demais só verificam hashes antigos. Uma política desconhecida
+    mantém a ordem da tabela (o check accounts.E001 aponta o erro).
+    """
+    current = POLICIES.get(policy)
+    return sorted(POLICIES.values(), key=lambda path: path != current) + LEGACY_HASHERS
@@ -0,0 +1,61 @@
+"""
+Hashers de senha com custo definido nas configurações.
+
+Cada hasher mantém o nome do algoritmo do Django, então hashes já gravados
+continuam válidos. A tabela das políticas fica em accounts/hasher_policies.py.
+O custo vem de PASSWORD_HASHER_OPTIONS[<política>]; quando a política ou o
+custo mudam, `must_update` passa a indicar o hash antigo e `check_password`
+o regrava no próximo login bem-sucedido.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.module_loading import import_string
+
+from .hasher_policies import POLICIES
+
+
+def hasher_option(policy, name, default):
+    """Parâmetro de custo lido das configurações a cada uso"""
+    def getter(self):
+        options = getattr(settings, 'PASSWORD_HASHER_OPTIONS', {}).get(policy, {})
+        return options.get(name, default)
+    return property(getter)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    policy = 'pbkdf2'
+    iterations = hasher_option(policy, 'iterations', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Requer o pacote argon2-cffi"""
+    policy = 'argon2'
+    time_cost = hasher_option(policy, 'time_cost', hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = hasher_option(policy, 'memory_cost', hashers.Argon2PasswordHasher.memory_cost)
+    parallelism = hasher_option(policy, 'parallelism', hashers.Argon2PasswordHasher.parallelism)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """Requer o pacote bcrypt"""
+    policy = 'bcrypt'
+    rounds = hasher_option(policy, 'rounds', hashers.BCryptSHA256PasswordHasher.rounds)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    policy = 'scrypt'
+    work_factor = hasher_option(policy, 'work_factor', hashers.ScryptPasswordHasher.work_factor)
+    block_size = hasher_option(policy, 'block_size', hashers.ScryptPasswordHasher.block_size)
+    parallelism = hasher_option(policy, 'parallelism', hashers.ScryptPasswordHasher.parallelism)
+    maxmem = hasher_option(policy, 'maxmem', hashers.ScryptPasswordHasher.maxmem)
+
+
+def missing_library(policy):
+    """Mensagem de erro se a biblioteca da política não estiver instalada"""
+    hasher = import_string(POLICIES[policy])()
+    if hasher.library is None:
+        return None
+    try:
+        hasher._load_library()
+    except ValueError as exc:
+        return str(exc)
+    return None
@@ -0,0 +1,52 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.serializers import UserLoginSerializer, UserSerializer
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, seed_transactions, timer
+
+PASSWORD = 'benchmark-123'
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência do login (/api/auth/login/) em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Transações do usuário (padrão: 100.000)')
+        parser.add_argument('--repeat', type=int, default=20, help='Repetições (padrão: 20)')
+
+    def measure(self, function):
+        """Mediana (ms) e número de consultas de uma execução"""
+        samples = []
+        for _ in range(self.repeat):
+            with timer() as elapsed, CaptureQueriesContext(connection) as queries:
+                function()
+            samples.append(elapsed['seconds'] * 1000)
+        return statistics.median(samples), len(queries.captured_queries)
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        with benchmark_database():
+            user = create_benchmark_user(password=PASSWORD)
+            seed_transactions(user, options['rows'])
+            client = Client()
+            url = reverse('token_obtain_pair')
+
+            def login():
+                response = client.post(url, {'email': user.email, 'password': PASSWORD})
+                assert response.status_code == 200, response.content[:500]
+
+            results = [
+                ('login', login),
+                ('só a verificação da senha', lambda: user.check_password(PASSWORD)),
+                ('payload enxuto', lambda: UserLoginSerializer(user).data),
+                ('payload completo (com saldo)', lambda: UserSerializer(user).data),
+            ]
+            self.stdout.write(f'{options["rows"]} transações, mediana de {self.repeat} execuções')
+            for label, function in results:
+                ms, queries = self.measure(function)
+                self.stdout.write(self.style.SUCCESS(f'{label}: {ms:.1f} ms ({queries} consultas)'))
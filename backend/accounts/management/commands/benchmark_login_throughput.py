@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from accounts.hasher_policies import POLICIES, policy_hashers
+from accounts.hashers import missing_library
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, timer
+
+PASSWORD = 'benchmark-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede logins por segundo em um núcleo (requisições sequenciais) com cada política '
+        'de hash de senha, em um banco de testes descartável. O custo vem de PASSWORD_HASHER_OPTIONS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            action='append',
+            dest='policies',
+            help=f"Política a medir (pode ser repetido). Padrão: {', '.join(POLICIES)}"
+        )
+        parser.add_argument('--requests', type=int, default=20, help='Logins por política (padrão: 20)')
+
+    def handle(self, *args, **options):
+        policies = options['policies'] or list(POLICIES)
+        unknown = [policy for policy in policies if policy not in POLICIES]
+        if unknown:
+            raise CommandError(f"Políticas desconhecidas: {', '.join(unknown)}. Use: {', '.join(POLICIES)}")
+
+        with benchmark_database():
+            user = create_benchmark_user(password=PASSWORD)
+            client = Client()
+            url = reverse('token_obtain_pair')
+
+            def login():
+                response = client.post(url, {'email': user.email, 'password': PASSWORD})
+                assert response.status_code == 200, response.content[:500]
+
+            self.stdout.write(f"{options['requests']} logins sequenciais por política")
+            for policy in policies:
+                message = missing_library(policy)
+                if message:
+                    self.stdout.write(self.style.WARNING(f'{policy}: ignorada ({message})'))
+                    continue
+
+                with override_settings(PASSWORD_HASHER_POLICY=policy, PASSWORD_HASHERS=policy_hashers(policy)):
+                    # O primeiro login regrava o hash gerado pela política anterior
+                    hasher = get_hasher()
+                    outdated = (
+                        identify_hasher(user.password).algorithm != hasher.algorithm
+                        or hasher.must_update(user.password)
+                    )
+                    with timer() as first:
+                        login()
+                    user.refresh_from_db(fields=['password'])
+                    assert identify_hasher(user.password).algorithm == hasher.algorithm
+                    assert not hasher.must_update(user.password)
+
+                    with timer() as elapsed:
+                        for _ in range(options['requests']):
+                            login()
+
+                per_second = options['requests'] / elapsed['seconds']
+                rehash = f" (regravação do hash no 1º login: {first['seconds'] * 1000:.1f} ms)" if outdated else ''
+                self.stdout.write(self.style.SUCCESS(
+                    f"{policy} {settings.PASSWORD_HASHER_OPTIONS.get(policy, {})}: "
+                    f"{per_second:.1f} logins/s por núcleo, {1000 / per_second:.1f} ms por login{rehash}"
+                ))
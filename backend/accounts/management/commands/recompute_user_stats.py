@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from accounts.stats import drifted, recompute
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Confere e corrige os agregados dos usuários (saldo, quantidade de transações e de metas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='ID do usuário a conferir (pode ser repetido). Padrão: todos'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Só confere: termina com erro se houver divergências, sem corrigir'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['users']:
+            users = users.filter(pk__in=options['users'])
+
+        wrong = drifted(users)
+        if options['check']:
+            if wrong:
+                raise CommandError(f'{len(wrong)} usuário(s) com agregados divergentes: {wrong[:20]}')
+            self.stdout.write(self.style.SUCCESS('Agregados dos usuários conferidos'))
+            return
+
+        fixed = sum(
+            recompute(User.objects.filter(pk__in=wrong[start:start + CHUNK_SIZE]))
+            for start in range(0, len(wrong), CHUNK_SIZE)
+        )
+        self.stdout.write(self.style.SUCCESS(f'{fixed} usuário(s) corrigido(s)'))
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:34
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def compute_user_stats(apps, schema_editor):
+    """Preenche os agregados a partir das transações e metas existentes"""
+    User = apps.get_model('accounts', 'User')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    Goal = apps.get_model('goals', 'Goal')
+
+    def aggregate(model, expression):
+        return Subquery(
+            model.objects
+            .filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(value=expression)
+            .values('value')
+        )
+
+    balance = Sum(Case(
+        When(type='income', then=F('amount')),
+        default=-F('amount')
+    ))
+    User.objects.update(
+        balance=Coalesce(
+            aggregate(Transaction, balance),
+            Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=14, decimal_places=2)
+        ),
+        transaction_count=Coalesce(aggregate(Transaction, Count('pk')), Value(0)),
+        goals_count=Coalesce(aggregate(Goal, Count('pk')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_token_version'),
+        ('goals', '0004_goalcontribution_period'),
+        ('transactions', '0009_balance_month_index_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=14, verbose_name='Saldo'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='goals_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Quantidade de Metas'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='transaction_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Quantidade de Transações'),
+        ),
+        migrations.RunPython(compute_user_stats, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
+from decimal import Decimal
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+# Colunas mantidas só por deltas com F() (ver accounts.stats)
+STATS_FIELDS = ['balance', 'transaction_count', 'goals_count']
+
 
 class User(AbstractUser):
     """
@@ -31,6 +36,20 @@ class User(AbstractUser):
     email_notifications = models.BooleanField(default=True, verbose_name="Notificações por Email")
     push_notifications = models.BooleanField(default=True, verbose_name="Notificações Push")
     
+    # Agregados das transações e metas, mantidos a cada escrita (ver accounts.stats)
+    balance = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name="Saldo"
+    )
+    transaction_count = models.IntegerField(default=0, editable=False, verbose_name="Quantidade de Transações")
+    goals_count = models.IntegerField(default=0, editable=False, verbose_name="Quantidade de Metas")
+    
+    # Incrementada a cada troca de senha: tokens emitidos antes dela deixam de valer
+    token_version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Versão dos Tokens")
+    
     # Metadados
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
@@ -46,22 +65,45 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        # `_password` só fica preenchido após set_password(); a atualização do
+        # hash feita por check_password() o limpa e não revoga os tokens
+        if self._password is not None and not self._state.adding:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        # Edições não regravam os agregados lidos junto com a instância,
+        # que podem ter sido alterados por escritas concorrentes
+        if not self._state.adding and self.pk is not None and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in STATS_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
     
     def get_total_balance(self):
-        """Calcula o saldo total do usuário baseado nas transações"""
-        from transactions.models import Transaction
-        
-        income = Transaction.objects.filter(
-            user=self, 
-            type='income'
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
-        
-        expenses = Transaction.objects.filter(
-            user=self, 
-            type='expense'
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
-        
-        return income - expenses
+        """Saldo total do usuário (receitas - despesas), relido da coluna `balance`"""
+        self.refresh_from_db(fields=['balance'])
+        return self.balance
+
+
+class AuthenticatedUser(User):
+    """
+    Usuário montado pela autenticação a partir do snapshot em cache
+    (id, is_active, currency e token_version). Os demais campos são
+    carregados sob demanda, todos na mesma consulta.
+    """
+    
+    class Meta:
+        proxy = True
+    
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.intersection(fields):
+            fields = deferred
+        super().refresh_from_db(using, fields)
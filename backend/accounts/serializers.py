@@ -21,8 +21,21 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined', 'last_login']
     
     def get_total_balance(self, obj):
-        """Calcula o saldo total do usuário"""
-        return float(obj.get_total_balance())
+        """Saldo total do usuário, mantido na coluna `balance`"""
+        return float(obj.balance)
+
+
+class UserLoginSerializer(serializers.ModelSerializer):
+    """
+    Dados do usuário devolvidos no login. Sem o saldo, que exige agregar
+    as transações: ele vem de /api/auth/user/.
+    """
+    full_name = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'full_name', 'currency']
+        read_only_fields = fields
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -52,8 +65,6 @@ class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer para perfil do usuário (mais detalhado)"""
     full_name = serializers.ReadOnlyField()
     total_balance = serializers.SerializerMethodField()
-    transaction_count = serializers.SerializerMethodField()
-    goals_count = serializers.SerializerMethodField()
     
     class Meta:
         model = User
@@ -63,13 +74,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'email_notifications', 'push_notifications', 'total_balance',
             'transaction_count', 'goals_count', 'date_joined', 'last_login'
         ]
-        read_only_fields = ['id', 'username', 'date_joined', 'last_login']
+        read_only_fields = [
+            'id', 'username', 'transaction_count', 'goals_count', 'date_joined', 'last_login'
+        ]
     
     def get_total_balance(self, obj):
-        return float(obj.get_total_balance())
-    
-    def get_transaction_count(self, obj):
-        return obj.transactions.count()
-    
-    def get_goals_count(self, obj):
-        return obj.goals.count()
+        return float(obj.balance)
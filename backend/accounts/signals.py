@@ -0,0 +1,14 @@
+"""
+Sinais que descartam o snapshot do usuário usado pela autenticação JWT.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import forget
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_snapshot(sender, instance, **kwargs):
+    forget(instance.pk)
@@ -0,0 +1,128 @@
+"""
+Manutenção dos agregados do usuário (saldo, quantidade de transações e de
+metas), guardados nas próprias colunas de User.
+Cada escrita de transação ou meta aplica um delta com F() na mesma
+transação do banco, sem ler o valor atual: escritas concorrentes somam
+seus deltas em vez de sobrescrever umas às outras.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import STATS_FIELDS, User
+
+ZERO = Decimal('0.00')
+
+
+def signed_amount(values):
+    """Efeito de uma transação no saldo: receitas somam, despesas subtraem"""
+    amount = Decimal(str(values['amount']))
+    return amount if values['type'] == 'income' else -amount
+
+
+def user_stats():
+    """
+    Subconsultas com os agregados reais de cada usuário, na ordem de
+    STATS_FIELDS.
+    """
+    from goals.models import Goal
+    from transactions.models import Transaction
+
+    def aggregate(model, expression):
+        return Subquery(
+            model.objects
+            .filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(value=expression)
+            .values('value')
+        )
+
+    balance = Sum(Case(
+        When(type='income', then=F('amount')),
+        default=-F('amount')
+    ))
+    return [
+        Coalesce(
+            aggregate(Transaction, balance),
+            Value(ZERO),
+            output_field=User._meta.get_field('balance')
+        ),
+        Coalesce(aggregate(Transaction, Count('pk')), Value(0)),
+        Coalesce(aggregate(Goal, Count('pk')), Value(0)),
+    ]
+
+
+def apply_transaction_changes(previous, current):
+    """
+    Aplica a diferença entre o estado anterior e o atual de uma transação
+    (dicionários com user_id, type e amount; None na criação e na exclusão).
+    """
+    fields = ['user_id', 'type', 'amount']
+    if previous and current and all(previous[field] == current[field] for field in fields):
+        return
+
+    deltas = defaultdict(lambda: {'balance': ZERO, 'transactions': 0})
+    if previous:
+        deltas[previous['user_id']]['balance'] -= signed_amount(previous)
+        deltas[previous['user_id']]['transactions'] -= 1
+    if current:
+        deltas[current['user_id']]['balance'] += signed_amount(current)
+        deltas[current['user_id']]['transactions'] += 1
+
+    for user_id, delta in deltas.items():
+        apply_delta(user_id, **delta)
+
+
+def apply_transaction_bulk(instances):
+    """Aplica de uma vez os deltas de várias transações recém-criadas"""
+    deltas = defaultdict(lambda: {'balance': ZERO, 'transactions': 0})
+    for instance in instances:
+        deltas[instance.user_id]['balance'] += signed_amount({'amount': instance.amount, 'type': instance.type})
+        deltas[instance.user_id]['transactions'] += 1
+
+    for user_id, delta in deltas.items():
+        apply_delta(user_id, **delta)
+
+
+def apply_delta(user_id, balance=ZERO, transactions=0, goals=0):
+    """Soma os deltas às colunas do usuário em um único UPDATE"""
+    changes = {}
+    if balance:
+        changes['balance'] = F('balance') + balance
+    if transactions:
+        changes['transaction_count'] = F('transaction_count') + transactions
+    if goals:
+        changes['goals_count'] = F('goals_count') + goals
+    if changes:
+        User.objects.filter(pk=user_id).update(**changes)
+
+
+def drifted(users=None):
+    """Ids dos usuários cujas colunas não batem com as transações e metas"""
+    if users is None:
+        users = User.objects.all()
+    expected = dict(zip(
+        ['expected_' + field for field in STATS_FIELDS],
+        user_stats()
+    ))
+    rows = (
+        users
+        .order_by('pk')
+        .annotate(**expected)
+        .values_list('pk', *STATS_FIELDS, *expected)
+    )
+    size = len(STATS_FIELDS)
+    return [
+        pk for pk, *values in rows.iterator()
+        if values[:size] != values[size:]
+    ]
+
+
+def recompute(users=None):
+    """Regrava os agregados dos usuários a partir das transações e metas"""
+    if users is None:
+        users = User.objects.all()
+    return users.update(**dict(zip(STATS_FIELDS, user_stats())))
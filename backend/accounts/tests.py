@@ -1,3 +1,369 @@
-from django.test import TestCase
+import threading
+from datetime import date
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from goals.models import Goal
+from transactions.models import Transaction
+from transactions.signals import transactions_bulk_created
+
+from .authentication import LRUCache, UserRefreshToken, local_snapshots
+from .backends import EmailBackend
+from .checks import check_password_hasher_policy
+from .hasher_policies import policy_hashers
+from .serializers import UserProfileSerializer
+from .stats import drifted
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_snapshots.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário', currency='USD'
+        )
+        self.client = APIClient()
+
+    def authenticate(self, user=None):
+        token = UserRefreshToken.for_user(user or self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_user_is_resolved_from_cache(self):
+        self.authenticate()
+        # primeira requisição lê o snapshot; as seguintes não consultam o usuário
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+        # o LRU expira antes do cache do Django, que ainda evita a consulta
+        local_snapshots.clear()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('transaction-list'))
+
+    def test_other_fields_load_in_one_query(self):
+        self.authenticate()
+        self.client.get(reverse('transaction-list'))
+
+        # campos adiados (inclusive o saldo) em uma só consulta
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('current_user'))
+        self.assertEqual(response.data['email'], 'teste@example.com')
+        self.assertEqual(response.data['currency'], 'USD')
+
+    def test_saving_the_user_refreshes_the_snapshot(self):
+        self.authenticate()
+        self.client.get(reverse('transaction-list'))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 401)
+
+    def test_password_change_revokes_tokens(self):
+        self.authenticate()
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+        self.user.set_password('outra-senha-456')
+        self.user.save()
+        response = self.client.get(reverse('transaction-list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'token_revoked')
+
+        self.authenticate()
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+    def test_password_rehash_keeps_tokens(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('senha-teste-123', hasher='pbkdf2_sha1')
+        )
+        self.user.refresh_from_db()
+        self.authenticate()
+
+        # o hash antigo é regravado com o hasher padrão sem revogar os tokens
+        self.assertTrue(self.user.check_password('senha-teste-123'))
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+        # tokens sem a claim valem enquanto a senha não for trocada
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 200)
+
+    def test_refreshed_access_token_keeps_the_version(self):
+        refresh = UserRefreshToken.for_user(self.user)
+        refreshed = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(AccessToken(refreshed.data['access'])['token_version'], 0)
+
+        self.user.set_password('outra-senha-456')
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refreshed.data["access"]}')
+        self.assertEqual(self.client.get(reverse('transaction-list')).status_code, 401)
+
+    def test_lru_is_bounded_and_expires(self):
+        lru = LRUCache(maxsize=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+
+        expired = LRUCache(maxsize=2, timeout=0)
+        expired.set('a', 1)
+        self.assertIsNone(expired.get('a'))
+
+
+class LoginTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+
+    def login(self, email, password='senha-teste-123'):
+        return self.client.post(reverse('token_obtain_pair'), {'email': email, 'password': password})
+
+    def test_login_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.login('teste@example.com')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user'], {
+            'id': self.user.pk, 'username': 'teste', 'email': 'teste@example.com',
+            'first_name': 'Teste', 'last_name': 'Usuário', 'full_name': 'Teste Usuário',
+            'currency': 'BRL'
+        })
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], self.user.pk)
+
+    def test_invalid_credentials(self):
+        self.user.is_active = False
+        self.user.save()
+        for email, password in [('teste@example.com', 'errada'), ('outro@example.com', 'senha-teste-123')]:
+            self.assertEqual(self.login(email, password).status_code, 401)
+        self.assertEqual(self.login('teste@example.com').status_code, 401)
+
+    def test_frontend_login_after_password_change(self):
+        self.user.set_password('outra-senha-456')
+        self.user.save()
+
+        # rota usada pelo frontend (frontend/src/services/api.js)
+        response = self.client.post('/api/auth/login/', {'email': 'teste@example.com', 'password': 'outra-senha-456'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])['token_version'], 1)
+
+        response = self.client.get('/api/accounts/user/', HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_backend_accepts_username_keyword(self):
+        # o admin envia o email no campo `username`
+        backend = EmailBackend()
+        self.assertEqual(backend.authenticate(None, username='teste@EXAMPLE.com', password='senha-teste-123'), self.user)
+        self.assertIsNone(backend.authenticate(None, username='teste', password='senha-teste-123'))
+        self.assertIsNone(backend.authenticate(None, email=['teste@example.com'], password='senha-teste-123'))
+
+
+FAST_HASHERS = {'pbkdf2': {'iterations': 1000}, 'scrypt': {'work_factor': 2 ** 10}}
+
+
+@override_settings(PASSWORD_HASHER_OPTIONS=FAST_HASHERS)
+class HasherPolicyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_snapshots.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+
+    def login(self):
+        response = self.client.post(reverse('token_obtain_pair'), {
+            'email': 'teste@example.com', 'password': 'senha-teste-123'
+        })
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_settings_follow_the_policy(self):
+        self.assertEqual(settings.PASSWORD_HASHERS, policy_hashers(settings.PASSWORD_HASHER_POLICY))
+        self.assertEqual(identify_hasher(self.user.password).safe_summary(self.user.password)['iterations'], 1000)
+
+    def test_cost_change_rehashes_on_login(self):
+        token = UserRefreshToken.for_user(self.user).access_token
+        with override_settings(PASSWORD_HASHER_OPTIONS={'pbkdf2': {'iterations': 2000}}):
+            self.login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+        # a regravação do hash não é troca de senha: os tokens continuam válidos
+        response = self.client.get(reverse('transaction-list'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_policy_change_rehashes_on_login(self):
+        with override_settings(PASSWORD_HASHER_POLICY='scrypt', PASSWORD_HASHERS=policy_hashers('scrypt')):
+            with self.assertNumQueries(2):
+                self.login()
+            self.user.refresh_from_db()
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'scrypt')
+            # já na política atual: sem nova gravação
+            with self.assertNumQueries(1):
+                self.login()
+
+        # hashes de outra política continuam válidos
+        self.login()
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, 'pbkdf2_sha256')
+
+    def test_policy_check(self):
+        self.assertEqual(check_password_hasher_policy(None), [])
+        with override_settings(PASSWORD_HASHER_POLICY='md5'):
+            self.assertEqual([error.id for error in check_password_hasher_policy(None)], ['accounts.E001'])
+
+
+class UserStatsTestMixin:
+    """Criação de transações e metas para os testes dos agregados do usuário"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+
+    def create_transaction(self, amount, type='expense', user=None):
+        return Transaction.objects.create(
+            user=user or self.user, description='Transação', amount=Decimal(amount),
+            type=type, date=date(2024, 3, 10)
+        )
+
+    def create_goal(self, user=None):
+        return Goal.objects.create(
+            user=user or self.user, title='Meta', category='emergency',
+            target_amount=Decimal('1000.00'), target_date=date(2030, 1, 1)
+        )
+
+    def assertStats(self, balance, transactions, goals, user=None):
+        user = user or self.user
+        user.refresh_from_db()
+        self.assertEqual((user.balance, user.transaction_count, user.goals_count), (Decimal(balance), transactions, goals))
+        self.assertEqual(drifted(User.objects.filter(pk=user.pk)), [])
+
+
+class UserStatsTests(UserStatsTestMixin, TestCase):
+
+    def test_writes_keep_stats_in_sync(self):
+        income = self.create_transaction('100.00', 'income')
+        expense = self.create_transaction('30.00')
+        goal = self.create_goal()
+        self.assertStats('70.00', 2, 1)
+
+        expense.amount = Decimal('50.00')
+        expense.save()
+        income.type = 'expense'
+        income.save()
+        self.assertStats('-150.00', 2, 1)
+
+        other = User.objects.create_user(
+            username='outro', email='outro@example.com', password='senha-teste-123',
+            first_name='Outro', last_name='Usuário'
+        )
+        expense.user = other
+        expense.save()
+        self.assertStats('-100.00', 1, 1)
+        self.assertStats('-50.00', 1, 0, user=other)
+
+        income.delete()
+        goal.delete()
+        self.assertStats('0.00', 0, 0)
+
+    def test_bulk_create(self):
+        instances = Transaction.objects.bulk_create([
+            Transaction(user=self.user, description='Lote', amount=Decimal('10.00'), type=type, date=date(2024, 1, 1))
+            for type in ['income', 'income', 'expense']
+        ])
+        transactions_bulk_created.send(sender=Transaction, instances=instances)
+        self.assertStats('10.00', 3, 0)
+
+    def test_profile_reads_the_columns(self):
+        self.create_transaction('100.00', 'income')
+        self.create_goal()
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=self.user.pk))
+
+        with self.assertNumQueries(0):
+            response = client.get(reverse('current_user'))
+        self.assertEqual(response.data['total_balance'], 100.0)
+
+        # um PATCH no perfil não regrava os agregados lidos na instância
+        stale = User.objects.get(pk=self.user.pk)
+        self.create_transaction('40.00')
+        stale.phone = '11999999999'
+        stale.save()
+        self.assertStats('60.00', 2, 1)
+
+        data = UserProfileSerializer(User.objects.get(pk=self.user.pk)).data
+        self.assertEqual((data['total_balance'], data['transaction_count'], data['goals_count']), (60.0, 2, 1))
+
+    def test_recompute_command(self):
+        self.create_transaction('100.00', 'income')
+        User.objects.filter(pk=self.user.pk).update(balance=Decimal('1.00'), goals_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command('recompute_user_stats', check=True, stdout=StringIO())
+        out = StringIO()
+        call_command('recompute_user_stats', stdout=out)
+        self.assertIn('1 usuário(s) corrigido(s)', out.getvalue())
+        self.assertStats('100.00', 1, 0)
+
+
+class UserStatsConcurrencyTests(UserStatsTestMixin, TransactionTestCase):
+    """Escritas simultâneas, cada thread com sua própria conexão"""
+    threads = 8
+    writes_per_thread = 10
+
+    def write(self, errors):
+        try:
+            for index in range(self.writes_per_thread):
+                self.create_transaction('10.00', 'income')
+                expense = self.create_transaction('3.00')
+                if index % 2:
+                    expense.delete()
+                    self.create_goal()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_concurrent_writes_keep_stats_consistent(self):
+        errors = []
+        workers = [threading.Thread(target=self.write, args=(errors,)) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        writes = self.threads * self.writes_per_thread
+        deleted = self.threads * (self.writes_per_thread // 2)
+        self.assertStats(
+            Decimal('10.00') * writes - Decimal('3.00') * (writes - deleted),
+            2 * writes - deleted,
+            deleted
+        )
@@ -3,7 +3,6 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
@@ -11,7 +10,8 @@ from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.template.loader import render_to_string
-from .serializers import UserSerializer, UserRegistrationSerializer, UserProfileSerializer
+from .authentication import UserRefreshToken
+from .serializers import UserSerializer, UserLoginSerializer, UserRegistrationSerializer, UserProfileSerializer
 
 User = get_user_model()
 
@@ -24,20 +24,15 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         password = request.data.get('password')
         
         if email and password:
-            # Buscar usuário pelo email
-            try:
-                user = User.objects.get(email=email)
-                # Autenticar usando username (que é o email)
-                user = authenticate(request, username=user.username, password=password)
-                if user:
-                    refresh = RefreshToken.for_user(user)
-                    return Response({
-                        'refresh': str(refresh),
-                        'access': str(refresh.access_token),
-                        'user': UserSerializer(user).data
-                    })
-            except User.DoesNotExist:
-                pass
+            # EmailBackend: uma consulta ao usuário e a verificação da senha
+            user = authenticate(request, email=email, password=password)
+            if user:
+                refresh = UserRefreshToken.for_user(user)
+                return Response({
+                    'refresh': str(refresh),
+                    'access': str(refresh.access_token),
+                    'user': UserLoginSerializer(user).data
+                })
         
         return Response(
             {'error': 'Credenciais inválidas'}, 
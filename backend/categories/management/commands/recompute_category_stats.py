@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from categories.models import Category
+from categories.stats import drifted, recompute
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Confere e corrige os agregados das categorias (quantidade, total e última transação)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='ID do usuário a conferir (pode ser repetido). Padrão: todos'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Só confere: termina com erro se houver divergências, sem corrigir'
+        )
+
+    def handle(self, *args, **options):
+        categories = Category.objects.all()
+        if options['users']:
+            categories = categories.filter(user_id__in=options['users'])
+
+        wrong = drifted(categories)
+        if options['check']:
+            if wrong:
+                raise CommandError(f'{len(wrong)} categoria(s) com agregados divergentes: {wrong[:20]}')
+            self.stdout.write(self.style.SUCCESS('Agregados das categorias conferidos'))
+            return
+
+        fixed = sum(
+            recompute(Category.objects.filter(pk__in=wrong[start:start + CHUNK_SIZE]))
+            for start in range(0, len(wrong), CHUNK_SIZE)
+        )
+        self.stdout.write(self.style.SUCCESS(f'{fixed} categoria(s) corrigida(s)'))
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:18
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def compute_category_stats(apps, schema_editor):
+    """Preenche os agregados a partir das transações existentes"""
+    Category = apps.get_model('categories', 'Category')
+    Transaction = apps.get_model('transactions', 'Transaction')
+
+    def aggregate(expression):
+        return Subquery(
+            Transaction.objects
+            .filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(value=expression)
+            .values('value')
+        )
+
+    Category.objects.update(
+        transaction_count=Coalesce(aggregate(Count('pk')), Value(0)),
+        total_amount=Coalesce(
+            aggregate(Sum('amount')),
+            Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=14, decimal_places=2)
+        ),
+        last_transaction_date=aggregate(Max('date')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_query_shape_indexes'),
+        ('transactions', '0008_facets_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_transaction_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Última Transação'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Valor Total'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='transaction_count',
+            field=models.IntegerField(default=0, verbose_name='Quantidade de Transações'),
+        ),
+        migrations.RunPython(compute_category_stats, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
+from decimal import Decimal
 from django.db import models
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Colunas mantidas só por deltas com F() (ver categories.stats)
+STATS_FIELDS = ['transaction_count', 'total_amount', 'last_transaction_date']
+
 
 class Category(models.Model):
     """
@@ -42,6 +46,16 @@ class Category(models.Model):
     )
     is_active = models.BooleanField(default=True, verbose_name="Ativo")
     
+    # Agregados das transações, mantidos a cada escrita (ver categories.stats)
+    transaction_count = models.IntegerField(default=0, verbose_name="Quantidade de Transações")
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Valor Total"
+    )
+    last_transaction_date = models.DateField(blank=True, null=True, verbose_name="Última Transação")
+    
     # Metadados
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
@@ -51,16 +65,23 @@ class Category(models.Model):
         verbose_name_plural = "Categorias"
         ordering = ['type', 'name']
         unique_together = ['user', 'name', 'type']
+        indexes = [
+            # Listagem de categorias ativas, já na ordem (tipo, nome)
+            models.Index(
+                fields=['user', 'is_active', 'type', 'name'],
+                name='category_user_active_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
     
-    def get_transaction_count(self):
-        """Retorna o número de transações desta categoria"""
-        return self.transactions.count()
-    
-    def get_total_amount(self):
-        """Retorna o valor total das transações desta categoria"""
-        return self.transactions.aggregate(
-            total=models.Sum('amount')
-        )['total'] or 0
+    def save(self, *args, **kwargs):
+        # Edições não regravam os agregados lidos junto com a instância,
+        # que podem ter sido alterados por escritas concorrentes
+        if not self._state.adding and self.pk is not None and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in STATS_FIELDS
+            ]
+        super().save(*args, **kwargs)
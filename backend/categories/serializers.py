@@ -3,18 +3,23 @@ from .models import Category
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    """Serializer para categorias"""
-    transaction_count = serializers.ReadOnlyField(source='get_transaction_count')
-    total_amount = serializers.ReadOnlyField(source='get_total_amount')
+    """
+    Serializer para categorias.
+    Os agregados vêm das colunas mantidas a cada escrita de transação.
+    """
+    total_amount = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Category
         fields = [
             'id', 'name', 'description', 'type', 'color', 'icon',
             'is_active', 'transaction_count', 'total_amount',
+            'last_transaction_date', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'transaction_count', 'total_amount', 'last_transaction_date',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         # Associa automaticamente ao usuário logado
@@ -22,6 +27,15 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class CategorySummarySerializer(serializers.ModelSerializer):
+    """Serializer leve para categorias aninhadas (sem agregados)"""
+    
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'type', 'color', 'icon', 'is_active']
+        read_only_fields = fields
+
+
 class CategoryCreateSerializer(serializers.ModelSerializer):
     """Serializer para criação de categorias"""
     
@@ -0,0 +1,14 @@
+"""
+Sinais que invalidam os relatórios dependentes das categorias.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from finance_api.report_cache import invalidate
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_reports(sender, instance, **kwargs):
+    invalidate(instance.user_id, 'categories')
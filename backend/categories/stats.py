@@ -0,0 +1,156 @@
+"""
+Manutenção dos agregados das categorias (quantidade, total e data da
+última transação), guardados nas próprias colunas de Category.
+Cada escrita de transação aplica um delta com F() na mesma transação do
+banco; a data da última transação só é recalculada a partir da tabela
+quando a transação removida era a mais recente da categoria.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, Count, DateField, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from finance_api.report_cache import invalidate
+
+from .models import STATS_FIELDS, Category
+
+ZERO = Decimal('0.00')
+to_date = DateField().to_python
+
+
+def transaction_stats():
+    """
+    Subconsultas com os agregados reais das transações de cada categoria,
+    na ordem de STATS_FIELDS.
+    """
+    from transactions.models import Transaction
+
+    def aggregate(expression):
+        return Subquery(
+            Transaction.objects
+            .filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(value=expression)
+            .values('value')
+        )
+
+    return [
+        Coalesce(aggregate(Count('pk')), Value(0)),
+        Coalesce(
+            aggregate(Sum('amount')),
+            Value(ZERO),
+            output_field=Category._meta.get_field('total_amount')
+        ),
+        aggregate(Max('date')),
+    ]
+
+
+def apply_changes(previous, current):
+    """
+    Aplica a diferença entre o estado anterior e o atual de uma transação
+    (dicionários com category_id, amount e date; None na criação e na
+    exclusão).
+    """
+    fields = ['category_id', 'amount', 'date']
+    if previous and current and all(previous[field] == current[field] for field in fields):
+        return
+
+    deltas = defaultdict(lambda: {'amount': ZERO, 'count': 0, 'added': None, 'removed': None})
+    if previous and previous['category_id']:
+        delta = deltas[previous['category_id']]
+        delta['amount'] -= Decimal(str(previous['amount']))
+        delta['count'] -= 1
+        delta['removed'] = to_date(previous['date'])
+    if current and current['category_id']:
+        delta = deltas[current['category_id']]
+        delta['amount'] += Decimal(str(current['amount']))
+        delta['count'] += 1
+        delta['added'] = to_date(current['date'])
+
+    for category_id, delta in deltas.items():
+        apply_delta(category_id, **delta)
+
+
+def apply_bulk(instances):
+    """Aplica de uma vez os deltas de várias transações recém-criadas"""
+    deltas = defaultdict(lambda: {'amount': ZERO, 'count': 0, 'added': None, 'removed': None})
+    for instance in instances:
+        if instance.category_id:
+            delta = deltas[instance.category_id]
+            delta['amount'] += Decimal(str(instance.amount))
+            delta['count'] += 1
+            day = to_date(instance.date)
+            if delta['added'] is None or day > delta['added']:
+                delta['added'] = day
+
+    for category_id, delta in deltas.items():
+        apply_delta(category_id, **delta)
+
+
+def apply_delta(category_id, amount, count, added=None, removed=None):
+    """
+    Soma `amount` e `count` aos agregados da categoria. `added` e `removed`
+    são as datas da transação incluída e da removida, usadas para manter
+    `last_transaction_date`.
+    """
+    if added is not None and removed is not None and added >= removed:
+        # A data incluída não é menor que a removida: a maior data não diminui
+        removed = None
+    if not (amount or count or added or removed):
+        return
+
+    last_date = F('last_transaction_date')
+    if added is not None:
+        last_date = Case(
+            When(
+                Q(last_transaction_date__isnull=True) | Q(last_transaction_date__lt=added),
+                then=Value(added)
+            ),
+            default=last_date
+        )
+    if removed is not None:
+        # Removeu a transação mais recente: relê a maior data (já considerando
+        # a transação incluída, pois o sinal roda depois da escrita)
+        last_date = Case(
+            When(last_transaction_date__lte=removed, then=transaction_stats()[2]),
+            default=last_date
+        )
+
+    Category.objects.filter(pk=category_id).update(
+        transaction_count=F('transaction_count') + count,
+        total_amount=F('total_amount') + amount,
+        last_transaction_date=last_date
+    )
+
+
+def drifted(categories=None):
+    """Ids das categorias cujas colunas não batem com as transações"""
+    if categories is None:
+        categories = Category.objects.all()
+    expected = dict(zip(['expected_' + field for field in STATS_FIELDS], transaction_stats()))
+    rows = (
+        categories
+        .order_by('pk')
+        .annotate(**expected)
+        .values_list('pk', *STATS_FIELDS, *expected)
+    )
+    size = len(STATS_FIELDS)
+    return [
+        pk for pk, *values in rows.iterator()
+        if values[:size] != values[size:]
+    ]
+
+
+def recompute(categories=None):
+    """
+    Regrava os agregados das categorias a partir das transações. update()
+    não dispara post_save: invalida os relatórios dos donos das categorias.
+    """
+    if categories is None:
+        categories = Category.objects.all()
+    updated = categories.update(**dict(zip(STATS_FIELDS, transaction_stats())))
+    for user_id in categories.order_by().values_list('user_id', flat=True).distinct():
+        invalidate(user_id, 'categories')
+    return updated
@@ -1,3 +1,155 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from transactions.imports import import_transactions
+from transactions.models import Transaction
+from .models import Category
+from .stats import drifted
+
+User = get_user_model()
+
+
+class CategoryStatsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for index in range(5):
+            category = Category.objects.create(user=self.user, name=f'Despesa {index}', type='expense')
+            for amount in ('10.00', '15.50'):
+                Transaction.objects.create(
+                    user=self.user, category=category, description='Compra',
+                    amount=Decimal(amount), type='expense', date=date(2024, 3, 1)
+                )
+        Category.objects.create(user=self.user, name='Salário', type='income')
+
+    def test_list_reads_stored_stats(self):
+        # 1 COUNT da paginação + 1 SELECT, independente do número de categorias
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('category-list'))
+
+        results = {c['name']: c for c in response.data['results']}
+        self.assertEqual(results['Despesa 0']['transaction_count'], 2)
+        self.assertEqual(Decimal(str(results['Despesa 0']['total_amount'])), Decimal('25.50'))
+        self.assertEqual(results['Salário']['transaction_count'], 0)
+        self.assertEqual(Decimal(str(results['Salário']['total_amount'])), Decimal('0'))
+
+    def test_by_type_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('category-by-type'))
+
+        self.assertEqual(len(response.data['expense']), 5)
+        self.assertEqual(len(response.data['income']), 1)
+
+    def test_transaction_listing_nests_lightweight_category(self):
+        response = self.client.get(reverse('transaction-list'))
+
+        details = response.data['results'][0]['category_details']
+        self.assertNotIn('transaction_count', details)
+        self.assertEqual(details['type'], 'expense')
+
+
+class CategoryStatsMaintenanceTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123'
+        )
+        self.food = Category.objects.create(user=self.user, name='Alimentação', type='expense')
+        self.leisure = Category.objects.create(user=self.user, name='Lazer', type='expense')
+
+    def create_transaction(self, amount, day, category=None):
+        return Transaction.objects.create(
+            user=self.user, category=category or self.food, description='Compra',
+            amount=Decimal(amount), type='expense', date=day
+        )
+
+    def stats(self, category):
+        category.refresh_from_db()
+        return category.transaction_count, category.total_amount, category.last_transaction_date
+
+    def test_stats_follow_create_update_move_and_delete(self):
+        first = self.create_transaction('10.00', date(2024, 3, 1))
+        latest = self.create_transaction('25.50', date(2024, 4, 1))
+        self.assertEqual(self.stats(self.food), (2, Decimal('35.50'), date(2024, 4, 1)))
+
+        first.amount = Decimal('12.00')
+        first.save()
+        self.assertEqual(self.stats(self.food), (2, Decimal('37.50'), date(2024, 4, 1)))
+
+        latest.category = self.leisure
+        latest.save()
+        self.assertEqual(self.stats(self.food), (1, Decimal('12.00'), date(2024, 3, 1)))
+        self.assertEqual(self.stats(self.leisure), (1, Decimal('25.50'), date(2024, 4, 1)))
+
+        latest.date = date(2024, 2, 1)
+        latest.save()
+        self.assertEqual(self.stats(self.leisure), (1, Decimal('25.50'), date(2024, 2, 1)))
+
+        latest.delete()
+        first.category = None
+        first.save()
+        self.assertEqual(self.stats(self.leisure), (0, Decimal('0.00'), None))
+        self.assertEqual(self.stats(self.food), (0, Decimal('0.00'), None))
+        self.assertEqual(drifted(), [])
+
+    def test_bulk_inserts_update_stats(self):
+        import_transactions(self.user, [
+            {'description': 'Feira', 'amount': '20.00', 'type': 'expense',
+             'date': '2024-03-01', 'category': self.food.pk},
+            {'description': 'Mercado', 'amount': '30.00', 'type': 'expense',
+             'date': '2024-05-01', 'category': self.food.pk},
+        ])
+
+        self.assertEqual(self.stats(self.food), (2, Decimal('50.00'), date(2024, 5, 1)))
+
+    def test_editing_a_stale_category_keeps_stats(self):
+        stale = Category.objects.get(pk=self.food.pk)
+        self.create_transaction('10.00', date(2024, 3, 1))
+
+        stale.name = 'Comida'
+        stale.save()
+
+        self.assertEqual(self.stats(self.food), (1, Decimal('10.00'), date(2024, 3, 1)))
+        self.assertEqual(self.food.name, 'Comida')
+
+    def test_command_checks_and_repairs_drift(self):
+        self.create_transaction('10.00', date(2024, 3, 1))
+        Category.objects.filter(pk=self.food.pk).update(transaction_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command('recompute_category_stats', check=True, stdout=StringIO())
+        call_command('recompute_category_stats', user=[self.user.pk], stdout=StringIO())
+
+        self.assertEqual(drifted(), [])
+        self.assertEqual(self.stats(self.food), (1, Decimal('10.00'), date(2024, 3, 1)))
+
+    def test_repair_invalidates_cached_reports(self):
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        def food_total():
+            report = client.get(reverse('categories-report')).data
+            return {row['category']: row['total'] for row in report}['Alimentação']
+
+        self.create_transaction('10.00', date(2024, 3, 1))
+        Category.objects.filter(pk=self.food.pk).update(total_amount=Decimal('99.00'))
+        self.assertEqual(food_total(), 99.0)
+
+        call_command('recompute_category_stats', stdout=StringIO())
 
-# Create your tests here.
+        self.assertEqual(food_total(), 10.0)
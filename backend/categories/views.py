@@ -13,7 +13,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         # Usuários só veem suas próprias categorias
-        return Category.objects.filter(user=self.request.user, is_active=True)
+        return Category.objects.filter(
+            user=self.request.user, is_active=True
+        ).order_by('type', 'name')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -23,12 +25,11 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_type(self, request):
         """Retorna categorias agrupadas por tipo"""
-        income_categories = self.get_queryset().filter(type='income')
-        expense_categories = self.get_queryset().filter(type='expense')
+        categories = CategorySerializer(self.get_queryset(), many=True).data
         
         return Response({
-            'income': CategorySerializer(income_categories, many=True).data,
-            'expense': CategorySerializer(expense_categories, many=True).data
+            'income': [category for category in categories if category['type'] == 'income'],
+            'expense': [category for category in categories if category['type'] == 'expense']
         })
 
 
@@ -85,7 +86,10 @@ class DefaultCategoriesView(APIView):
             )
             created_categories.append(category)
         
-        serializer = CategorySerializer(created_categories, many=True)
+        serializer = CategorySerializer(
+            created_categories,
+            many=True
+        )
         return Response({
             'message': f'{len(created_categories)} categorias padrão criadas com sucesso',
             'categories': serializer.data
@@ -0,0 +1,71 @@
+import statistics
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, seed_transactions, timer
+from goals.models import Goal
+
+# As chamadas que a página do dashboard fazia, uma requisição cada
+SEPARATE_CALLS = [
+    ('transaction-summary', {}),
+    ('monthly-report', {}),
+    ('transaction-list', {'ordering': '-date', 'page_size': 5}),
+    ('goal-summary', {}),
+    ('category-by-type', {}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara /api/dashboard/ com as cinco chamadas avulsas do dashboard em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Transações geradas (padrão: 100.000)')
+        parser.add_argument('--goals', type=int, default=20, help='Metas geradas (padrão: 20)')
+        parser.add_argument('--repeat', type=int, default=20, help='Repetições (padrão: 20)')
+
+    def measure(self, requests, cold):
+        """Mediana (ms) e número de consultas de uma carga do dashboard"""
+        samples = []
+        for _ in range(self.repeat):
+            if cold:
+                cache.clear()
+            with timer() as elapsed, CaptureQueriesContext(connection) as queries:
+                for url, params in requests:
+                    response = self.client.get(url, params)
+                    assert response.status_code == 200, response.content[:500]
+            samples.append(elapsed['seconds'] * 1000)
+        return statistics.median(samples), len(queries.captured_queries)
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        with benchmark_database():
+            user = create_benchmark_user()
+            seed_transactions(user, options['rows'])
+            Goal.objects.bulk_create([
+                Goal(
+                    user=user, title=f'Meta {index}', category='other',
+                    target_amount=Decimal('1000.00'), current_amount=Decimal(index * 10),
+                    target_date=date(2030, 1, 1)
+                )
+                for index in range(options['goals'])
+            ])
+            self.client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+            separate = [(reverse(name), params) for name, params in SEPARATE_CALLS]
+            dashboard = [(reverse('dashboard'), {})]
+            self.stdout.write(f'{options["rows"]} transações, {options["goals"]} metas')
+            for label, cold in [('sem cache', True), ('com cache', False)]:
+                separate_ms, separate_queries = self.measure(separate, cold)
+                dashboard_ms, dashboard_queries = self.measure(dashboard, cold)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{label}: 5 chamadas {separate_ms:.1f} ms ({separate_queries} consultas) | '
+                    f'/api/dashboard/ {dashboard_ms:.1f} ms ({dashboard_queries} consultas)'
+                ))
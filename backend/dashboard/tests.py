@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from goals.models import Goal
+from transactions.models import Transaction
+
+User = get_user_model()
+
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        salary = Category.objects.create(user=self.user, name='Salário', type='income')
+        food = Category.objects.create(user=self.user, name='Alimentação', type='expense')
+
+        today = timezone.now().date()
+        for months_ago in range(4):
+            day = (today.replace(day=1) - timedelta(days=31 * months_ago)).replace(day=10)
+            for amount, category in [('5000.00', salary), ('120.00', food), ('80.00', food)]:
+                Transaction.objects.create(
+                    user=self.user, category=category, description='Transação',
+                    amount=Decimal(amount), type=category.type, date=day
+                )
+        Goal.objects.create(
+            user=self.user, title='Reserva', category='emergency', priority='high',
+            target_amount=Decimal('1000.00'), current_amount=Decimal('250.00'),
+            target_date=date(2030, 1, 1)
+        )
+
+    def dashboard(self, **params):
+        response = self.client.get(reverse('dashboard'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_sections_match_the_separate_endpoints(self):
+        data = self.dashboard(recent_limit=10, months=6)
+
+        self.assertEqual(data['summary'], self.client.get(reverse('transaction-summary')).data)
+        self.assertEqual(data['monthly'], self.client.get(reverse('monthly-report'), {'months': 6}).data)
+        self.assertEqual(data['recent'], self.client.get(reverse('transaction-recent'), {'limit': 10}).data)
+        self.assertEqual(data['goals'], self.client.get(reverse('goal-summary')).data)
+        self.assertEqual(data['categories'], self.client.get(reverse('category-by-type')).data)
+
+    def test_custom_summary_period(self):
+        params = {'start_date': '2020-01-05', 'end_date': timezone.now().date().isoformat()}
+        data = self.dashboard(include='summary,monthly', **params)
+
+        self.assertEqual(data['summary'], self.client.get(reverse('transaction-summary'), params).data)
+        self.assertEqual(data['summary']['transaction_count'], 12)
+
+    def test_include_selects_sections(self):
+        data = self.dashboard(include='goals, recent')
+
+        self.assertEqual(set(data), {'goals', 'recent'})
+        self.assertEqual(len(data['recent']), 5)
+
+    def test_invalid_parameters(self):
+        for params in [{'include': 'summary,unknown'}, {'months': 'x'}, {'start_date': '2024-13-01', 'end_date': '2024-12-31'}]:
+            response = self.client.get(reverse('dashboard'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_summary_and_monthly_share_one_query(self):
+        # saldos mensais (resumo + gráfico), recentes, metas (2) e categorias
+        with self.assertNumQueries(5):
+            self.dashboard()
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.dashboard(include='summary,monthly')
+
+    def test_cached_until_a_write(self):
+        self.dashboard()
+        with self.assertNumQueries(0):
+            self.dashboard()
+
+        Goal.objects.filter(user=self.user).first().add_contribution(Decimal('50.00'))
+        self.assertEqual(self.dashboard()['goals']['total_current_amount'], '300.00')
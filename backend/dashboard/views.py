@@ -0,0 +1,146 @@
+from datetime import datetime
+
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from categories.models import Category
+from categories.serializers import CategorySerializer
+from finance_api.report_cache import cached_report
+from goals.models import Goal
+from goals.reports import summarize_goals
+from goals.serializers import GoalSummarySerializer
+from transactions.models import Transaction
+from transactions.reports import (
+    is_month_aligned,
+    month_bounds,
+    monthly_rollup,
+    monthly_totals,
+    period_summary,
+    summary_from_totals,
+)
+from transactions.serializers import TransactionSerializer, TransactionSummarySerializer
+from transactions.views import MonthlyReportView
+
+
+class DashboardView(APIView):
+    """
+    Todos os dados do dashboard em uma única requisição.
+    `?include=summary,monthly,recent,goals,categories` escolhe as seções
+    (padrão: todas). Cada seção tem o mesmo formato do endpoint avulso
+    correspondente e aceita os mesmos parâmetros: `start_date`/`end_date`
+    (summary), `months` ou `start`/`end` (monthly) e `recent_limit`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    sections = ['summary', 'monthly', 'recent', 'goals', 'categories']
+    default_recent_limit = 5
+    max_recent_limit = 50
+
+    @cached_report('transactions', 'categories', 'goals')
+    def get(self, request):
+        include = request.query_params.get('include')
+        sections = self.sections
+        if include:
+            sections = [section.strip() for section in include.split(',') if section.strip()]
+            unknown = [section for section in sections if section not in self.sections]
+            if unknown:
+                return Response({
+                    'error': f"Seções inválidas: {', '.join(unknown)}. Use: {', '.join(self.sections)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            periods = self.get_periods(request.query_params, sections)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Resumo e gráfico mensal leem os mesmos saldos mensais: uma consulta
+        # para os dois quando o período do resumo é alinhado a meses
+        totals = None
+        summary_period = periods.get('summary')
+        if 'monthly' in sections and (summary_period is None or is_month_aligned(*summary_period)):
+            ranges = [period for period in (summary_period, periods['monthly']) if period]
+            totals = monthly_totals(
+                request.user,
+                min(start for start, _ in ranges),
+                max(end for _, end in ranges)
+            )
+
+        data = {}
+        for section in sections:
+            data[section] = getattr(self, f'get_{section}')(request, periods.get(section), totals)
+        return Response(data)
+
+    def get_cache_period(self, request):
+        return self.get_periods(request.query_params, self.sections)
+    
+    def get_periods(self, params, sections):
+        periods = {}
+        if 'summary' in sections:
+            start_date = params.get('start_date')
+            end_date = params.get('end_date')
+            if start_date and end_date:
+                try:
+                    periods['summary'] = (
+                        datetime.strptime(start_date, '%Y-%m-%d').date(),
+                        datetime.strptime(end_date, '%Y-%m-%d').date()
+                    )
+                except ValueError:
+                    raise ValueError('Datas inválidas. Use YYYY-MM-DD.')
+            else:
+                periods['summary'] = month_bounds(timezone.now().date())
+        if 'monthly' in sections:
+            periods['monthly'] = MonthlyReportView().get_period(params)
+        return periods
+
+    def get_summary(self, request, period, totals):
+        start_date, end_date = period
+        if totals is not None:
+            summary = summary_from_totals(totals, start_date, end_date)
+        else:
+            summary = period_summary(request.user, start_date, end_date)
+        return TransactionSummarySerializer({
+            **summary,
+            'period_start': start_date,
+            'period_end': end_date
+        }).data
+
+    def get_monthly(self, request, period, totals):
+        start_date, end_date = period
+        return [
+            {
+                **month,
+                'income': float(month['income']),
+                'expenses': float(month['expenses']),
+                'balance': float(month['balance']),
+            }
+            for month in monthly_rollup(request.user, start_date, end_date, totals)
+        ]
+
+    def get_recent(self, request, period, totals):
+        try:
+            limit = int(request.query_params.get('recent_limit', self.default_recent_limit))
+        except ValueError:
+            limit = self.default_recent_limit
+        limit = max(1, min(limit, self.max_recent_limit))
+        transactions = (
+            Transaction.objects
+            .filter(user=request.user)
+            .select_related('category')
+            .order_by('-date', '-created_at')[:limit]
+        )
+        return TransactionSerializer(transactions, many=True, context={'request': request}).data
+
+    def get_goals(self, request, period, totals):
+        return GoalSummarySerializer(summarize_goals(Goal.objects.filter(user=request.user))).data
+
+    def get_categories(self, request, period, totals):
+        categories = CategorySerializer(
+            Category.objects.filter(user=request.user, is_active=True).order_by('type', 'name'),
+            many=True
+        ).data
+        return {
+            'income': [category for category in categories if category['type'] == 'income'],
+            'expense': [category for category in categories if category['type'] == 'expense'],
+        }
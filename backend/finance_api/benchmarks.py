@@ -0,0 +1,88 @@
+"""
+Utilitários compartilhados pelos comandos de benchmark.
+Os benchmarks rodam em um banco de testes descartável, nunca no banco real.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def benchmark_database():
+    """Cria (e remove ao final) um banco de testes isolado"""
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer():
+    """Mede o tempo do bloco; o resultado fica em `elapsed['seconds']`"""
+    elapsed = {}
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed['seconds'] = time.perf_counter() - start
+
+
+def create_benchmark_user(email='benchmark@example.com', password='benchmark-123'):
+    """Cria o usuário usado pelos benchmarks, com categorias padrão"""
+    from django.contrib.auth import get_user_model
+    from categories.models import Category
+
+    user = get_user_model().objects.create_user(
+        username=email.split('@')[0], email=email, password=password,
+        first_name='Benchmark', last_name='User'
+    )
+    Category.objects.bulk_create([
+        Category(user=user, name=name, type=type)
+        for name, type in [
+            ('Salário', 'income'), ('Freelance', 'income'),
+            ('Alimentação', 'expense'), ('Transporte', 'expense'),
+            ('Moradia', 'expense'), ('Lazer', 'expense'),
+        ]
+    ])
+    return user
+
+
+def seed_transactions(user, rows, batch_size=5000, start=date(2015, 1, 1), seed=42):
+    """Insere `rows` transações sintéticas com bulk_create"""
+    from categories.models import Category
+    from transactions.models import Transaction
+
+    rng = random.Random(seed)
+    categories = list(Category.objects.filter(user=user))
+    words = ['mercado', 'uber', 'aluguel', 'cinema', 'salário', 'farmácia', 'padaria', 'pix']
+    created = 0
+
+    while created < rows:
+        batch = []
+        for _ in range(min(batch_size, rows - created)):
+            category = rng.choice(categories)
+            batch.append(Transaction(
+                user=user,
+                category=category,
+                description=f'{rng.choice(words)} {rng.choice(words)} {created}',
+                amount=Decimal(rng.randint(100, 500000)) / 100,
+                type=category.type,
+                payment_method=rng.choice(['cash', 'pix', 'credit_card', 'debit_card']),
+                date=start + timedelta(days=rng.randint(0, 3650)),
+                tags=rng.choice(['', 'casa', 'casa,mercado', 'trabalho', 'viagem,lazer']),
+            ))
+            created += 1
+        Transaction.objects.bulk_create(batch, batch_size=batch_size)
+    return created
@@ -0,0 +1,127 @@
+"""
+Cache de respostas dos relatórios, por usuário.
+
+A chave combina endpoint, usuário, parâmetros da requisição e a versão de
+cada escopo de dados do qual o relatório depende ('transactions',
+'categories', 'goals'). Escritas nesses modelos incrementam a versão do
+escopo para o usuário, invalidando apenas os relatórios afetados.
+Views cujo período padrão depende da data atual definem
+`get_cache_period(request)`: o período resolvido entra na chave, e a virada
+do mês não serve o relatório do mês anterior.
+As respostas levam ETag; `If-None-Match` igual devolve 304.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction as db_transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'report-version:{user_id}:{scope}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'REPORT_CACHE_TIMEOUT', 300)
+
+
+def scope_version(user_id, scope):
+    """Versão atual do escopo para o usuário"""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id, scope=scope)
+    version = cache.get(key)
+    if version is None:
+        # Versão nova e única: nunca reaproveita entradas de versões perdidas
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(user_id, *scopes):
+    """
+    Invalida os relatórios do usuário que dependem dos escopos informados.
+    Repete a invalidação após o commit para descartar respostas calculadas
+    por requisições concorrentes antes da escrita ser confirmada.
+    """
+    def bump():
+        get_cache().set_many({
+            VERSION_KEY.format(user_id=user_id, scope=scope): time.time_ns()
+            for scope in scopes
+        }, None)
+
+    bump()
+    db_transaction.on_commit(bump)
+
+
+def make_etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def report_cache_key(request, endpoint, scopes, period=None):
+    user_id = request.user.pk
+    versions = ':'.join(str(scope_version(user_id, scope)) for scope in scopes)
+    params = sorted((key, request.query_params.getlist(key)) for key in request.query_params)
+    payload = json.dumps([params, period], cls=DjangoJSONEncoder)
+    params_hash = hashlib.md5(payload.encode('utf-8')).hexdigest()
+    return f'report:{endpoint}:{user_id}:{versions}:{params_hash}'
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = [value.strip() for value in header.split(',')]
+    return etag in candidates or '*' in candidates
+
+
+def resolved_period(view, request):
+    """Período efetivo da requisição, se a view o informar"""
+    get_period = getattr(view, 'get_cache_period', None)
+    if get_period is None:
+        return None
+    try:
+        return get_period(request)
+    except ValueError:
+        # Parâmetros inválidos: a view responde com erro, que não é armazenado
+        return None
+
+
+def cached_report(*scopes):
+    """
+    Decorator para o `get` de views de relatório.
+    Armazena os dados e o ETag da resposta; respostas de erro não são
+    armazenadas.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            cache = get_cache()
+            # Ações de ViewSets compartilham a classe: a ação entra na chave
+            endpoint = '.'.join(filter(None, [type(view).__name__, getattr(view, 'action', None)]))
+            key = report_cache_key(request, endpoint, scopes, resolved_period(view, request))
+            cached = cache.get(key)
+
+            if cached is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = {'data': response.data, 'etag': make_etag(response.data)}
+                cache.set(key, cached, get_timeout())
+
+            headers = {
+                'ETag': cached['etag'],
+                'Cache-Control': 'private, no-cache',
+                'Vary': 'Authorization',
+            }
+            if etag_matches(request, cached['etag']):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return Response(cached['data'], headers=headers)
+        return wrapper
+    return decorator
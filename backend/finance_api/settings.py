@@ -15,6 +15,8 @@ from pathlib import Path
 from decouple import config
 from datetime import timedelta
 
+from accounts.hasher_policies import policy_hashers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,6 +55,7 @@ INSTALLED_APPS = [
     'transactions',
     'goals',
     'categories',
+    'dashboard',
 ]
 
 MIDDLEWARE = [
@@ -92,11 +95,43 @@ WSGI_APPLICATION = 'finance_api.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite com transações BEGIN IMMEDIATE (ver finance_api/sqlite3/base.py)
+        'ENGINE': 'finance_api.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Tempo de espera pelo lock de escrita antes de "database is locked"
+            'timeout': 20,
+        },
+        'TEST': {
+            # Banco de testes em arquivo: o SQLite em memória compartilhada
+            # não espera pelo lock, o que inviabiliza testes com threads
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Padrão em memória local; use CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# e CACHE_LOCATION=/caminho/para/cache para compartilhar entre processos.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='finance-control'),
     }
 }
 
+# Tempo de vida (segundos) das respostas de relatórios em cache
+REPORT_CACHE_TIMEOUT = config('REPORT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Snapshot do usuário usado pela autenticação JWT: validade (segundos) no
+# cache do Django e no LRU de cada processo, e tamanho máximo do LRU
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+AUTH_USER_CACHE_LOCAL_TIMEOUT = config('AUTH_USER_CACHE_LOCAL_TIMEOUT', default=5, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1024, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -116,6 +151,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hash das senhas (accounts/hasher_policies.py). A política escolhe o algoritmo dos
+# hashes novos: pbkdf2, scrypt, argon2 (requer argon2-cffi) ou bcrypt (requer
+# bcrypt). Os demais hashers só verificam hashes antigos, regravados com a
+# política e o custo atuais no próximo login bem-sucedido.
+PASSWORD_HASHER_POLICY = config('PASSWORD_HASHER_POLICY', default='pbkdf2')
+PASSWORD_HASHER_OPTIONS = {
+    'pbkdf2': {'iterations': config('PBKDF2_ITERATIONS', default=600_000, cast=int)},
+    'scrypt': {
+        'work_factor': config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int),
+        'block_size': config('SCRYPT_BLOCK_SIZE', default=8, cast=int),
+        'parallelism': config('SCRYPT_PARALLELISM', default=1, cast=int),
+        'maxmem': config('SCRYPT_MAXMEM', default=0, cast=int),
+    },
+    'argon2': {
+        'time_cost': config('ARGON2_TIME_COST', default=2, cast=int),
+        'memory_cost': config('ARGON2_MEMORY_COST', default=102_400, cast=int),
+        'parallelism': config('ARGON2_PARALLELISM', default=8, cast=int),
+    },
+    'bcrypt': {'rounds': config('BCRYPT_ROUNDS', default=12, cast=int)},
+}
+PASSWORD_HASHERS = policy_hashers(PASSWORD_HASHER_POLICY)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -142,7 +199,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -220,6 +277,11 @@ CORS_ALLOW_HEADERS = [
 # Custom User Model (we'll create this)
 AUTH_USER_MODEL = 'accounts.User'
 
+# Login por email com uma única consulta ao usuário
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+]
+
 # Swagger/OpenAPI Documentation
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -0,0 +1,24 @@
+"""
+Backend SQLite que inicia as transações com BEGIN IMMEDIATE.
+
+Com o BEGIN padrão (DEFERRED) a transação começa sem lock e o primeiro
+comando pode ser uma leitura - o FTS5 lê sua configuração ao preparar o
+primeiro INSERT em transactions_transaction, e o delete() do Django
+consulta os objetos relacionados antes de excluir. Se outra conexão já está
+escrevendo, a promoção desse lock de leitura para escrita falha na hora com
+"database is locked", sem aguardar o timeout de OPTIONS.
+
+Com BEGIN IMMEDIATE todo atomic() - Transaction.save()/delete(), importação,
+saldos mensais, recorrências - pega o lock de escrita ao começar e espera
+pelo timeout. Os atomic() do projeto são todos de escrita.
+Equivale à opção "transaction_mode": "IMMEDIATE" do Django 5.1, que
+substitui este backend ao atualizar o Django.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _start_transaction_under_autocommit(self):
+        # Chamado pelo atomic() mais externo ao sair do autocommit
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -7,7 +7,6 @@ Integração com frontend React.
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
@@ -15,6 +14,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from accounts.views import CustomTokenObtainPairView
+
 # Configuração do Swagger/OpenAPI
 schema_view = get_schema_view(
     openapi.Info(
@@ -38,8 +39,8 @@ urlpatterns = [
     path('api/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('api/schema/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     
-    # Authentication endpoints
-    path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    # Authentication endpoints (login por e-mail, tokens com a claim token_version)
+    path('api/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
@@ -48,4 +49,5 @@ urlpatterns = [
     path('api/transactions/', include('transactions.urls')),
     path('api/goals/', include('goals.urls')),
     path('api/categories/', include('categories.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
 ]
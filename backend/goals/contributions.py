@@ -0,0 +1,203 @@
+"""
+Aplicação atômica de contribuições às metas.
+O saldo é incrementado no banco com F(), sob lock das linhas das metas,
+e a conclusão das metas que atingiram o objetivo acontece na mesma
+transação. Cada contribuição fica registrada em GoalContribution.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, models, transaction as db_transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+from finance_api.report_cache import invalidate
+from .models import Goal, GoalContribution
+
+
+def lock_goals(goal_ids):
+    """
+    Bloqueia as linhas das metas em ordem de id, evitando deadlocks entre
+    lotes concorrentes. No SQLite a escrita já serializa as transações, e
+    uma leitura antes do UPDATE só aumentaria a disputa pelo lock.
+    """
+    if connection.features.has_select_for_update:
+        list(
+            Goal.objects.select_for_update()
+            .filter(pk__in=goal_ids)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+
+class InactiveGoalsError(Exception):
+    """Metas que deixaram de estar ativas antes de receber as contribuições"""
+
+    def __init__(self, goal_ids):
+        self.goal_ids = goal_ids
+        super().__init__(f'Metas não ativas: {goal_ids}')
+
+
+def apply_contributions(contributions):
+    """
+    Aplica uma lista de (id da meta, valor, descrição) em uma única
+    transação. Retorna as contribuições registradas.
+    O status é conferido no próprio UPDATE, sob o lock: se alguma meta
+    deixou de estar ativa (concluída ou pausada por outra requisição),
+    nada é aplicado e InactiveGoalsError informa as metas ignoradas.
+    """
+    totals = defaultdict(Decimal)
+    for goal_id, amount, _ in contributions:
+        totals[goal_id] += Decimal(str(amount))
+    if not totals:
+        return []
+
+    goal_ids = sorted(totals)
+    with db_transaction.atomic():
+        lock_goals(goal_ids)
+        increment = models.Case(
+            *[models.When(pk=goal_id, then=models.Value(total)) for goal_id, total in totals.items()],
+            output_field=Goal._meta.get_field('current_amount')
+        )
+        updated = Goal.objects.filter(pk__in=goal_ids, status='active').update(
+            current_amount=F('current_amount') + increment,
+            updated_at=timezone.now()
+        )
+        if updated != len(goal_ids):
+            # Lido após o UPDATE, ainda sob o lock: o status não mudou desde então
+            active = set(
+                Goal.objects.filter(pk__in=goal_ids, status='active').values_list('pk', flat=True)
+            )
+            raise InactiveGoalsError([goal_id for goal_id in goal_ids if goal_id not in active])
+        Goal.objects.filter(pk__in=goal_ids).complete_reached()
+
+        created = GoalContribution.objects.bulk_create([
+            GoalContribution(goal_id=goal_id, amount=Decimal(str(amount)), description=description or '')
+            for goal_id, amount, description in contributions
+        ])
+
+        invalidate_goal_owners(Goal.objects.filter(pk__in=goal_ids))
+    return created
+
+
+def invalidate_goal_owners(goals):
+    """update() não dispara post_save: invalida os relatórios dos donos das metas"""
+    user_ids = goals.order_by().values_list('user_id', flat=True).distinct()
+    for user_id in user_ids:
+        invalidate(user_id, 'goals')
+
+
+AUTO_SAVE_CHUNK_SIZE = 1000
+AUTO_SAVE_DESCRIPTION = 'Economia automática'
+# Tentativas de um bloco que colidiu com outra execução no mesmo mês
+AUTO_SAVE_RETRIES = 3
+
+
+def auto_save_goals():
+    """Metas ativas com economia automática"""
+    return Goal.objects.filter(
+        status='active',
+        auto_save=True,
+        monthly_contribution__isnull=False
+    )
+
+
+def pending_auto_save(period):
+    """Metas ativas com economia automática ainda sem contribuição no mês"""
+    applied = GoalContribution.objects.filter(goal=OuterRef('pk'), period=period)
+    return auto_save_goals().filter(~Exists(applied))
+
+
+def record_auto_save(goal_ids, period):
+    """
+    Registra as contribuições automáticas do mês com um único
+    INSERT ... SELECT, lendo o valor mensal diretamente das metas.
+    O status e a economia automática são conferidos no próprio SELECT:
+    metas pausadas, concluídas ou sem economia automática desde a seleção
+    do bloco não recebem contribuição. Retorna quantas foram registradas.
+    """
+    rows = (
+        auto_save_goals()
+        .filter(pk__in=goal_ids)
+        .order_by()
+        .annotate(
+            contribution_description=models.Value(AUTO_SAVE_DESCRIPTION, models.CharField()),
+            contribution_source=models.Value('auto_save', models.CharField()),
+            contribution_period=models.Value(period, models.DateField()),
+            contribution_created_at=models.Value(timezone.now(), models.DateTimeField()),
+        )
+        .values_list(
+            'pk', 'monthly_contribution', 'contribution_description',
+            'contribution_source', 'contribution_period', 'contribution_created_at'
+        )
+    )
+    select_sql, params = rows.query.sql_with_params()
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(GoalContribution._meta.get_field(name).column)
+        for name in ['goal', 'amount', 'description', 'source', 'period', 'created_at']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(GoalContribution._meta.db_table)} ({columns}) {select_sql}',
+            params
+        )
+        return cursor.rowcount
+
+
+def apply_auto_save(period=None, chunk_size=AUTO_SAVE_CHUNK_SIZE):
+    """
+    Aplica a contribuição mensal das metas com economia automática,
+    em blocos de até `chunk_size` metas por transação. Cada bloco registra
+    as contribuições com o mês de referência e soma os valores registrados
+    às metas em uma única atualização, seguida da conclusão das metas
+    atingidas; reexecutar no mesmo mês não aplica nada. Um bloco que colide
+    com outra execução é buscado de novo, até AUTO_SAVE_RETRIES vezes.
+    Retorna a quantidade de contribuições aplicadas.
+    """
+    period = (period or timezone.localdate()).replace(day=1)
+    applied = 0
+    last_id = 0
+    retries = 0
+
+    while True:
+        goal_ids = list(
+            pending_auto_save(period)
+            .filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not goal_ids:
+            return applied
+
+        credited_ids = []
+        try:
+            with db_transaction.atomic():
+                lock_goals(goal_ids)
+                if record_auto_save(goal_ids, period):
+                    # Sem IntegrityError, as contribuições do mês nessas metas
+                    # são as registradas acima
+                    credited_ids = list(
+                        GoalContribution.objects
+                        .filter(goal_id__in=goal_ids, period=period)
+                        .values_list('goal_id', flat=True)
+                    )
+                    credited = Goal.objects.filter(pk__in=credited_ids)
+                    contribution = GoalContribution.objects.filter(
+                        goal=OuterRef('pk'), period=period
+                    ).order_by().values('amount')
+                    credited.update(
+                        current_amount=F('current_amount') + Subquery(contribution),
+                        updated_at=timezone.now()
+                    )
+                    credited.complete_reached()
+                    invalidate_goal_owners(credited)
+        except IntegrityError:
+            # Outra execução aplicou parte do bloco: busca novamente os pendentes
+            retries += 1
+            if retries > AUTO_SAVE_RETRIES:
+                raise
+            continue
+        retries = 0
+        applied += len(credited_ids)
+        last_id = goal_ids[-1]
@@ -0,0 +1,23 @@
+from rest_framework.filters import OrderingFilter
+
+
+class AliasedOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter que traduz os nomes públicos de ordenação para
+    expressões ordenáveis no banco, via `ordering_aliases` da view
+    (ex: 'priority' -> 'priority_rank').
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        aliases = getattr(view, 'ordering_aliases', {})
+        if not ordering or not aliases:
+            return ordering
+        return [self.translate(term, aliases) for term in ordering]
+
+    @staticmethod
+    def translate(term, aliases):
+        descending = term.startswith('-')
+        field = term.lstrip('-')
+        field = aliases.get(field, field)
+        return f'-{field}' if descending else field
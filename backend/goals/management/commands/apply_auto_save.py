@@ -0,0 +1,39 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from goals.contributions import AUTO_SAVE_CHUNK_SIZE, apply_auto_save
+
+
+class Command(BaseCommand):
+    help = 'Aplica a contribuição mensal das metas com economia automática (seguro para reexecutar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Mês de referência (YYYY-MM). Padrão: mês atual')
+        parser.add_argument(
+            '--chunk-size', type=int, default=AUTO_SAVE_CHUNK_SIZE,
+            help=f'Metas por transação (padrão: {AUTO_SAVE_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Executa continuamente, aguardando N segundos entre as execuções'
+        )
+
+    def handle(self, *args, **options):
+        period = None
+        if options['month']:
+            try:
+                period = date.fromisoformat(f"{options['month']}-01")
+            except ValueError:
+                raise CommandError('Mês inválido. Use YYYY-MM.')
+
+        while True:
+            start = time.perf_counter()
+            applied = apply_auto_save(period=period, chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{applied} contribuições automáticas aplicadas em {time.perf_counter() - start:.2f}s'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
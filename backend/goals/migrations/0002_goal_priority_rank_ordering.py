@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='goal',
+            options={'ordering': [models.OrderBy(models.Case(models.When(priority='urgent', then=models.Value(4)), models.When(priority='high', then=models.Value(3)), models.When(priority='medium', then=models.Value(2)), models.When(priority='low', then=models.Value(1)), default=models.Value(0), output_field=models.IntegerField()), descending=True), '-created_at'], 'verbose_name': 'Meta', 'verbose_name_plural': 'Metas'},
+        ),
+    ]
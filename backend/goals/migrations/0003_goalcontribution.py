@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:24
+
+from decimal import Decimal
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0002_goal_priority_rank_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Valor')),
+                ('description', models.CharField(blank=True, default='', max_length=200, verbose_name='Descrição')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributions', to='goals.goal', verbose_name='Meta')),
+            ],
+            options={
+                'verbose_name': 'Contribuição',
+                'verbose_name_plural': 'Contribuições',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['goal', 'created_at'], name='goals_goalc_goal_id_f111a8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0003_goalcontribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goalcontribution',
+            name='period',
+            field=models.DateField(blank=True, null=True, verbose_name='Mês de Referência'),
+        ),
+        migrations.AddField(
+            model_name='goalcontribution',
+            name='source',
+            field=models.CharField(choices=[('manual', 'Manual'), ('auto_save', 'Economia Automática')], default='manual', max_length=20, verbose_name='Origem'),
+        ),
+        migrations.AddConstraint(
+            model_name='goalcontribution',
+            constraint=models.UniqueConstraint(fields=('goal', 'period'), name='unique_goal_contribution_period'),
+        ),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
+from django.db.models import Value
+from django.db.models.functions import Cast, Least
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from decimal import Decimal
@@ -6,6 +9,52 @@ from decimal import Decimal
 User = get_user_model()
 
 
+def progress_expression():
+    """
+    Expressão SQL equivalente a Goal.progress_percentage: current/target
+    em porcentagem, limitada a 100. Os valores são convertidos para float
+    para evitar divisão inteira no SQLite.
+    """
+    ratio = (
+        Cast('current_amount', models.FloatField()) * Value(100.0)
+        / Cast('target_amount', models.FloatField())
+    )
+    return models.Case(
+        models.When(target_amount__gt=0, then=Least(ratio, Value(100.0))),
+        default=Value(0.0),
+        output_field=models.FloatField()
+    )
+
+
+def priority_rank_expression():
+    """Prioridade como número ordenável (urgente = 4 ... baixa = 1)"""
+    return models.Case(
+        models.When(priority='urgent', then=Value(4)),
+        models.When(priority='high', then=Value(3)),
+        models.When(priority='medium', then=Value(2)),
+        models.When(priority='low', then=Value(1)),
+        default=Value(0),
+        output_field=models.IntegerField()
+    )
+
+
+class GoalQuerySet(models.QuerySet):
+    
+    def complete_reached(self):
+        """Conclui, em uma única atualização, as metas ativas que atingiram o objetivo"""
+        return self.filter(
+            status='active',
+            current_amount__gte=models.F('target_amount')
+        ).update(status='completed', completed_at=timezone.now())
+    
+    def with_ranking(self):
+        """Anota `priority_rank` e `progress`, permitindo ordenar no banco"""
+        return self.annotate(
+            priority_rank=priority_rank_expression(),
+            progress=progress_expression()
+        )
+
+
 class Goal(models.Model):
     """
     Modelo para metas financeiras dos usuários.
@@ -99,10 +148,12 @@ class Goal(models.Model):
         verbose_name="Contribuição Mensal"
     )
     
+    objects = GoalQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Meta"
         verbose_name_plural = "Metas"
-        ordering = ['-priority', '-created_at']
+        ordering = [priority_rank_expression().desc(), '-created_at']
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['user', 'target_date']),
@@ -112,6 +163,15 @@ class Goal(models.Model):
     def __str__(self):
         return f"{self.title} - R$ {self.target_amount}"
     
+    def save(self, *args, **kwargs):
+        # A contagem de metas do usuário é atualizada na mesma transação do banco
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            return super().delete(*args, **kwargs)
+    
     @property
     def progress_percentage(self):
         """Calcula a porcentagem de progresso da meta"""
@@ -138,14 +198,17 @@ class Goal(models.Model):
             return max(delta.days, 0)
         return None
     
-    def add_contribution(self, amount):
-        """Adiciona uma contribuição à meta"""
-        self.current_amount += Decimal(str(amount))
-        if self.is_completed and self.status == 'active':
-            self.status = 'completed'
-            from django.utils import timezone
-            self.completed_at = timezone.now()
-        self.save()
+    def add_contribution(self, amount, description=''):
+        """
+        Adiciona uma contribuição à meta de forma atômica (F() sob lock),
+        registrando-a no histórico de contribuições. Levanta
+        InactiveGoalsError se a meta não estiver ativa.
+        """
+        from .contributions import apply_contributions
+        
+        contribution, = apply_contributions([(self.pk, amount, description)])
+        self.refresh_from_db(fields=['current_amount', 'status', 'completed_at', 'updated_at'])
+        return contribution
     
     def get_monthly_target(self):
         """Calcula quanto deve ser economizado por mês para atingir a meta"""
@@ -153,3 +216,46 @@ class Goal(models.Model):
             months_remaining = max(self.days_remaining / 30, 1)
             return self.remaining_amount / Decimal(str(months_remaining))
         return self.remaining_amount
+
+
+class GoalContribution(models.Model):
+    """
+    Histórico de contribuições feitas às metas.
+    """
+    SOURCES = [
+        ('manual', 'Manual'),
+        ('auto_save', 'Economia Automática'),
+    ]
+    
+    goal = models.ForeignKey(
+        Goal,
+        on_delete=models.CASCADE,
+        related_name='contributions',
+        verbose_name="Meta"
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.01'))],
+        verbose_name="Valor"
+    )
+    description = models.CharField(max_length=200, blank=True, default='', verbose_name="Descrição")
+    source = models.CharField(max_length=20, choices=SOURCES, default='manual', verbose_name="Origem")
+    # Mês de referência das contribuições automáticas
+    period = models.DateField(blank=True, null=True, verbose_name="Mês de Referência")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    
+    class Meta:
+        verbose_name = "Contribuição"
+        verbose_name_plural = "Contribuições"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['goal', 'created_at']),
+        ]
+        constraints = [
+            # Uma contribuição automática por meta e mês: reexecuções não duplicam
+            models.UniqueConstraint(fields=['goal', 'period'], name='unique_goal_contribution_period'),
+        ]
+    
+    def __str__(self):
+        return f"{self.goal_id}: R$ {self.amount}"
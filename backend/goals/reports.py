@@ -0,0 +1,59 @@
+"""
+Motor de agregação para o resumo de metas.
+Calcula contagens, totais, progresso médio e distribuições por prioridade
+e categoria em duas consultas.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.db.models import Avg, Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Goal, progress_expression
+
+PRIORITY_ORDER = ['urgent', 'high', 'medium', 'low']
+
+
+def _decimal_sum(field):
+    return Coalesce(
+        Sum(field),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def summarize_goals(queryset):
+    """Resumo das metas de um queryset (normalmente as metas de um usuário)"""
+    active = Q(status='active')
+    data = queryset.aggregate(
+        total_goals=Count('id'),
+        active_goals=Count('id', filter=active),
+        completed_goals=Count('id', filter=Q(status='completed')),
+        total_target_amount=_decimal_sum('target_amount'),
+        total_current_amount=_decimal_sum('current_amount'),
+        average_progress=Avg(progress_expression(), filter=active),
+    )
+    data['total_remaining_amount'] = data['total_target_amount'] - data['total_current_amount']
+    data['average_progress'] = data['average_progress'] or 0
+
+    # Distribuição das metas ativas por prioridade e categoria
+    rows = (
+        queryset
+        .filter(active)
+        .values('priority', 'category')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    by_priority = Counter()
+    by_category = Counter()
+    for row in rows:
+        by_priority[row['priority']] += row['count']
+        by_category[row['category']] += row['count']
+
+    data['goals_by_priority'] = {priority: by_priority[priority] for priority in PRIORITY_ORDER}
+    data['goals_by_category'] = {
+        label: by_category[value]
+        for value, label in Goal.GOAL_CATEGORIES
+        if by_category[value] > 0
+    }
+    return data
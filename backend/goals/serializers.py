@@ -59,6 +59,36 @@ class GoalContributionSerializer(serializers.Serializer):
         return value
 
 
+class GoalBatchContributionItemSerializer(GoalContributionSerializer):
+    """Item de um lote de contribuições"""
+    goal = serializers.IntegerField()
+
+
+class GoalBatchContributionSerializer(serializers.Serializer):
+    """Serializer para lote de contribuições aplicado em uma única transação"""
+    contributions = GoalBatchContributionItemSerializer(many=True, allow_empty=False)
+    
+    def validate_contributions(self, value):
+        """Valida se todas as metas pertencem ao usuário e estão ativas"""
+        user = self.context['request'].user
+        goal_ids = {item['goal'] for item in value}
+        statuses = dict(
+            Goal.objects.filter(user=user, pk__in=goal_ids).order_by().values_list('pk', 'status')
+        )
+        errors = []
+        for item in value:
+            goal_status = statuses.get(item['goal'])
+            if goal_status is None:
+                errors.append({'goal': 'Meta não encontrada.'})
+            elif goal_status != 'active':
+                errors.append({'goal': 'Só é possível contribuir para metas ativas'})
+            else:
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return value
+
+
 class GoalSummarySerializer(serializers.Serializer):
     """Serializer para resumo de metas"""
     total_goals = serializers.IntegerField()
@@ -0,0 +1,27 @@
+"""
+Sinais que invalidam os relatórios dependentes das metas e mantêm a
+contagem de metas do usuário.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts import stats as user_stats
+from finance_api.report_cache import invalidate
+from .models import Goal
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_goal_reports(sender, instance, **kwargs):
+    invalidate(instance.user_id, 'goals')
+
+
+@receiver(post_save, sender=Goal)
+def count_created_goal(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        user_stats.apply_delta(instance.user_id, goals=1)
+
+
+@receiver(post_delete, sender=Goal)
+def count_deleted_goal(sender, instance, **kwargs):
+    user_stats.apply_delta(instance.user_id, goals=-1)
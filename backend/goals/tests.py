@@ -1,3 +1,347 @@
-from django.test import TestCase
+import threading
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .contributions import AUTO_SAVE_RETRIES, InactiveGoalsError, apply_auto_save
+from .models import Goal, GoalContribution
+from .serializers import GoalBatchContributionSerializer
+
+User = get_user_model()
+
+
+class GoalTestMixin:
+    """Dados base compartilhados pelos testes de metas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_goal(self, target, current='0.00', **kwargs):
+        kwargs.setdefault('title', 'Meta')
+        kwargs.setdefault('category', 'emergency')
+        kwargs.setdefault('target_date', date(2030, 1, 1))
+        return Goal.objects.create(
+            user=kwargs.pop('user', self.user),
+            target_amount=Decimal(target),
+            current_amount=Decimal(current),
+            **kwargs
+        )
+
+
+class GoalSummaryTests(GoalTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_goal('1000.00', '250.00', priority='high', category='vacation')
+        self.create_goal('200.00', '300.00', priority='urgent', category='vacation')
+        self.create_goal('100.00', '50.00', priority='low', category='car')
+        self.create_goal('500.00', '500.00', status='completed', category='house')
+        self.create_goal('800.00', '100.00', status='paused', priority='high')
+
+    def test_summary_values(self):
+        response = self.client.get(reverse('goal-summary'))
+
+        self.assertEqual(response.data['total_goals'], 5)
+        self.assertEqual(response.data['active_goals'], 3)
+        self.assertEqual(response.data['completed_goals'], 1)
+        self.assertEqual(Decimal(response.data['total_target_amount']), Decimal('2600.00'))
+        self.assertEqual(Decimal(response.data['total_current_amount']), Decimal('1200.00'))
+        self.assertEqual(Decimal(response.data['total_remaining_amount']), Decimal('1400.00'))
+        # (25 + 100 (limitado) + 50) / 3
+        self.assertAlmostEqual(response.data['average_progress'], 175 / 3)
+        self.assertEqual(
+            response.data['goals_by_priority'],
+            {'urgent': 1, 'high': 1, 'medium': 0, 'low': 1}
+        )
+        self.assertEqual(
+            response.data['goals_by_category'],
+            {'Viagem/Férias': 2, 'Veículo': 1}
+        )
+
+    def test_summary_runs_two_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('goal-summary'))
+
+    def test_summary_without_goals(self):
+        Goal.objects.all().delete()
+
+        response = self.client.get(reverse('goal-summary'))
+
+        self.assertEqual(response.data['total_goals'], 0)
+        self.assertEqual(response.data['average_progress'], 0)
+        self.assertEqual(response.data['goals_by_category'], {})
+
+
+class GoalOrderingTests(GoalTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.low = self.create_goal('100.00', '90.00', title='Baixa', priority='low')
+        self.urgent = self.create_goal('100.00', '10.00', title='Urgente', priority='urgent')
+        self.medium = self.create_goal('100.00', '50.00', title='Média', priority='medium')
+        self.high = self.create_goal('100.00', '0.00', title='Alta', priority='high')
+
+    def titles(self, **params):
+        response = self.client.get(reverse('goal-list'), params)
+        return [goal['title'] for goal in response.data['results']]
+
+    def test_default_ordering_uses_priority_rank(self):
+        self.assertEqual(self.titles(), ['Urgente', 'Alta', 'Média', 'Baixa'])
+
+    def test_ordering_by_priority(self):
+        self.assertEqual(self.titles(ordering='priority'), ['Baixa', 'Média', 'Alta', 'Urgente'])
+
+    def test_ordering_by_progress(self):
+        self.assertEqual(
+            self.titles(ordering='-progress_percentage'),
+            ['Baixa', 'Média', 'Urgente', 'Alta']
+        )
+
+    def test_by_priority_runs_a_single_query(self):
+        self.create_goal('100.00', title='Outra urgente', priority='urgent', target_date=date(2029, 1, 1))
+        self.create_goal('100.00', title='Pausada', priority='high', status='paused')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('goal-by-priority'))
+
+        self.assertEqual(list(response.data), ['urgent', 'high', 'medium', 'low'])
+        self.assertEqual(
+            [goal['title'] for goal in response.data['urgent']],
+            ['Outra urgente', 'Urgente']
+        )
+        self.assertEqual([goal['title'] for goal in response.data['high']], ['Alta'])
+
+
+class GoalContributionTests(GoalTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.goal = self.create_goal('100.00', '40.00')
+
+    def test_contribution_is_recorded(self):
+        response = self.client.post(
+            reverse('goal-contribute', args=[self.goal.pk]),
+            {'amount': '25.50', 'description': 'Bônus'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['goal']['current_amount']), Decimal('65.50'))
+        contribution = GoalContribution.objects.get()
+        self.assertEqual(contribution.goal, self.goal)
+        self.assertEqual(contribution.amount, Decimal('25.50'))
+        self.assertEqual(contribution.description, 'Bônus')
+
+    def test_contribution_completes_goal(self):
+        self.goal.add_contribution(Decimal('60.00'))
+
+        self.assertEqual(self.goal.status, 'completed')
+        self.assertIsNotNone(self.goal.completed_at)
+        self.assertEqual(self.goal.current_amount, Decimal('100.00'))
+
+    def test_contribution_invalidates_summary(self):
+        self.client.get(reverse('goal-summary'))
+        self.goal.add_contribution(Decimal('10.00'))
+
+        response = self.client.get(reverse('goal-summary'))
+
+        self.assertEqual(Decimal(response.data['total_current_amount']), Decimal('50.00'))
+
+    def test_batch_contribution(self):
+        other = self.create_goal('50.00', title='Outra')
+
+        response = self.client.post(reverse('goal-contribute-batch'), {'contributions': [
+            {'goal': self.goal.pk, 'amount': '10.00'},
+            {'goal': self.goal.pk, 'amount': '5.00', 'description': 'Extra'},
+            {'goal': other.pk, 'amount': '50.00'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.goal.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.goal.current_amount, Decimal('55.00'))
+        self.assertEqual(other.status, 'completed')
+        self.assertEqual(GoalContribution.objects.count(), 3)
+
+    def test_batch_contribution_is_all_or_nothing(self):
+        paused = self.create_goal('50.00', status='paused')
+        foreign_user = User.objects.create_user(username='outro', email='outro@example.com', password='x')
+        foreign = self.create_goal('50.00', user=foreign_user)
+
+        response = self.client.post(reverse('goal-contribute-batch'), {'contributions': [
+            {'goal': self.goal.pk, 'amount': '10.00'},
+            {'goal': paused.pk, 'amount': '10.00'},
+            {'goal': foreign.pk, 'amount': '10.00'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['contributions'][0], {})
+        self.assertIn('goal', response.data['contributions'][1])
+        self.assertIn('goal', response.data['contributions'][2])
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.current_amount, Decimal('40.00'))
+        self.assertFalse(GoalContribution.objects.exists())
+
+    def test_goal_deactivated_after_validation_is_skipped(self):
+        other = self.create_goal('50.00', title='Outra')
+        # Outra requisição pausa a meta entre a validação e o lock
+        validate = GoalBatchContributionSerializer.validate_contributions
+
+        def validate_then_pause(serializer, value):
+            value = validate(serializer, value)
+            Goal.objects.filter(pk=other.pk).update(status='paused')
+            return value
+
+        with mock.patch.object(GoalBatchContributionSerializer, 'validate_contributions', validate_then_pause):
+            response = self.client.post(reverse('goal-contribute-batch'), {'contributions': [
+                {'goal': self.goal.pk, 'amount': '10.00'},
+                {'goal': other.pk, 'amount': '10.00'},
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['skipped_goals'], [other.pk])
+        self.goal.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.goal.current_amount, other.current_amount), (Decimal('40.00'), Decimal('0.00')))
+        self.assertFalse(GoalContribution.objects.exists())
+
+    def test_contribution_to_inactive_goal_is_rejected(self):
+        Goal.objects.filter(pk=self.goal.pk).update(status='completed')
+
+        with self.assertRaises(InactiveGoalsError):
+            self.goal.add_contribution(Decimal('10.00'))
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.current_amount, Decimal('40.00'))
+
+
+class GoalAutoSaveTests(GoalTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.saving = self.create_goal('1000.00', '100.00', auto_save=True, monthly_contribution=Decimal('150.00'))
+        self.finishing = self.create_goal('300.00', '250.00', auto_save=True, monthly_contribution=Decimal('50.00'))
+        self.manual = self.create_goal('1000.00', monthly_contribution=Decimal('50.00'))
+        self.paused = self.create_goal('1000.00', status='paused', auto_save=True, monthly_contribution=Decimal('50.00'))
+
+    def test_applies_monthly_contribution(self):
+        applied = apply_auto_save(date(2024, 3, 15))
+
+        self.assertEqual(applied, 2)
+        for goal in (self.saving, self.finishing, self.manual, self.paused):
+            goal.refresh_from_db()
+        self.assertEqual(self.saving.current_amount, Decimal('250.00'))
+        self.assertEqual(self.finishing.status, 'completed')
+        self.assertIsNotNone(self.finishing.completed_at)
+        self.assertEqual(self.manual.current_amount, Decimal('0.00'))
+        self.assertEqual(self.paused.current_amount, Decimal('0.00'))
+        contribution = GoalContribution.objects.get(goal=self.saving)
+        self.assertEqual(contribution.source, 'auto_save')
+        self.assertEqual(contribution.period, date(2024, 3, 1))
+        self.assertEqual(contribution.amount, Decimal('150.00'))
+
+    def test_rerun_in_same_month_does_nothing(self):
+        apply_auto_save(date(2024, 3, 1))
+
+        self.assertEqual(apply_auto_save(date(2024, 3, 31)), 0)
+        self.assertEqual(apply_auto_save(date(2024, 4, 1)), 1)
+        self.saving.refresh_from_db()
+        self.assertEqual(self.saving.current_amount, Decimal('400.00'))
+
+    def test_processes_in_chunks(self):
+        for _ in range(5):
+            self.create_goal('1000.00', auto_save=True, monthly_contribution=Decimal('10.00'))
+
+        # 4 blocos de 8 consultas (com savepoint) + a busca final, vazia
+        with self.assertNumQueries(4 * 8 + 1):
+            applied = apply_auto_save(date(2024, 3, 1), chunk_size=2)
+
+        self.assertEqual(applied, 7)
+        self.assertEqual(GoalContribution.objects.filter(period=date(2024, 3, 1)).count(), 7)
+
+    def test_goal_changed_after_selection_is_not_credited(self):
+        # Outra requisição pausa uma meta e desliga a economia de outra
+        # depois da seleção do bloco, antes da transação
+        def change_goals(goal_ids):
+            Goal.objects.filter(pk=self.saving.pk).update(status='paused')
+            Goal.objects.filter(pk=self.finishing.pk).update(auto_save=False)
+
+        extra = self.create_goal('1000.00', auto_save=True, monthly_contribution=Decimal('10.00'))
+        with mock.patch('goals.contributions.lock_goals', side_effect=change_goals):
+            applied = apply_auto_save(date(2024, 3, 1))
+
+        self.assertEqual(applied, 1)
+        self.assertEqual(list(GoalContribution.objects.values_list('goal_id', flat=True)), [extra.pk])
+        self.saving.refresh_from_db()
+        self.finishing.refresh_from_db()
+        self.assertEqual((self.saving.current_amount, self.finishing.current_amount), (Decimal('100.00'), Decimal('250.00')))
+        self.assertEqual(self.finishing.status, 'active')
+
+    def test_repeated_integrity_errors_are_raised(self):
+        with mock.patch('goals.contributions.record_auto_save', side_effect=IntegrityError) as record:
+            with self.assertRaises(IntegrityError):
+                apply_auto_save(date(2024, 3, 1))
+
+        self.assertEqual(record.call_count, AUTO_SAVE_RETRIES + 1)
+
+    def test_default_period_is_the_local_month(self):
+        # 31/03 às 23h30 em São Paulo, já 01/04 em UTC
+        now = datetime(2024, 4, 1, 2, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            apply_auto_save()
+
+        self.assertEqual(set(GoalContribution.objects.values_list('period', flat=True)), {date(2024, 3, 1)})
+
+    def test_command(self):
+        out = StringIO()
+        call_command('apply_auto_save', month='2024-03', stdout=out)
+
+        self.assertIn('2 contribuições automáticas aplicadas', out.getvalue())
+
+
+class GoalContributionConcurrencyTests(GoalTestMixin, TransactionTestCase):
+    """Contribuições simultâneas, cada thread com sua própria conexão"""
+    threads = 8
+    contributions_per_thread = 10
+
+    def contribute(self, goal_id, errors):
+        try:
+            goal = Goal.objects.get(pk=goal_id)
+            for _ in range(self.contributions_per_thread):
+                goal.add_contribution(Decimal('1.00'))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_concurrent_contributions_are_not_lost(self):
+        total = self.threads * self.contributions_per_thread
+        goal = self.create_goal(str(total))
+        errors = []
+        workers = [
+            threading.Thread(target=self.contribute, args=(goal.pk, errors))
+            for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        goal.refresh_from_db()
+        self.assertEqual(goal.current_amount, Decimal(total))
+        self.assertEqual(goal.status, 'completed')
+        self.assertEqual(GoalContribution.objects.filter(goal=goal).count(), total)
@@ -8,5 +8,6 @@ router.register(r'goals', views.GoalViewSet, basename='goal')
 urlpatterns = [
     path('', include(router.urls)),
     path('summary/', views.GoalSummaryView.as_view(), name='goal-summary'),
+    path('contribute/', views.GoalBatchContributionView.as_view(), name='goal-contribute-batch'),
     path('<int:goal_id>/contribute/', views.GoalContributionView.as_view(), name='goal-contribute'),
 ]
@@ -2,13 +2,19 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.filters import SearchFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, Avg, Count
+from finance_api.report_cache import cached_report
+from .filters import AliasedOrderingFilter
+from .contributions import InactiveGoalsError, apply_contributions
 from .models import Goal
+from .reports import PRIORITY_ORDER, summarize_goals
 from .serializers import (
     GoalSerializer, 
     GoalCreateSerializer, 
     GoalContributionSerializer,
+    GoalBatchContributionSerializer,
     GoalSummarySerializer
 )
 
@@ -17,14 +23,20 @@ class GoalViewSet(viewsets.ModelViewSet):
     """ViewSet para operações CRUD de metas"""
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, SearchFilter, AliasedOrderingFilter]
     filterset_fields = ['status', 'priority', 'category']
     search_fields = ['title', 'description']
     ordering_fields = ['target_date', 'priority', 'created_at', 'progress_percentage']
     ordering = ['-priority', 'target_date']
+    # Prioridade e progresso são ordenados pelas anotações do banco
+    ordering_aliases = {
+        'priority': 'priority_rank',
+        'progress_percentage': 'progress',
+    }
     
     def get_queryset(self):
         # Usuários só veem suas próprias metas
-        return Goal.objects.filter(user=self.request.user)
+        return Goal.objects.filter(user=self.request.user).with_ranking()
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -48,18 +60,11 @@ class GoalViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def by_priority(self, request):
         """Retorna metas agrupadas por prioridade"""
-        queryset = self.get_queryset().filter(status='active')
+        goals = self.get_queryset().filter(status='active').order_by('-priority_rank', 'target_date')
         
-        priorities = {
-            'urgent': queryset.filter(priority='urgent'),
-            'high': queryset.filter(priority='high'),
-            'medium': queryset.filter(priority='medium'),
-            'low': queryset.filter(priority='low'),
-        }
-        
-        result = {}
-        for priority, goals in priorities.items():
-            result[priority] = GoalSerializer(goals, many=True).data
+        result = {priority: [] for priority in PRIORITY_ORDER}
+        for goal_data in GoalSerializer(goals, many=True).data:
+            result[goal_data['priority']].append(goal_data)
         
         return Response(result)
     
@@ -86,52 +91,10 @@ class GoalSummaryView(APIView):
     """View para resumo de metas"""
     permission_classes = [permissions.IsAuthenticated]
     
+    @cached_report('goals')
     def get(self, request):
         """Retorna resumo das metas do usuário"""
-        user = request.user
-        goals = Goal.objects.filter(user=user)
-        
-        # Contadores básicos
-        total_goals = goals.count()
-        active_goals = goals.filter(status='active').count()
-        completed_goals = goals.filter(status='completed').count()
-        
-        # Valores totais
-        total_target = goals.aggregate(Sum('target_amount'))['target_amount__sum'] or 0
-        total_current = goals.aggregate(Sum('current_amount'))['current_amount__sum'] or 0
-        total_remaining = total_target - total_current
-        
-        # Progresso médio
-        active_goals_queryset = goals.filter(status='active')
-        if active_goals_queryset.exists():
-            average_progress = sum([goal.progress_percentage for goal in active_goals_queryset]) / active_goals_queryset.count()
-        else:
-            average_progress = 0
-        
-        # Metas por prioridade
-        goals_by_priority = {}
-        for priority in ['urgent', 'high', 'medium', 'low']:
-            count = goals.filter(priority=priority, status='active').count()
-            goals_by_priority[priority] = count
-        
-        # Metas por categoria
-        goals_by_category = {}
-        for category in Goal.GOAL_CATEGORIES:
-            count = goals.filter(category=category[0], status='active').count()
-            if count > 0:
-                goals_by_category[category[1]] = count
-        
-        summary_data = {
-            'total_goals': total_goals,
-            'active_goals': active_goals,
-            'completed_goals': completed_goals,
-            'total_target_amount': total_target,
-            'total_current_amount': total_current,
-            'total_remaining_amount': total_remaining,
-            'average_progress': average_progress,
-            'goals_by_priority': goals_by_priority,
-            'goals_by_category': goals_by_category
-        }
+        summary_data = summarize_goals(Goal.objects.filter(user=request.user))
         
         serializer = GoalSummarySerializer(summary_data)
         return Response(serializer.data)
@@ -155,8 +118,13 @@ class GoalContributionView(APIView):
             amount = serializer.validated_data['amount']
             description = serializer.validated_data.get('description', '')
             
-            # Adicionar contribuição
-            goal.add_contribution(amount)
+            # Adicionar contribuição (o status é conferido de novo sob o lock)
+            try:
+                goal.add_contribution(amount, description)
+            except InactiveGoalsError:
+                return Response({
+                    'error': 'Só é possível contribuir para metas ativas'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
             # Criar registro da transação (opcional - pode ser implementado depois)
             # Transaction.objects.create(
@@ -175,3 +143,32 @@ class GoalContributionView(APIView):
             }, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class GoalBatchContributionView(APIView):
+    """View para aplicar várias contribuições em uma única transação"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        """Aplica todas as contribuições ou nenhuma"""
+        serializer = GoalBatchContributionSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        
+        items = serializer.validated_data['contributions']
+        try:
+            apply_contributions([
+                (item['goal'], item['amount'], item.get('description', ''))
+                for item in items
+            ])
+        except InactiveGoalsError as exc:
+            # Metas concluídas ou pausadas depois da validação
+            return Response({
+                'error': 'Só é possível contribuir para metas ativas',
+                'skipped_goals': exc.goal_ids
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        goals = Goal.objects.filter(user=request.user, pk__in={item['goal'] for item in items})
+        return Response({
+            'message': f'{len(items)} contribuições adicionadas com sucesso',
+            'goals': GoalSerializer(goals, many=True).data
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,158 @@
+"""
+Manutenção incremental da tabela MonthlyBalance.
+Cada escrita de transação aplica um delta (valor, quantidade) na linha
+(usuário, mês, tipo, categoria) correspondente.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from finance_api.report_cache import invalidate
+from .models import Transaction, MonthlyBalance
+
+BALANCE_FIELDS = ['user_id', 'date', 'type', 'category_id', 'amount']
+BALANCE_KEY_FIELDS = ['user_id', 'month', 'type', 'category_id']
+
+
+def balance_key(user_id, day, type, category_id):
+    """Chave da linha de saldo mensal de uma transação"""
+    day = Transaction._meta.get_field('date').to_python(day)
+    return (user_id, day.replace(day=1), type, category_id)
+
+
+def transaction_values(instance):
+    """Extrai de uma transação os campos que afetam o saldo mensal"""
+    return {field: getattr(instance, field) for field in BALANCE_FIELDS}
+
+
+def apply_delta(key, amount, count):
+    """Soma `amount` e `count` na linha de saldo identificada por `key`"""
+    user_id, month, type, category_id = key
+    lookup = {
+        'user_id': user_id,
+        'month': month,
+        'type': type,
+        'category_id': category_id,
+    }
+    rows = MonthlyBalance.objects.filter(**lookup)
+    updated = rows.update(total=F('total') + amount, count=F('count') + count)
+
+    if not updated and count > 0:
+        try:
+            with db_transaction.atomic():
+                MonthlyBalance.objects.create(total=amount, count=count, **lookup)
+        except IntegrityError:
+            # Outra escrita criou a linha em paralelo
+            rows.update(total=F('total') + amount, count=F('count') + count)
+    elif count < 0:
+        rows.filter(count__lte=0).delete()
+
+
+def apply_changes(previous, current):
+    """
+    Aplica a diferença entre o estado anterior e o atual de uma transação.
+    `previous` ou `current` podem ser None (criação e exclusão).
+    """
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+
+    if previous:
+        key = balance_key(previous['user_id'], previous['date'], previous['type'], previous['category_id'])
+        deltas[key][0] -= Decimal(str(previous['amount']))
+        deltas[key][1] -= 1
+    if current:
+        key = balance_key(current['user_id'], current['date'], current['type'], current['category_id'])
+        deltas[key][0] += Decimal(str(current['amount']))
+        deltas[key][1] += 1
+
+    for key, (amount, count) in deltas.items():
+        if amount or count:
+            apply_delta(key, amount, count)
+
+
+def apply_bulk(instances):
+    """Aplica de uma vez os deltas de várias transações recém-criadas"""
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+    for instance in instances:
+        key = balance_key(instance.user_id, instance.date, instance.type, instance.category_id)
+        deltas[key][0] += Decimal(str(instance.amount))
+        deltas[key][1] += 1
+
+    # Linhas inexistentes são criadas de uma vez; as demais recebem o delta
+    existing = set(
+        MonthlyBalance.objects
+        .filter(
+            user_id__in={key[0] for key in deltas},
+            month__in={key[1] for key in deltas}
+        )
+        .values_list(*BALANCE_KEY_FIELDS)
+    )
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        try:
+            with db_transaction.atomic():
+                MonthlyBalance.objects.bulk_create([
+                    MonthlyBalance(
+                        total=deltas[key][0],
+                        count=deltas[key][1],
+                        **dict(zip(BALANCE_KEY_FIELDS, key))
+                    )
+                    for key in missing
+                ])
+        except IntegrityError:
+            # Outra escrita criou alguma das linhas em paralelo: apply_delta
+            # trata cada chave individualmente
+            pass
+        else:
+            for key in missing:
+                del deltas[key]
+
+    for key, (amount, count) in deltas.items():
+        apply_delta(key, amount, count)
+
+
+def move_category_to_uncategorized(category):
+    """
+    Transfere os saldos de uma categoria removida para "sem categoria",
+    acompanhando o SET_NULL aplicado às transações.
+    """
+    for balance in MonthlyBalance.objects.filter(category=category):
+        apply_delta(
+            (balance.user_id, balance.month, balance.type, None),
+            balance.total,
+            balance.count
+        )
+
+
+def rebuild_balances(user_id):
+    """
+    Recalcula do zero os saldos mensais de um usuário a partir das transações.
+    Retorna a quantidade de linhas geradas.
+    """
+    rows = (
+        Transaction.objects
+        .filter(user_id=user_id)
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'type', 'category_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    balances = [
+        MonthlyBalance(
+            user_id=user_id,
+            month=row['month'],
+            type=row['type'],
+            category_id=row['category_id'],
+            total=row['total'],
+            count=row['count']
+        )
+        for row in rows
+    ]
+
+    with db_transaction.atomic():
+        MonthlyBalance.objects.filter(user_id=user_id).delete()
+        MonthlyBalance.objects.bulk_create(balances, batch_size=500)
+    invalidate(user_id, 'transactions')
+    return len(balances)
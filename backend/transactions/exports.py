@@ -0,0 +1,79 @@
+"""
+Exportação de transações em CSV ou NDJSON via streaming.
+As linhas são lidas com QuerySet.iterator(), então o consumo de memória
+não depende da quantidade de transações exportadas.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_LINES_PER_CHUNK = 500
+
+# (coluna exportada, campo do queryset)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('description', 'description'),
+    ('amount', 'amount'),
+    ('type', 'type'),
+    ('payment_method', 'payment_method'),
+    ('category', 'category__name'),
+    ('notes', 'notes'),
+    ('tags', 'tags'),
+    ('is_recurring', 'is_recurring'),
+    ('recurring_frequency', 'recurring_frequency'),
+    ('created_at', 'created_at'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """Pseudo-buffer que devolve o que recebe, para o csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Itera as linhas exportadas em blocos, sem carregar o queryset inteiro"""
+    fields = [field for _, field in EXPORT_COLUMNS]
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def _batched(lines, size=EXPORT_LINES_PER_CHUNK):
+    """Agrupa as linhas em blocos maiores, reduzindo o custo por chunk da resposta"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    yield from _batched(writer.writerow(row) for row in export_rows(queryset, chunk_size))
+
+
+def stream_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    yield from _batched(
+        encoder.encode(dict(zip(columns, row))) + '\n'
+        for row in export_rows(queryset, chunk_size)
+    )
+
+
+def stream_export(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Gerador do conteúdo exportado no formato pedido"""
+    if export_format == 'ndjson':
+        return stream_ndjson(queryset, chunk_size)
+    return stream_csv(queryset, chunk_size)
@@ -0,0 +1,127 @@
+"""
+Contagens e somas por faceta (tipo, categoria, método de pagamento) de um
+queryset de transações já filtrado, em uma única consulta agrupada:
+GROUPING SETS no PostgreSQL e UNION ALL sobre uma CTE nos demais bancos.
+O queryset é compilado como está, então os filtros, a busca e o `?tag=`
+da listagem valem igualmente para as facetas.
+
+As transações são lidas uma única vez, pelo índice de cobertura
+transaction_user_facets_idx, agrupadas pela combinação das facetas (poucas
+dezenas de linhas); os totais de cada faceta somam esses grupos, e o nome
+da categoria é buscado só para eles.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, F, Sum
+
+from categories.models import Category
+from .models import Transaction
+
+ZERO = Decimal('0.00')
+CENTS = Decimal('0.01')
+
+CATEGORY_NAME = 'facet_categories.name'
+
+# faceta: colunas agrupadas (valor, rótulo opcional)
+FACETS = {
+    'type': ('facet_type', None),
+    'category': ('facet_category', CATEGORY_NAME),
+    'payment_method': ('facet_payment_method', None),
+}
+COLUMNS = ['facet_type', 'facet_category', CATEGORY_NAME, 'facet_payment_method']
+
+
+def category_join():
+    """Junção dos grupos com as categorias, para o rótulo da faceta"""
+    return (
+        f'LEFT OUTER JOIN {Category._meta.db_table} facet_categories '
+        f'ON facet_categories.id = filtered.facet_category'
+    )
+
+
+def filtered_groups(queryset):
+    """SQL e parâmetros das transações filtradas agrupadas pelas facetas"""
+    groups = queryset.order_by().values(
+        facet_type=F('type'),
+        facet_category=F('category_id'),
+        facet_payment_method=F('payment_method'),
+    ).annotate(facet_count=Count('pk'), facet_amount=Sum('amount'))
+    return groups.query.sql_with_params()
+
+
+def grouping_sets_sql(inner):
+    """Agrupa cada faceta e o total sobre os grupos filtrados"""
+    label = 'CASE {} ELSE %s END'.format(' '.join(
+        f'WHEN GROUPING({column}) = 0 THEN %s' for column, _ in FACETS.values()
+    ))
+    sets = ', '.join(
+        '({})'.format(', '.join(filter(None, columns))) for columns in FACETS.values()
+    )
+    return (
+        f'SELECT {label}, {", ".join(COLUMNS)}, SUM(facet_count), SUM(facet_amount) '
+        f'FROM ({inner}) filtered {category_join()} GROUP BY GROUPING SETS ({sets}, ())',
+        [*FACETS, 'total']
+    )
+
+
+def union_all_sql(inner):
+    """Um SELECT agrupado por faceta sobre a mesma CTE, unidos com UNION ALL"""
+    selects = []
+    for facet, columns in [*FACETS.items(), ('total', ())]:
+        grouped = [column for column in columns if column]
+        values = ', '.join(column if column in grouped else 'NULL' for column in COLUMNS)
+        join = f' {category_join()}' if CATEGORY_NAME in grouped else ''
+        group_by = f' GROUP BY {", ".join(grouped)}' if grouped else ''
+        selects.append(
+            f'SELECT %s, {values}, SUM(facet_count), SUM(facet_amount) FROM filtered{join}{group_by}'
+        )
+    return (
+        f'WITH filtered AS ({inner}) ' + ' UNION ALL '.join(selects),
+        [*FACETS, 'total']
+    )
+
+
+def to_decimal(value):
+    return Decimal(str(value)).quantize(CENTS) if value is not None else ZERO
+
+
+def facet_counts(queryset):
+    """
+    Retorna {'count', 'total_amount', 'type': [...], 'category': [...],
+    'payment_method': [...]}, cada faceta com value/label/count/total_amount
+    em ordem decrescente de quantidade.
+    """
+    from django.db import connections
+
+    connection = connections[queryset.db]
+    inner, params = filtered_groups(queryset)
+    if connection.vendor == 'postgresql':
+        sql, labels = grouping_sets_sql(inner)
+        params = [*labels, *params]
+    else:
+        sql, labels = union_all_sql(inner)
+        # A CTE vem antes dos SELECTs que usam os rótulos
+        params = [*params, *labels]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    type_labels = dict(Transaction.TRANSACTION_TYPES)
+    payment_labels = dict(Transaction.PAYMENT_METHODS)
+    result = {'count': 0, 'total_amount': ZERO, **{facet: [] for facet in FACETS}}
+    for facet, type, category, category_name, payment_method, count, total in rows:
+        total = to_decimal(total)
+        if facet == 'total':
+            result['count'], result['total_amount'] = count or 0, total
+            continue
+        value, label = {
+            'type': (type, type_labels.get(type, type)),
+            'category': (category, category_name or 'Sem categoria'),
+            'payment_method': (payment_method, payment_labels.get(payment_method, payment_method)),
+        }[facet]
+        result[facet].append({'value': value, 'label': label, 'count': count, 'total_amount': total})
+
+    for facet in FACETS:
+        result[facet].sort(key=lambda bucket: (-bucket['count'], str(bucket['label'])))
+    return result
@@ -0,0 +1,62 @@
+import django_filters
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from .models import Transaction, TransactionTag
+from .search import apply_search
+from .tags import normalize_tag
+
+
+class TransactionFilter(django_filters.FilterSet):
+    """
+    Filtros da listagem de transações. `?tag=` compara a tag inteira
+    (sem diferenciar maiúsculas), pela tabela de tags normalizadas.
+    """
+    tag = django_filters.CharFilter(method='filter_tag')
+
+    class Meta:
+        model = Transaction
+        fields = ['type', 'category', 'payment_method', 'date']
+
+    def filter_tag(self, queryset, name, value):
+        tag = normalize_tag(value)
+        if not tag:
+            return queryset
+        # Subconsulta em vez de junção: os ids vêm do índice único
+        # (usuário, nome) da tag e do índice (tag, transação), e o SQLite
+        # não percorre as transações do usuário testando cada ligação
+        tagged = TransactionTag.objects.filter(
+            tag__user=self.request.user,
+            tag__name=tag
+        ).values('transaction_id')
+        return queryset.filter(pk__in=tagged)
+
+
+class TransactionSearchFilter(SearchFilter):
+    """
+    SearchFilter que usa o índice textual do banco (FTS5 no SQLite,
+    GIN no PostgreSQL) e anota `search_rank`. Sem índice disponível,
+    mantém o comportamento padrão (`icontains`).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        searched = apply_search(queryset, terms, request.user.pk)
+        if searched is None:
+            return super().filter_queryset(request, queryset, view)
+        return searched
+
+
+class RankedOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter que, em buscas sem `?ordering=` explícito, ordena pela
+    relevância e depois pela ordenação padrão da view.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        query = queryset.query
+        ranked = 'search_rank' in query.annotations or 'search_rank' in query.extra
+        if ranked and not request.query_params.get(self.ordering_param):
+            return ['-search_rank', *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,235 @@
+"""
+Importação em lote de transações (JSON, CSV e OFX).
+As linhas são validadas contra um mapa de categorias carregado uma única
+vez por requisição e inseridas com bulk_create, em lotes, dentro de uma
+transação do banco.
+"""
+import csv
+import io
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from categories.models import Category
+from .models import Transaction
+from .signals import transactions_bulk_created
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ROWS = 100_000
+
+TRANSACTION_TYPES = {choice for choice, _ in Transaction.TRANSACTION_TYPES}
+PAYMENT_METHODS = {choice for choice, _ in Transaction.PAYMENT_METHODS}
+RECURRING_FREQUENCIES = {
+    choice for choice, _ in Transaction._meta.get_field('recurring_frequency').choices
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+MIN_AMOUNT = Decimal('0.01')
+MAX_AMOUNT = Decimal('99999999.99')
+TRUE_VALUES = {'1', 'true', 'sim', 'yes', 'on'}
+
+
+class ImportFormatError(ValueError):
+    """Arquivo ou corpo da requisição em formato não reconhecido"""
+
+
+class CategoryMap:
+    """Categorias do usuário indexadas por id e por (nome, tipo)"""
+
+    def __init__(self, user):
+        self.by_id = {}
+        self.by_name = {}
+        for category in Category.objects.filter(user=user).only('id', 'name', 'type'):
+            self.by_id[category.id] = category
+            self.by_name[(category.name.strip().lower(), category.type)] = category
+
+    def resolve(self, value, transaction_type):
+        """Retorna (id da categoria, erro)"""
+        if value in (None, ''):
+            return None, None
+        if isinstance(value, int) or str(value).isdigit():
+            category = self.by_id.get(int(value))
+        else:
+            category = self.by_name.get((str(value).strip().lower(), transaction_type))
+        if category is None:
+            return None, 'Categoria não encontrada.'
+        if category.type != transaction_type:
+            return None, f"Categoria deve ser do tipo '{transaction_type}'"
+        return category.id, None
+
+
+def parse_amount(value):
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    value = str(value).strip()
+    if ',' in value and '.' not in value:
+        value = value.replace(',', '.')
+    return Decimal(value)
+
+
+def parse_date(value):
+    value = str(value).strip()
+    try:
+        # Caminho rápido para o formato ISO, o mais comum
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def build_transaction(user, row, categories):
+    """Valida uma linha; retorna (Transaction, None) ou (None, erros)"""
+    errors = {}
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': 'Linha deve ser um objeto.'}
+
+    description = str(row.get('description') or '').strip()
+    if not description:
+        errors['description'] = 'Este campo é obrigatório.'
+    elif len(description) > 200:
+        errors['description'] = 'Máximo de 200 caracteres.'
+
+    transaction_type = str(row.get('type') or '').strip()
+    amount = None
+    try:
+        amount = parse_amount(row.get('amount'))
+        if not transaction_type:
+            # Sem tipo explícito, o sinal do valor define receita/despesa
+            transaction_type = 'expense' if amount < 0 else 'income'
+        amount = abs(amount)
+        if not MIN_AMOUNT <= amount <= MAX_AMOUNT or amount != amount.quantize(MIN_AMOUNT):
+            errors['amount'] = 'Valor inválido.'
+    except (InvalidOperation, TypeError, ValueError):
+        errors['amount'] = 'Valor inválido.'
+
+    if transaction_type not in TRANSACTION_TYPES:
+        errors['type'] = f"Tipo deve ser um de: {', '.join(sorted(TRANSACTION_TYPES))}"
+
+    try:
+        day = parse_date(row.get('date'))
+    except ValueError:
+        day = None
+        errors['date'] = 'Data inválida. Use YYYY-MM-DD ou DD/MM/YYYY.'
+
+    payment_method = str(row.get('payment_method') or 'cash').strip()
+    if payment_method not in PAYMENT_METHODS:
+        errors['payment_method'] = 'Método de pagamento inválido.'
+
+    category_id = None
+    if 'type' not in errors:
+        category_id, category_error = categories.resolve(row.get('category'), transaction_type)
+        if category_error:
+            errors['category'] = category_error
+
+    recurring_frequency = str(row.get('recurring_frequency') or '').strip() or None
+    if recurring_frequency and recurring_frequency not in RECURRING_FREQUENCIES:
+        errors['recurring_frequency'] = 'Frequência inválida.'
+
+    tags = row.get('tags') or None
+    if isinstance(tags, list):
+        tags = ', '.join(str(tag).strip() for tag in tags if str(tag).strip()) or None
+    if tags and len(tags) > 200:
+        errors['tags'] = 'Máximo de 200 caracteres.'
+
+    if errors:
+        return None, errors
+
+    return Transaction(
+        user=user,
+        category_id=category_id,
+        description=description,
+        amount=amount.quantize(MIN_AMOUNT),
+        type=transaction_type,
+        payment_method=payment_method,
+        date=day,
+        notes=row.get('notes') or None,
+        tags=tags,
+        is_recurring=parse_bool(row.get('is_recurring', False)),
+        recurring_frequency=recurring_frequency,
+    ), None
+
+
+def read_csv(content):
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ImportFormatError('Arquivo CSV deve estar em UTF-8.')
+    sample = content[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    return list(csv.DictReader(io.StringIO(content), dialect=dialect))
+
+
+OFX_TRANSACTION = re.compile(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|\Z)', re.S | re.I)
+OFX_FIELD = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+
+def read_ofx(content):
+    """Lê os blocos <STMTTRN> de um extrato OFX (SGML ou XML)"""
+    if isinstance(content, bytes):
+        content = content.decode('latin-1')
+    rows = []
+    for block in OFX_TRANSACTION.findall(content):
+        fields = {name.upper(): value.strip() for name, value in OFX_FIELD.findall(block)}
+        posted = fields.get('DTPOSTED', '')[:8]
+        rows.append({
+            'description': fields.get('MEMO') or fields.get('NAME') or 'Transação OFX',
+            'amount': fields.get('TRNAMT'),
+            'date': f'{posted[:4]}-{posted[4:6]}-{posted[6:8]}' if len(posted) == 8 else posted,
+            'notes': fields.get('FITID'),
+        })
+    if not rows and '<OFX>' not in content.upper():
+        raise ImportFormatError('Arquivo OFX inválido.')
+    return rows
+
+
+def read_upload(upload, file_format=None):
+    """Converte um arquivo enviado em linhas de importação"""
+    name = (upload.name or '').lower()
+    file_format = file_format or ('ofx' if name.endswith('.ofx') else 'csv')
+    content = upload.read()
+    if file_format == 'ofx':
+        return read_ofx(content)
+    if file_format == 'csv':
+        return read_csv(content)
+    raise ImportFormatError('Formato inválido. Use csv ou ofx.')
+
+
+def import_transactions(user, rows, partial=False, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Valida e insere as linhas. Sem `partial`, qualquer erro cancela toda a
+    importação. Retorna (quantidade criada, lista de erros por linha).
+    """
+    categories = CategoryMap(user)
+    valid = []
+    errors = []
+    for index, row in enumerate(rows, start=1):
+        instance, row_errors = build_transaction(user, row, categories)
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            valid.append(instance)
+
+    if errors and not partial:
+        return 0, errors
+
+    with db_transaction.atomic():
+        for start in range(0, len(valid), batch_size):
+            Transaction.objects.bulk_create(valid[start:start + batch_size])
+        transactions_bulk_created.send(sender=Transaction, instances=valid)
+    return len(valid), errors
@@ -0,0 +1,57 @@
+import resource
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, seed_transactions, timer
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o endpoint de exportação (linhas/s e pico de memória) em um '
+        'banco de testes descartável'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Transações geradas (padrão: 1.000.000)')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv', dest='export_format')
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Mede o pico de memória Python com tracemalloc (mais lento)'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with benchmark_database():
+            user = create_benchmark_user()
+            with timer() as seeding:
+                seed_transactions(user, rows)
+            self.stdout.write(f'{rows} transações geradas em {seeding["seconds"]:.1f}s')
+
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if options['trace_memory']:
+                tracemalloc.start()
+            with timer() as export:
+                response = client.get(reverse('transaction-export'), {'export_format': options['export_format']})
+                size = lines = 0
+                for chunk in response.streaming_content:
+                    size += len(chunk)
+                    lines += chunk.count(b'\n')
+            rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+            if options['trace_memory']:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        seconds = export['seconds']
+        self.stdout.write(self.style.SUCCESS(
+            f'Exportação {options["export_format"]}: {lines} linhas, {size / 1024 / 1024:.1f} MiB '
+            f'em {seconds:.2f}s ({lines / seconds:,.0f} linhas/s), '
+            f'crescimento do RSS máximo {rss_growth / 1024:.1f} MiB'
+        ))
+        if options['trace_memory']:
+            self.stdout.write(f'Pico de memória Python: {peak / 1024 / 1024:.1f} MiB')
@@ -0,0 +1,59 @@
+import json
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, timer
+from transactions.imports import import_transactions
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão da importação em lote (linhas/s) em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50_000, help='Linhas por importação (padrão: 50.000)')
+
+    def build_rows(self, count):
+        rng = random.Random(42)
+        categories = [('Alimentação', 'expense'), ('Transporte', 'expense'), ('Salário', 'income')]
+        rows = []
+        for index in range(count):
+            name, type = rng.choice(categories)
+            rows.append({
+                'description': f'Linha de extrato {index}',
+                'amount': f'{rng.randint(100, 500000) / 100:.2f}',
+                'type': type,
+                'category': name,
+                'date': (date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500))).isoformat(),
+                'payment_method': 'pix',
+            })
+        return rows
+
+    def report(self, label, rows, seconds):
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}: {rows} linhas em {seconds:.2f}s ({rows / seconds:,.0f} linhas/s)'
+        ))
+
+    def handle(self, *args, **options):
+        rows = self.build_rows(options['rows'])
+        with benchmark_database():
+            user = create_benchmark_user()
+
+            with timer() as direct:
+                created, errors = import_transactions(user, rows)
+            assert created == len(rows) and not errors, errors[:5]
+            self.report('import_transactions()', created, direct['seconds'])
+
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            body = json.dumps(rows)
+            with timer() as api:
+                response = client.post(reverse('transaction-import'), body, content_type='application/json')
+            assert response.status_code == 201, response.content[:500]
+            self.report('POST /transactions/import/ (JSON)', response.json()['created'], api['seconds'])
+
+            self.stdout.write(f'Total no banco: {Transaction.objects.filter(user=user).count()} transações')
@@ -0,0 +1,72 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from categories.models import Category
+from finance_api.benchmarks import benchmark_database, timer
+from transactions.models import Transaction
+from transactions.recurrence import RECURRENCE_WORKERS, materialize_recurring
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Mede a geração de ocorrências recorrentes em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--templates', type=int, default=100_000, help='Transações recorrentes (padrão: 100.000)')
+        parser.add_argument('--users', type=int, default=1000, help='Usuários (padrão: 1.000)')
+        parser.add_argument('--workers', type=int, default=RECURRENCE_WORKERS)
+
+    def seed(self, templates, users, until):
+        rng = random.Random(42)
+        User.objects.bulk_create([
+            User(username=f'recorrente{index}', email=f'recorrente{index}@example.com')
+            for index in range(users)
+        ])
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        Category.objects.bulk_create([Category(user_id=user_id, name='Contas', type='expense') for user_id in user_ids])
+        categories = dict(Category.objects.values_list('user_id', 'pk'))
+
+        # Modelos recentes: em média pouco mais de uma ocorrência pendente cada
+        frequencies = [('monthly', 45), ('weekly', 10), ('yearly', 400)]
+        batch = []
+        for index in range(templates):
+            user_id = user_ids[index % users]
+            frequency, days_back = rng.choice(frequencies)
+            batch.append(Transaction(
+                user_id=user_id,
+                category_id=categories[user_id],
+                description=f'Assinatura {index}',
+                amount=Decimal(rng.randint(100, 50000)) / 100,
+                type='expense',
+                payment_method='credit_card',
+                date=until - timedelta(days=rng.randint(1, days_back)),
+                is_recurring=True,
+                recurring_frequency=frequency,
+            ))
+            if len(batch) == 5000:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+
+    def handle(self, *args, **options):
+        until = date.today()
+        with benchmark_database():
+            self.seed(options['templates'], options['users'], until)
+
+            with timer() as first:
+                created = materialize_recurring(until=until, workers=options['workers'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Primeira execução: {created} ocorrências de {options["templates"]} modelos '
+                f'em {first["seconds"]:.2f}s'
+            ))
+
+            with timer() as again:
+                repeated = materialize_recurring(until=until, workers=options['workers'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Reexecução: {repeated} ocorrências em {again["seconds"]:.2f}s'
+            ))
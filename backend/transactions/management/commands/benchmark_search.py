@@ -0,0 +1,68 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, seed_transactions, timer
+from transactions.models import Transaction
+from transactions.search import apply_search
+
+QUERIES = ['mercado', 'farmacia', 'mercado uber', '987654']
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = 'Compara a busca textual indexada com icontains em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Transações geradas (padrão: 1.000.000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Repetições por busca (padrão: 5)')
+
+    def icontains(self, queryset, term):
+        condition = Q()
+        for word in term.split():
+            condition &= (
+                Q(description__icontains=word) | Q(notes__icontains=word) | Q(tags__icontains=word)
+            )
+        return queryset.filter(condition).order_by('-date', '-created_at')
+
+    def indexed(self, queryset, term, user):
+        return apply_search(queryset, term.split(), user.pk).order_by('-search_rank', '-date', '-created_at')
+
+    def measure(self, build):
+        """Mediana (ms) de COUNT + primeira página, como na listagem"""
+        samples = []
+        for _ in range(self.repeat):
+            with timer() as elapsed:
+                queryset = build()
+                total = queryset.count()
+                list(queryset[:PAGE_SIZE])
+            samples.append(elapsed['seconds'] * 1000)
+        return statistics.median(samples), total
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.repeat = options['repeat']
+        with benchmark_database():
+            user = create_benchmark_user()
+            with timer() as seeding:
+                seed_transactions(user, rows)
+            self.stdout.write(f'{rows} transações geradas (com índice textual) em {seeding["seconds"]:.1f}s')
+
+            base = Transaction.objects.filter(user=user)
+            for term in QUERIES:
+                scan_ms, scan_total = self.measure(lambda: self.icontains(base, term))
+                index_ms, index_total = self.measure(lambda: self.indexed(base, term, user))
+                self.stdout.write(self.style.SUCCESS(
+                    f'{term!r}: icontains {scan_ms:.0f} ms ({scan_total} resultados) | '
+                    f'índice {index_ms:.0f} ms ({index_total} resultados)'
+                ))
+
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            with timer() as api:
+                response = client.get(reverse('transaction-list'), {'search': 'mercado uber'})
+            assert response.status_code == 200, response.content[:500]
+            self.stdout.write(f'GET /transactions/?search=mercado uber: {api["seconds"] * 1000:.0f} ms')
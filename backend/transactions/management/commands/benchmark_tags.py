@@ -0,0 +1,71 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance_api.benchmarks import benchmark_database, create_benchmark_user, seed_transactions, timer
+from transactions.models import Transaction, TransactionTag
+from transactions.tags import backfill
+
+TAGS = ['casa', 'viagem', 'reembolso']
+RARE_TAG = 'reembolso'
+RARE_ROWS = 50
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = 'Compara o filtro ?tag= (tags normalizadas) com tags__icontains em um banco de testes descartável'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help='Transações geradas (padrão: 200.000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Repetições por consulta (padrão: 5)')
+
+    def measure(self, build):
+        """Mediana (ms) de COUNT + primeira página, como na listagem"""
+        samples = []
+        for _ in range(self.repeat):
+            with timer() as elapsed:
+                queryset = build()
+                total = queryset.count()
+                list(queryset[:PAGE_SIZE])
+            samples.append(elapsed['seconds'] * 1000)
+        return statistics.median(samples), total
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.repeat = options['repeat']
+        with benchmark_database():
+            user = create_benchmark_user()
+            seed_transactions(user, rows)
+            rare_ids = list(Transaction.objects.filter(user=user).values_list('pk', flat=True)[:RARE_ROWS])
+            Transaction.objects.filter(pk__in=rare_ids).update(tags=RARE_TAG)
+            with timer() as migration:
+                links = backfill()
+            self.stdout.write(
+                f'{rows} transações, {links} ligações de tags geradas em {migration["seconds"]:.1f}s'
+            )
+
+            base = Transaction.objects.filter(user=user).order_by('-date', '-created_at')
+            for tag in TAGS:
+                scan_ms, scan_total = self.measure(lambda: base.filter(tags__icontains=tag))
+                index_ms, index_total = self.measure(lambda: base.filter(pk__in=(
+                    TransactionTag.objects
+                    .filter(tag__user=user, tag__name=tag)
+                    .values('transaction_id')
+                )))
+                self.stdout.write(self.style.SUCCESS(
+                    f'{tag!r}: icontains {scan_ms:.0f} ms ({scan_total} resultados) | '
+                    f'?tag= {index_ms:.0f} ms ({index_total} resultados)'
+                ))
+
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            for url, params in [
+                (reverse('transaction-list'), {'tag': RARE_TAG}),
+                (reverse('tags-report'), {}),
+            ]:
+                with timer() as api:
+                    response = client.get(url, params)
+                assert response.status_code == 200, response.content[:500]
+                self.stdout.write(f'GET {url} {params}: {api["seconds"] * 1000:.0f} ms')
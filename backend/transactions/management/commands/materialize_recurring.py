@@ -0,0 +1,51 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.recurrence import (
+    RECURRENCE_USER_BATCH_SIZE,
+    RECURRENCE_WORKERS,
+    materialize_recurring,
+)
+
+
+class Command(BaseCommand):
+    help = 'Gera as ocorrências vencidas das transações recorrentes (seguro para reexecutar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--until', help='Data limite (YYYY-MM-DD). Padrão: hoje')
+        parser.add_argument(
+            '--workers', type=int, default=RECURRENCE_WORKERS,
+            help=f'Threads processando lotes de usuários (padrão: {RECURRENCE_WORKERS})'
+        )
+        parser.add_argument(
+            '--user-batch-size', type=int, default=RECURRENCE_USER_BATCH_SIZE,
+            help=f'Usuários por lote (padrão: {RECURRENCE_USER_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Executa continuamente, aguardando N segundos entre as execuções'
+        )
+
+    def handle(self, *args, **options):
+        until = None
+        if options['until']:
+            try:
+                until = date.fromisoformat(options['until'])
+            except ValueError:
+                raise CommandError('Data inválida. Use YYYY-MM-DD.')
+
+        while True:
+            start = time.perf_counter()
+            created = materialize_recurring(
+                until=until,
+                workers=options['workers'],
+                user_batch_size=options['user_batch_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{created} ocorrências geradas em {time.perf_counter() - start:.2f}s'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from transactions.balances import rebuild_balances
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os saldos mensais materializados a partir das transações'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='ID do usuário a recalcular (pode ser repetido). Padrão: todos'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['users']:
+            users = users.filter(pk__in=options['users'])
+
+        total_users = 0
+        total_rows = 0
+        for user_id in users.iterator():
+            total_rows += rebuild_balances(user_id)
+            total_users += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_rows} saldos mensais recalculados para {total_users} usuário(s)'
+        ))
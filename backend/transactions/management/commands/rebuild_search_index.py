@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from transactions import search
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Recria o índice de busca textual das transações (FTS5 no SQLite, GIN no PostgreSQL)'
+
+    def handle(self, *args, **options):
+        backend = search.search_backend(connection)
+        if backend is None:
+            self.stdout.write(self.style.WARNING(
+                f'Banco {connection.vendor} sem índice textual: a busca usa icontains'
+            ))
+            return
+
+        with connection.schema_editor() as schema_editor:
+            search.install(schema_editor, Transaction)
+        self.stdout.write(self.style.SUCCESS(f'Índice de busca ({backend}) recriado'))
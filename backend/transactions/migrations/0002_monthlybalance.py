@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:06
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import TruncMonth
+
+
+def populate_balances(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyBalance = apps.get_model('transactions', 'MonthlyBalance')
+
+    rows = (
+        Transaction.objects
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'month', 'type', 'category_id')
+        .annotate(total=models.Sum('amount'), count=models.Count('id'))
+        .order_by()
+    )
+    MonthlyBalance.objects.bulk_create(
+        (MonthlyBalance(**row) for row in rows.iterator()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('categories', '0001_initial'),
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês')),
+                ('type', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=10, verbose_name='Tipo')),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Total')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_balances', to='categories.category', verbose_name='Categoria')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_balances', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Saldo Mensal',
+                'verbose_name_plural': 'Saldos Mensais',
+                'ordering': ['month', 'type'],
+                'indexes': [models.Index(fields=['user', 'month'], name='transaction_user_id_7828e8_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlybalance',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'month', 'type', 'category'), name='unique_monthly_balance'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlybalance',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'month', 'type'), name='unique_monthly_balance_uncategorized'),
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
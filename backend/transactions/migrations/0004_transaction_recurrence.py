@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_transaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Data da Ocorrência'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='transactions.transaction', verbose_name='Transação de Origem'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('is_recurring', True)), fields=['user'], name='transaction_recurring_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('recurrence_source', 'recurrence_date'), name='unique_recurrence_occurrence'),
+        ),
+    ]
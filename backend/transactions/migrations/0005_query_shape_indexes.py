@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_transaction_recurrence'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='monthlybalance',
+            name='transaction_user_id_7828e8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_8af7f1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_4685bf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_cb8cb9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='monthlybalance',
+            index=models.Index(fields=['user', 'month', 'type', 'total'], name='balance_user_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlybalance',
+            index=models.Index(fields=['user', 'type', 'category', 'total'], name='balance_user_type_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date', 'type', 'amount'], name='transaction_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'type', 'date', 'amount'], name='transaction_user_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'type', 'amount'], name='transaction_user_category_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+import sqlite3
+
+from django.db import migrations
+
+# Cópia do esquema de transactions/search.py na época desta migração
+FTS_TABLE = 'transactions_transaction_fts'
+CONTENT_TABLE = 'transactions_transaction'
+SEARCH_FIELDS = ('description', 'notes', 'tags')
+SEARCH_CONFIG = 'portuguese'
+GIN_INDEX_NAME = 'transaction_search_gin_idx'
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, notes, tags, user_id,
+        content='{CONTENT_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, tags, user_id)
+        VALUES (new.id, new.description, new.notes, new.tags, new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, tags, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.tags, old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON {CONTENT_TABLE}
+    WHEN old.description IS NOT new.description
+        OR old.notes IS NOT new.notes
+        OR old.tags IS NOT new.tags
+        OR old.user_id IS NOT new.user_id
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, tags, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.tags, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, tags, user_id)
+        VALUES (new.id, new.description, new.notes, new.tags, new.user_id);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def search_backend(connection):
+    if connection.vendor == 'sqlite':
+        with sqlite3.connect(':memory:') as conn:
+            options = {row[0] for row in conn.execute('PRAGMA compile_options')}
+        return 'fts5' if 'ENABLE_FTS5' in options else None
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    return None
+
+
+def create_search_index(apps, schema_editor):
+    """Índice textual do banco: FTS5 no SQLite, GIN no PostgreSQL"""
+    backend = search_backend(schema_editor.connection)
+    if backend == 'fts5':
+        for statement in SQLITE_SCHEMA:
+            schema_editor.execute(statement)
+    elif backend == 'postgres':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        Transaction = apps.get_model('transactions', 'Transaction')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX_NAME}')
+        schema_editor.add_index(
+            Transaction,
+            GinIndex(SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG), name=GIN_INDEX_NAME)
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    backend = search_backend(schema_editor.connection)
+    if backend == 'fts5':
+        for suffix in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif backend == 'postgres':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
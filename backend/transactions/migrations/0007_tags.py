@@ -0,0 +1,108 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def parse_tags(value):
+    """Tags normalizadas (minúsculas, sem espaços nas pontas) e sem repetição"""
+    names = []
+    for part in value.split(','):
+        name = part.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def link_existing_tags(apps, schema_editor):
+    """Gera as ligações a partir do texto das transações, em blocos por id"""
+    Transaction = apps.get_model('transactions', 'Transaction')
+    Tag = apps.get_model('transactions', 'Tag')
+    TransactionTag = apps.get_model('transactions', 'TransactionTag')
+
+    last_id = 0
+    while True:
+        rows = list(
+            Transaction.objects
+            .filter(pk__gt=last_id)
+            .exclude(tags__isnull=True)
+            .exclude(tags='')
+            .order_by('pk')
+            .values_list('pk', 'user_id', 'tags')[:BACKFILL_CHUNK_SIZE]
+        )
+        if not rows:
+            return
+        wanted = [
+            (transaction_id, user_id, name)
+            for transaction_id, user_id, value in rows
+            for name in parse_tags(value)
+        ]
+        pairs = {(user_id, name) for _, user_id, name in wanted}
+        Tag.objects.bulk_create(
+            [Tag(user_id=user_id, name=name) for user_id, name in pairs],
+            ignore_conflicts=True
+        )
+        ids = {
+            (user_id, name): pk
+            for pk, user_id, name in Tag.objects
+            .filter(user_id__in={user_id for user_id, _ in pairs}, name__in={name for _, name in pairs})
+            .values_list('pk', 'user_id', 'name')
+        }
+        TransactionTag.objects.bulk_create(
+            [
+                TransactionTag(transaction_id=transaction_id, tag_id=ids[(user_id, name)])
+                for transaction_id, user_id, name in wanted
+            ],
+            ignore_conflicts=True
+        )
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transactions', '0006_transaction_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Nome')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Tag',
+                'verbose_name_plural': 'Tags',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_links', to='transactions.tag', verbose_name='Tag')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='transactions.transaction', verbose_name='Transação')),
+            ],
+            options={
+                'verbose_name': 'Tag da Transação',
+                'verbose_name_plural': 'Tags das Transações',
+                'indexes': [models.Index(fields=['tag', 'transaction'], name='transaction_tag_tag_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transactiontag',
+            constraint=models.UniqueConstraint(fields=('transaction', 'tag'), name='unique_transaction_tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_user_tag'),
+        ),
+        migrations.RunPython(link_existing_tags, migrations.RunPython.noop),
+    ]
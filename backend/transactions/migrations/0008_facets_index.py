@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'type', 'category', 'payment_method', 'amount'], name='transaction_user_facets_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0008_facets_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='monthlybalance',
+            name='balance_user_month_idx',
+        ),
+        migrations.AddIndex(
+            model_name='monthlybalance',
+            index=models.Index(fields=['user', 'month', 'type', 'total', 'count'], name='balance_user_month_idx'),
+        ),
+    ]
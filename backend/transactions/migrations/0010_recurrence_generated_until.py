@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:50
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_generated_until(apps, schema_editor):
+    """Modelos que já geraram ocorrências partem da última data gerada"""
+    Transaction = apps.get_model('transactions', 'Transaction')
+    last_date = (
+        Transaction.objects
+        .filter(recurrence_source=OuterRef('pk'))
+        .order_by()
+        .values('recurrence_source')
+        .annotate(last=Max('recurrence_date'))
+        .values('last')
+    )
+    Transaction.objects.filter(is_recurring=True).update(recurrence_generated_until=Subquery(last_date))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0009_balance_month_index_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_generated_until',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Ocorrências Geradas Até'),
+        ),
+        migrations.RunPython(backfill_generated_until, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0010_recurrence_generated_until'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='monthlybalance',
+            name='balance_user_type_category_idx',
+        ),
+    ]
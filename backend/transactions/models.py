@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from decimal import Decimal
@@ -88,15 +88,68 @@ class Transaction(models.Model):
         ],
         verbose_name="Frequência de Recorrência"
     )
+    # Ocorrências geradas a partir de uma transação recorrente (modelo)
+    recurrence_source = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='occurrences',
+        verbose_name="Transação de Origem"
+    )
+    recurrence_date = models.DateField(blank=True, null=True, verbose_name="Data da Ocorrência")
+    # No modelo: data até a qual as ocorrências já foram geradas. Ocorrências
+    # excluídas pelo usuário não voltam a ser criadas
+    recurrence_generated_until = models.DateField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Ocorrências Geradas Até"
+    )
     
     class Meta:
         verbose_name = "Transação"
         verbose_name_plural = "Transações"
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['user', 'date']),
-            models.Index(fields=['user', 'type']),
-            models.Index(fields=['user', 'category']),
+            # Resumos por período: lidos só do índice, sem acessar a tabela
+            models.Index(
+                fields=['user', 'date', 'type', 'amount'],
+                name='transaction_user_date_idx'
+            ),
+            # Listagens e totais filtrados por tipo e período
+            models.Index(
+                fields=['user', 'type', 'date', 'amount'],
+                name='transaction_user_type_idx'
+            ),
+            # Agrupamentos e listagens por categoria
+            models.Index(
+                fields=['user', 'category', 'type', 'amount'],
+                name='transaction_user_category_idx'
+            ),
+            # Facetas da listagem: combinações de tipo, categoria e método
+            models.Index(
+                fields=['user', 'type', 'category', 'payment_method', 'amount'],
+                name='transaction_user_facets_idx'
+            ),
+            # Paginação por cursor: (date, created_at, id) por usuário
+            models.Index(
+                fields=['user', '-date', '-created_at', '-id'],
+                name='transaction_user_keyset_idx'
+            ),
+            # Modelos de recorrência, lidos pelo gerador de ocorrências
+            models.Index(
+                fields=['user'],
+                condition=models.Q(is_recurring=True),
+                name='transaction_recurring_idx'
+            ),
+        ]
+        constraints = [
+            # Uma única ocorrência por (modelo, data): a geração é idempotente
+            models.UniqueConstraint(
+                fields=['recurrence_source', 'recurrence_date'],
+                name='unique_recurrence_occurrence'
+            ),
         ]
     
     def __str__(self):
@@ -106,7 +159,13 @@ class Transaction(models.Model):
         # Validação: categoria deve ser do mesmo tipo da transação
         if self.category and self.category.type != self.type:
             raise ValueError("Tipo da categoria deve corresponder ao tipo da transação")
-        super().save(*args, **kwargs)
+        # Os saldos materializados são atualizados na mesma transação do banco
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            return super().delete(*args, **kwargs)
     
     @property
     def formatted_amount(self):
@@ -118,3 +177,122 @@ class Transaction(models.Model):
         if self.tags:
             return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
         return []
+
+
+class Tag(models.Model):
+    """
+    Tag normalizada (minúsculas, sem espaços nas pontas) de um usuário.
+    O campo `Transaction.tags` continua sendo o texto exibido; as ligações
+    em TransactionTag são mantidas a partir dele e servem aos filtros e
+    relatórios por tag.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='tags',
+        verbose_name="Usuário"
+    )
+    name = models.CharField(max_length=200, verbose_name="Nome")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+
+    class Meta:
+        verbose_name = "Tag"
+        verbose_name_plural = "Tags"
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_user_tag'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class TransactionTag(models.Model):
+    """Ligação entre uma transação e uma de suas tags"""
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.CASCADE,
+        related_name='tag_links',
+        verbose_name="Transação"
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='transaction_links',
+        verbose_name="Tag"
+    )
+
+    class Meta:
+        verbose_name = "Tag da Transação"
+        verbose_name_plural = "Tags das Transações"
+        constraints = [
+            models.UniqueConstraint(fields=['transaction', 'tag'], name='unique_transaction_tag'),
+        ]
+        indexes = [
+            # Filtro ?tag=: da tag para as transações, sem ler a tabela
+            models.Index(fields=['tag', 'transaction'], name='transaction_tag_tag_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_id} #{self.tag_id}"
+
+
+class MonthlyBalance(models.Model):
+    """
+    Saldo mensal materializado por usuário, tipo e categoria.
+    Mantido incrementalmente a cada escrita de transação, permite que os
+    relatórios leiam O(meses) linhas em vez de O(transações).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='monthly_balances',
+        verbose_name="Usuário"
+    )
+    month = models.DateField(verbose_name="Mês")
+    type = models.CharField(
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPES,
+        verbose_name="Tipo"
+    )
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='monthly_balances',
+        verbose_name="Categoria"
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Total"
+    )
+    count = models.IntegerField(default=0, verbose_name="Quantidade")
+    
+    class Meta:
+        verbose_name = "Saldo Mensal"
+        verbose_name_plural = "Saldos Mensais"
+        ordering = ['month', 'type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type', 'category'],
+                condition=models.Q(category__isnull=False),
+                name='unique_monthly_balance'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='unique_monthly_balance_uncategorized'
+            ),
+        ]
+        indexes = [
+            # Relatórios mensais e resumos: intervalo de meses agrupado por tipo
+            models.Index(
+                fields=['user', 'month', 'type', 'total', 'count'],
+                name='balance_user_month_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m} {self.type}: R$ {self.total}"
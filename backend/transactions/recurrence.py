@@ -0,0 +1,168 @@
+"""
+Geração das ocorrências de transações recorrentes.
+Cada transação com `is_recurring` é um modelo: a ocorrência 0 é o próprio
+modelo e as seguintes são criadas em lote (bulk_create) até a data limite,
+com `recurrence_source`/`recurrence_date` preenchidos. O modelo guarda em
+`recurrence_generated_until` até onde já gerou: reexecutar só cria as datas
+seguintes, e ocorrências excluídas não são recriadas. A restrição única
+sobre (recurrence_source, recurrence_date) protege contra execuções
+simultâneas.
+"""
+from calendar import monthrange
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Transaction
+from .signals import transactions_bulk_created
+
+# frequência: (unidade, passo)
+FREQUENCY_STEPS = {
+    'daily': ('days', 1),
+    'weekly': ('days', 7),
+    'monthly': ('months', 1),
+    'yearly': ('months', 12),
+}
+
+TEMPLATE_FIELDS = [
+    'id', 'user_id', 'category_id', 'description', 'amount', 'type',
+    'payment_method', 'notes', 'tags', 'date', 'recurring_frequency',
+    'recurrence_generated_until',
+]
+
+RECURRENCE_USER_BATCH_SIZE = 200
+RECURRENCE_INSERT_BATCH_SIZE = 1000
+RECURRENCE_WORKERS = 4
+
+
+def shift_months(day, months):
+    """Soma meses mantendo o dia, limitado ao último dia do mês"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, monthrange(year, month)[1]))
+
+
+def occurrence_date(anchor, frequency, n):
+    """Data da n-ésima ocorrência a partir da data do modelo"""
+    unit, step = FREQUENCY_STEPS[frequency]
+    if unit == 'days':
+        return anchor + timedelta(days=step * n)
+    return shift_months(anchor, step * n)
+
+
+def due_dates(anchor, frequency, after, until):
+    """Datas das ocorrências no intervalo (after, until]"""
+    unit, step = FREQUENCY_STEPS[frequency]
+    after = max(after, anchor)
+    # Parte de uma ocorrência anterior a `after`, sem percorrer o histórico
+    if unit == 'days':
+        n = (after - anchor).days // step
+    else:
+        n = ((after.year - anchor.year) * 12 + after.month - anchor.month) // step
+    n = max(n, 1)
+
+    dates = []
+    while True:
+        day = occurrence_date(anchor, frequency, n)
+        if day > until:
+            return dates
+        if day > after:
+            dates.append(day)
+        n += 1
+
+
+def build_occurrences(user_ids, until):
+    """Instancia (sem salvar) as ocorrências pendentes dos usuários"""
+    templates = list(
+        Transaction.objects
+        .filter(user_id__in=user_ids, is_recurring=True, recurring_frequency__in=FREQUENCY_STEPS)
+        .order_by()
+        .values(*TEMPLATE_FIELDS)
+    )
+    occurrences = []
+    for template in templates:
+        after = template['recurrence_generated_until'] or template['date']
+        for day in due_dates(template['date'], template['recurring_frequency'], after, until):
+            occurrences.append(Transaction(
+                user_id=template['user_id'],
+                category_id=template['category_id'],
+                description=template['description'],
+                amount=template['amount'],
+                type=template['type'],
+                payment_method=template['payment_method'],
+                notes=template['notes'],
+                tags=template['tags'],
+                date=day,
+                recurrence_source_id=template['id'],
+                recurrence_date=day,
+            ))
+    return occurrences
+
+
+def mark_generated(template_ids, until):
+    """Avança `recurrence_generated_until` dos modelos, sem nunca recuar"""
+    Transaction.objects.filter(pk__in=template_ids).filter(
+        Q(recurrence_generated_until__isnull=True) | Q(recurrence_generated_until__lt=until)
+    ).update(recurrence_generated_until=until)
+
+
+def expand_users(user_ids, until, batch_size=RECURRENCE_INSERT_BATCH_SIZE):
+    """Gera as ocorrências pendentes de um lote de usuários; retorna quantas"""
+    for attempt in range(2):
+        occurrences = build_occurrences(user_ids, until)
+        if not occurrences:
+            return 0
+        try:
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(occurrences, batch_size=batch_size)
+                mark_generated({occurrence.recurrence_source_id for occurrence in occurrences}, until)
+                transactions_bulk_created.send(sender=Transaction, instances=occurrences)
+            return len(occurrences)
+        except IntegrityError:
+            # Outra execução gerou parte das ocorrências: recalcula uma vez
+            if attempt:
+                raise
+    return 0
+
+
+def _expand_in_thread(user_ids, until, batch_size):
+    try:
+        return expand_users(user_ids, until, batch_size)
+    finally:
+        # Cada thread abre a própria conexão; fecha ao terminar o lote
+        connections.close_all()
+
+
+def user_batches(batch_size=RECURRENCE_USER_BATCH_SIZE):
+    """Ids dos usuários com transações recorrentes, em lotes"""
+    user_ids = list(
+        Transaction.objects
+        .filter(is_recurring=True)
+        .order_by('user_id')
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    return [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+
+def materialize_recurring(until=None, workers=RECURRENCE_WORKERS,
+                          user_batch_size=RECURRENCE_USER_BATCH_SIZE,
+                          batch_size=RECURRENCE_INSERT_BATCH_SIZE):
+    """
+    Gera todas as ocorrências vencidas até `until` (padrão: hoje, no fuso
+    configurado),
+    processando lotes de usuários em paralelo. Retorna quantas foram criadas.
+    """
+    until = until or timezone.localdate()
+    batches = user_batches(user_batch_size)
+    if workers <= 1 or len(batches) <= 1:
+        return sum(expand_users(user_ids, until, batch_size) for user_ids in batches)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(
+            lambda user_ids: _expand_in_thread(user_ids, until, batch_size),
+            batches
+        ))
@@ -0,0 +1,182 @@
+"""
+Motor de agregação para relatórios de transações.
+Calcula totais e contagens de receitas/despesas com agregação condicional,
+em uma única consulta ao banco.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Transaction, TransactionTag, MonthlyBalance
+
+ZERO = Decimal('0.00')
+
+
+def _decimal_sum(field, condition=None):
+    """Soma decimal que retorna zero quando não há linhas"""
+    return Coalesce(
+        Sum(field, filter=condition),
+        Value(ZERO),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def summary_aggregates(prefix=''):
+    """
+    Retorna as expressões de agregação do resumo financeiro.
+    `prefix` permite usar as mesmas expressões a partir de um modelo
+    relacionado (ex: 'transactions__' em Category ou User).
+    """
+    income = Q(**{f'{prefix}type': 'income'})
+    expense = Q(**{f'{prefix}type': 'expense'})
+    amount = f'{prefix}amount'
+    pk = f'{prefix}id'
+
+    return {
+        'total_income': _decimal_sum(amount, income),
+        'total_expenses': _decimal_sum(amount, expense),
+        'transaction_count': Count(pk),
+        'income_count': Count(pk, filter=income),
+        'expense_count': Count(pk, filter=expense),
+    }
+
+
+def summarize(queryset):
+    """Calcula totais, contagens e saldo de um queryset de transações"""
+    data = queryset.aggregate(**summary_aggregates())
+    data['balance'] = data['total_income'] - data['total_expenses']
+    return data
+
+
+def month_bounds(day):
+    """Retorna o primeiro e o último dia do mês da data informada"""
+    last_day = calendar.monthrange(day.year, day.month)[1]
+    return day.replace(day=1), day.replace(day=last_day)
+
+
+def add_months(day, months):
+    """Desloca a data em N meses, mantendo o primeiro dia do mês"""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def is_month_aligned(start, end):
+    """Indica se o período começa e termina em limites de mês"""
+    return start.day == 1 and end == month_bounds(end)[1]
+
+
+def balance_summary(user, start=None, end=None):
+    """
+    Resumo financeiro lido da tabela MonthlyBalance: O(meses) linhas em vez
+    de O(transações). Sem período, considera todo o histórico.
+    """
+    balances = MonthlyBalance.objects.filter(user=user)
+    if start and end:
+        balances = balances.filter(month__range=[month_bounds(start)[0], end])
+
+    income = Q(type='income')
+    expense = Q(type='expense')
+    data = balances.aggregate(
+        total_income=_decimal_sum('total', income),
+        total_expenses=_decimal_sum('total', expense),
+        income_count=Coalesce(Sum('count', filter=income), 0),
+        expense_count=Coalesce(Sum('count', filter=expense), 0),
+    )
+    data['transaction_count'] = data['income_count'] + data['expense_count']
+    data['balance'] = data['total_income'] - data['total_expenses']
+    return data
+
+
+def period_summary(user, start, end):
+    """Resumo do período, usando os saldos materializados quando possível"""
+    if is_month_aligned(start, end):
+        return balance_summary(user, start, end)
+    return summarize(Transaction.objects.filter(user=user, date__range=[start, end]))
+
+
+def tag_totals(user, transaction_type, start=None, end=None):
+    """
+    Totais e quantidades por tag em uma única consulta, partindo das tags
+    do usuário pelo índice (tag, transação).
+    """
+    links = TransactionTag.objects.filter(tag__user=user, transaction__type=transaction_type)
+    if start:
+        links = links.filter(transaction__date__gte=start)
+    if end:
+        links = links.filter(transaction__date__lte=end)
+    return list(
+        links
+        .values('tag__name')
+        .annotate(total=Sum('transaction__amount'), count=Count('transaction_id'))
+        .order_by('-total', 'tag__name')
+    )
+
+
+def monthly_totals(user, start, end):
+    """
+    Totais e quantidades por (mês, tipo) entre `start` e `end`, em uma
+    única consulta sobre os saldos mensais.
+    """
+    first_month, _ = month_bounds(start)
+    _, last_day = month_bounds(end)
+    rows = (
+        MonthlyBalance.objects
+        .filter(user=user, month__range=[first_month, last_day])
+        .values('month', 'type')
+        .annotate(total=Sum('total'), count=Sum('count'))
+        .order_by()
+    )
+    return {(row['month'], row['type']): (row['total'], row['count']) for row in rows}
+
+
+def summary_from_totals(totals, start, end):
+    """Resumo de um período alinhado a meses a partir de `monthly_totals`"""
+    first_month = month_bounds(start)[0]
+    data = {
+        'total_income': ZERO, 'total_expenses': ZERO,
+        'income_count': 0, 'expense_count': 0,
+    }
+    for (month, type), (total, count) in totals.items():
+        if not first_month <= month <= end:
+            continue
+        if type == 'income':
+            data['total_income'] += total
+            data['income_count'] += count
+        else:
+            data['total_expenses'] += total
+            data['expense_count'] += count
+    data['transaction_count'] = data['income_count'] + data['expense_count']
+    data['balance'] = data['total_income'] - data['total_expenses']
+    return data
+
+
+def monthly_rollup(user, start, end, totals=None):
+    """
+    Agrupa receitas e despesas por mês entre `start` e `end` em uma única
+    consulta sobre os saldos mensais. Meses sem transações são preenchidos
+    com zero para manter a série contínua. `totals` permite reaproveitar
+    um `monthly_totals` que já cubra o intervalo.
+    """
+    first_month, _ = month_bounds(start)
+    _, last_day = month_bounds(end)
+    if totals is None:
+        totals = monthly_totals(user, start, end)
+
+    monthly_data = []
+    current = first_month
+    while current <= last_day:
+        income = totals.get((current, 'income'), (ZERO, 0))[0] or ZERO
+        expenses = totals.get((current, 'expense'), (ZERO, 0))[0] or ZERO
+        monthly_data.append({
+            'month': current.strftime('%Y-%m'),
+            'month_name': current.strftime('%B %Y'),
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses
+        })
+        current = add_months(current, 1)
+
+    return monthly_data
@@ -0,0 +1,190 @@
+"""
+Busca textual nas transações (descrição, observações e tags).
+
+- SQLite: tabela virtual FTS5 com conteúdo externo (as colunas continuam
+  só em transactions_transaction), sincronizada por triggers, o que cobre
+  também bulk_create e update().
+- PostgreSQL: índice GIN sobre o SearchVector dos mesmos campos.
+- Demais bancos: `icontains` do SearchFilter do DRF.
+
+Os resultados recebem `search_rank` (maior = mais relevante). No FTS5, termos
+presentes em mais de RANK_LIMIT transações do usuário não são ranqueados:
+calcular o bm25 de centenas de milhares de linhas para ordenar a primeira
+página custava mais que a busca em si, e com um termo tão comum a relevância
+quase não distingue os resultados. Todos recebem rank 0 e seguem a ordenação
+padrão da listagem.
+
+O SQLite remove as triggers quando recria a tabela de transações (remake em
+migrações que alteram colunas); `restore_triggers`, chamado após o migrate,
+as recria e reconstrói o índice.
+"""
+import re
+import sqlite3
+from functools import lru_cache
+
+SEARCH_FIELDS = ('description', 'notes', 'tags')
+# Pesos por campo no ranking do FTS5 (a coluna user_id só filtra)
+FTS_WEIGHTS = (10.0, 2.0, 5.0, 0.0)
+FTS_TABLE = 'transactions_transaction_fts'
+CONTENT_TABLE = 'transactions_transaction'
+SEARCH_CONFIG = 'portuguese'
+GIN_INDEX_NAME = 'transaction_search_gin_idx'
+FTS_TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('insert', 'delete', 'update'))
+# Acima deste número de resultados a busca no FTS5 não é ranqueada
+RANK_LIMIT = 10_000
+WORD = re.compile(r'\w+')
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, notes, tags, user_id,
+        content='{CONTENT_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, tags, user_id)
+        VALUES (new.id, new.description, new.notes, new.tags, new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, tags, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.tags, old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON {CONTENT_TABLE}
+    WHEN old.description IS NOT new.description
+        OR old.notes IS NOT new.notes
+        OR old.tags IS NOT new.tags
+        OR old.user_id IS NOT new.user_id
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes, tags, user_id)
+        VALUES ('delete', old.id, old.description, old.notes, old.tags, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, description, notes, tags, user_id)
+        VALUES (new.id, new.description, new.notes, new.tags, new.user_id);
+    END
+    """,
+]
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    """Indica se o SQLite embutido no Python foi compilado com FTS5"""
+    with sqlite3.connect(':memory:') as conn:
+        options = {row[0] for row in conn.execute('PRAGMA compile_options')}
+    return 'ENABLE_FTS5' in options
+
+
+def search_backend(connection):
+    """'fts5', 'postgres' ou None (sem índice textual)"""
+    if connection.vendor == 'sqlite' and sqlite_has_fts5():
+        return 'fts5'
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    return None
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def install(schema_editor, model):
+    """Cria o índice textual adequado ao banco (idempotente)"""
+    backend = search_backend(schema_editor.connection)
+    if backend == 'fts5':
+        for statement in SQLITE_SCHEMA:
+            schema_editor.execute(statement)
+        rebuild(schema_editor.connection)
+    elif backend == 'postgres':
+        from django.contrib.postgres.indexes import GinIndex
+        schema_editor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX_NAME}')
+        schema_editor.add_index(model, GinIndex(search_vector(), name=GIN_INDEX_NAME))
+
+
+def rebuild(connection):
+    """Reconstrói o índice FTS5 a partir da tabela de transações"""
+    if search_backend(connection) == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def restore_triggers(connection):
+    """
+    Recria as triggers do FTS5 que faltarem e reconstrói o índice, que pode
+    ter perdido escritas feitas sem elas. Não faz nada se o índice não está
+    instalado. Retorna True se precisou recriar.
+    """
+    if search_backend(connection) != 'fts5':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *FTS_TRIGGERS]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing or existing.issuperset(FTS_TRIGGERS):
+            return False
+        for statement in SQLITE_SCHEMA:
+            cursor.execute(statement)
+    rebuild(connection)
+    return True
+
+
+def fts_match(terms, user_id):
+    """
+    Expressão MATCH do FTS5: todas as palavras, como prefixo, restritas ao
+    usuário. Retorna None se os termos não têm palavras.
+    """
+    words = [word for term in terms for word in WORD.findall(term)]
+    if not words:
+        return None
+    phrases = ' '.join(f'"{word}"*' for word in words)
+    return f'user_id:"{user_id}" AND ({phrases})'
+
+
+def apply_search(queryset, terms, user_id):
+    """
+    Filtra e anota `search_rank` usando o índice textual do banco.
+    Retorna None quando não há índice disponível para a busca.
+    """
+    from django.db import connections
+
+    backend = search_backend(connections[queryset.db])
+    if backend == 'fts5':
+        match = fts_match(terms, user_id)
+        if match is None:
+            return None
+        table = queryset.model._meta.db_table
+        # Junção com a tabela virtual. O "+" impede o FTS5 de receber a
+        # restrição de rowid: sem ele o SQLite percorre as transações do
+        # usuário e reavalia o MATCH linha a linha (segundos em vez de ms)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        # A contagem limitada é uma subconsulta sem correlação, avaliada uma
+        # vez; acima de RANK_LIMIT o CASE nem chega a calcular o bm25
+        rank = (
+            f'CASE WHEN (SELECT COUNT(*) FROM (SELECT 1 FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s LIMIT %s)) > %s THEN 0 '
+            f'ELSE -bm25({FTS_TABLE}, {weights}) END'
+        )
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'+{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': rank},
+            select_params=[match, RANK_LIMIT + 1, RANK_LIMIT],
+        )
+    if backend == 'postgres':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        query = SearchQuery(' '.join(terms), config=SEARCH_CONFIG, search_type='websearch')
+        vector = search_vector()
+        return (
+            queryset
+            .annotate(search_document=vector)
+            .filter(search_document=query)
+            .annotate(search_rank=SearchRank(vector, query))
+        )
+    return None
@@ -1,12 +1,12 @@
 from rest_framework import serializers
 from .models import Transaction
 from categories.models import Category
-from categories.serializers import CategorySerializer
+from categories.serializers import CategorySummarySerializer
 
 
 class TransactionSerializer(serializers.ModelSerializer):
     """Serializer para transações"""
-    category_details = CategorySerializer(source='category', read_only=True)
+    category_details = CategorySummarySerializer(source='category', read_only=True)
     formatted_amount = serializers.ReadOnlyField()
     tags_list = serializers.ReadOnlyField(source='get_tags_list')
     
@@ -16,9 +16,9 @@ class TransactionSerializer(serializers.ModelSerializer):
             'id', 'description', 'amount', 'formatted_amount', 'type',
             'payment_method', 'date', 'category', 'category_details',
             'notes', 'tags', 'tags_list', 'is_recurring', 'recurring_frequency',
-            'created_at', 'updated_at'
+            'recurrence_source', 'recurrence_date', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'recurrence_source', 'recurrence_date', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         # Associa automaticamente ao usuário logado
@@ -29,7 +29,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         """Valida se a categoria pertence ao usuário e é do tipo correto"""
         if value:
             user = self.context['request'].user
-            if value.user != user:
+            if value.user_id != user.id:
                 raise serializers.ValidationError("Categoria não encontrada.")
             
             # Valida tipo da categoria com tipo da transação
@@ -58,7 +58,7 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
     def validate_category(self, value):
         if value:
             user = self.context['request'].user
-            if value.user != user:
+            if value.user_id != user.id:
                 raise serializers.ValidationError("Categoria não encontrada.")
         return value
 
@@ -73,3 +73,30 @@ class TransactionSummarySerializer(serializers.Serializer):
     expense_count = serializers.IntegerField()
     period_start = serializers.DateField()
     period_end = serializers.DateField()
+
+
+class CategoryTransactionsSummarySerializer(serializers.Serializer):
+    """Serializer para totais de transações agrupados por categoria"""
+    category_id = serializers.IntegerField(allow_null=True)
+    category = serializers.CharField()
+    color = serializers.CharField(allow_null=True)
+    icon = serializers.CharField(allow_null=True)
+    total_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class FacetBucketSerializer(serializers.Serializer):
+    """Contagem e soma de um valor de faceta"""
+    value = serializers.ReadOnlyField()
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class TransactionFacetsSerializer(serializers.Serializer):
+    """Facetas das transações filtradas"""
+    count = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    type = FacetBucketSerializer(many=True)
+    category = FacetBucketSerializer(many=True)
+    payment_method = FacetBucketSerializer(many=True)
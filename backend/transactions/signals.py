@@ -0,0 +1,92 @@
+"""
+Sinais que mantêm os dados derivados das transações sincronizados.
+"""
+from django.db import connections
+from django.db.models import Model
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, post_migrate
+from django.dispatch import Signal, receiver
+
+from accounts import stats as user_stats
+from categories import stats as category_stats
+from categories.models import Category
+from finance_api.report_cache import invalidate
+from . import balances, search, tags
+from .models import Transaction
+
+# Enviado após inserções em lote (bulk_create), que não disparam post_save.
+# Argumentos: instances (lista de transações criadas).
+transactions_bulk_created = Signal()
+
+
+def _is_cascade(origin, model):
+    """Indica se a exclusão foi disparada a partir de outro modelo (CASCADE)"""
+    if origin is None:
+        return False
+    origin_model = type(origin) if isinstance(origin, Model) else origin.model
+    return origin_model is not model
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_values(sender, instance, raw, **kwargs):
+    """Guarda o estado persistido antes de uma edição"""
+    instance._balance_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._balance_previous = (
+        Transaction.objects
+        .filter(pk=instance.pk)
+        .values(*balances.BALANCE_FIELDS, 'tags')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def update_balances_on_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_balance_previous', None)
+    current = balances.transaction_values(instance)
+    balances.apply_changes(previous, current)
+    category_stats.apply_changes(previous, current)
+    user_stats.apply_transaction_changes(previous, current)
+    tags.sync_transaction(instance, previous['tags'] if previous else None)
+    instance._balance_previous = None
+    invalidate(instance.user_id, 'transactions')
+
+
+@receiver(transactions_bulk_created, sender=Transaction)
+def update_balances_on_bulk_create(sender, instances, **kwargs):
+    balances.apply_bulk(instances)
+    category_stats.apply_bulk(instances)
+    user_stats.apply_transaction_bulk(instances)
+    tags.sync_bulk(instances)
+    for user_id in {instance.user_id for instance in instances}:
+        invalidate(user_id, 'transactions')
+
+
+@receiver(post_delete, sender=Transaction)
+def update_balances_on_delete(sender, instance, origin=None, **kwargs):
+    # Na exclusão do usuário os saldos já são removidos em cascata
+    if _is_cascade(origin, Transaction):
+        return
+    previous = balances.transaction_values(instance)
+    balances.apply_changes(previous, None)
+    category_stats.apply_changes(previous, None)
+    user_stats.apply_transaction_changes(previous, None)
+    invalidate(instance.user_id, 'transactions')
+
+
+@receiver(pre_delete, sender=Category)
+def move_category_balances(sender, instance, origin=None, **kwargs):
+    # Transações da categoria passam a "sem categoria" (SET_NULL)
+    if _is_cascade(origin, Category):
+        return
+    balances.move_category_to_uncategorized(instance)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, app_config, using=None, **kwargs):
+    # Remakes de tabela do SQLite (AlterField etc.) descartam as triggers
+    # que mantêm o índice de busca sincronizado
+    if app_config.name == 'transactions':
+        search.restore_triggers(connections[using])
@@ -0,0 +1,139 @@
+"""
+Manutenção das tags normalizadas (Tag/TransactionTag).
+O texto em `Transaction.tags` (separado por vírgulas) continua sendo a
+fonte dos campos `tags`/`tags_list` da API; cada escrita de transação
+sincroniza a partir dele as ligações usadas no filtro `?tag=` e no
+relatório por tag. Escritas via queryset.update() não passam pelos
+sinais: use `backfill()` depois delas.
+"""
+from django.db import transaction as db_transaction
+
+from .models import Tag, Transaction, TransactionTag
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def normalize_tag(name):
+    """Forma canônica de uma tag: sem espaços nas pontas e em minúsculas"""
+    return name.strip().lower()
+
+
+def parse_tags(value):
+    """Tags normalizadas e sem repetição de um texto separado por vírgulas"""
+    names = []
+    for part in (value or '').split(','):
+        name = normalize_tag(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def tag_ids(pairs):
+    """
+    Ids das tags para os pares (usuário, nome), criando as que faltam.
+    Retorna {(usuário, nome): id}.
+    """
+    if not pairs:
+        return {}
+    user_ids = {user_id for user_id, _ in pairs}
+    names = {name for _, name in pairs}
+
+    def existing():
+        return {
+            (user_id, name): pk
+            for pk, user_id, name in Tag.objects
+            .filter(user_id__in=user_ids, name__in=names)
+            .values_list('pk', 'user_id', 'name')
+            if (user_id, name) in pairs
+        }
+
+    ids = existing()
+    missing = [pair for pair in pairs if pair not in ids]
+    if missing:
+        # ignore_conflicts: outra escrita pode ter criado a mesma tag
+        Tag.objects.bulk_create(
+            [Tag(user_id=user_id, name=name) for user_id, name in missing],
+            ignore_conflicts=True
+        )
+        ids = existing()
+    return ids
+
+
+def link_tags(rows):
+    """
+    Cria as ligações para as linhas (id da transação, usuário, texto das
+    tags). Retorna quantas ligações foram geradas.
+    """
+    wanted = [
+        (transaction_id, user_id, name)
+        for transaction_id, user_id, value in rows
+        for name in parse_tags(value)
+    ]
+    if not wanted:
+        return 0
+    ids = tag_ids({(user_id, name) for _, user_id, name in wanted})
+    TransactionTag.objects.bulk_create(
+        [
+            TransactionTag(transaction_id=transaction_id, tag_id=ids[(user_id, name)])
+            for transaction_id, user_id, name in wanted
+        ],
+        ignore_conflicts=True
+    )
+    return len(wanted)
+
+
+def sync_transaction(instance, previous_tags=None):
+    """
+    Atualiza as ligações de uma transação salva. `previous_tags` é o texto
+    antes da edição (None na criação); sem mudança, nada é consultado.
+    """
+    current = parse_tags(instance.tags)
+    previous = parse_tags(previous_tags)
+    if set(previous) == set(current):
+        return
+
+    with db_transaction.atomic():
+        if previous:
+            removed = set(previous) - set(current)
+            if removed:
+                TransactionTag.objects.filter(
+                    transaction_id=instance.pk,
+                    tag__name__in=removed
+                ).delete()
+        added = [name for name in current if name not in previous]
+        if added:
+            link_tags([(instance.pk, instance.user_id, ', '.join(added))])
+
+
+def sync_bulk(instances):
+    """Cria as ligações de transações inseridas com bulk_create"""
+    rows = [
+        (instance.pk, instance.user_id, instance.tags)
+        for instance in instances
+        if instance.pk is not None and instance.tags
+    ]
+    if rows:
+        link_tags(rows)
+
+
+def backfill(chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Gera as ligações a partir do texto de todas as transações, em blocos
+    por id (idempotente). Retorna quantas ligações foram geradas.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        rows = list(
+            Transaction.objects
+            .filter(pk__gt=last_id)
+            .exclude(tags__isnull=True)
+            .exclude(tags='')
+            .order_by('pk')
+            .values_list('pk', 'user_id', 'tags')[:chunk_size]
+        )
+        if not rows:
+            return total
+        with db_transaction.atomic():
+            total += link_tags(rows)
+        last_id = rows[-1][0]
@@ -1,3 +1,1051 @@
-from django.test import TestCase
+import csv
+import json
+import re
+import unittest
+from datetime import date
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from goals.models import Goal
+from .models import Tag, Transaction, TransactionTag, MonthlyBalance
+from .imports import import_transactions
+from .recurrence import due_dates, materialize_recurring
+from . import search
+from .search import search_backend
+from .tags import backfill
+
+User = get_user_model()
+
+
+class TransactionTestMixin:
+    """Dados base compartilhados pelos testes de transações"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='teste', email='teste@example.com', password='senha-teste-123',
+            first_name='Teste', last_name='Usuário'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.salary = Category.objects.create(user=self.user, name='Salário', type='income')
+        self.food = Category.objects.create(user=self.user, name='Alimentação', type='expense')
+
+    def create_transaction(self, amount, type='expense', day=None, category=None, **kwargs):
+        if category is None:
+            category = self.salary if type == 'income' else self.food
+        return Transaction.objects.create(
+            user=kwargs.pop('user', self.user),
+            category=category,
+            description=kwargs.pop('description', 'Transação'),
+            amount=Decimal(amount),
+            type=type,
+            date=day or date(2024, 3, 10),
+            **kwargs
+        )
+
+
+class QueryCountMixin:
+    """Verifica que o número de consultas não cresce com o volume de dados"""
+
+    def count_queries(self, method, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, params)
+        self.assertLess(response.status_code, 400)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, make_rows, sizes=(2, 20), method='get', **params):
+        counts = []
+        for size in sizes:
+            Transaction.objects.filter(user=self.user).delete()
+            make_rows(size)
+            counts.append(self.count_queries(method, url, **params))
+        self.assertEqual(len(set(counts)), 1, f'Consultas por tamanho {sizes}: {counts}')
+        return counts[0]
+
+
+class TransactionSummaryTests(TransactionTestMixin, TestCase):
+
+    def test_summary_totals(self):
+        self.create_transaction('1000.00', 'income')
+        self.create_transaction('250.50', 'expense')
+        self.create_transaction('49.50', 'expense')
+        self.create_transaction('999.00', 'expense', day=date(2024, 4, 1))
+
+        response = self.client.get(reverse('transaction-summary'), {
+            'start_date': '2024-03-01', 'end_date': '2024-03-31'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['total_income']), Decimal('1000.00'))
+        self.assertEqual(Decimal(response.data['total_expenses']), Decimal('300.00'))
+        self.assertEqual(Decimal(response.data['balance']), Decimal('700.00'))
+        self.assertEqual(response.data['transaction_count'], 3)
+        self.assertEqual(response.data['income_count'], 1)
+        self.assertEqual(response.data['expense_count'], 2)
+
+    def test_summary_empty_period(self):
+        response = self.client.get(reverse('transaction-summary'), {
+            'start_date': '2024-03-01', 'end_date': '2024-03-31'
+        })
+
+        self.assertEqual(Decimal(response.data['balance']), Decimal('0'))
+        self.assertEqual(response.data['transaction_count'], 0)
+
+    def test_summary_runs_a_single_query(self):
+        for _ in range(5):
+            self.create_transaction('10.00', 'income')
+            self.create_transaction('5.00', 'expense')
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('transaction-summary'), {
+                'start_date': '2024-03-01', 'end_date': '2024-03-31'
+            })
+
+    def test_user_total_balance(self):
+        self.create_transaction('100.00', 'income')
+        self.create_transaction('30.00', 'expense', day=date(2023, 1, 1))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user.get_total_balance(), Decimal('70.00'))
+
+
+class MonthlyReportTests(TransactionTestMixin, TestCase):
+
+    def test_monthly_rollup_fills_missing_months(self):
+        self.create_transaction('100.00', 'income', day=date(2024, 1, 5))
+        self.create_transaction('40.00', 'expense', day=date(2024, 1, 20))
+        self.create_transaction('25.00', 'expense', day=date(2024, 3, 31))
+
+        response = self.client.get(reverse('monthly-report'), {
+            'start': '2024-01', 'end': '2024-04'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [month['month'] for month in response.data],
+            ['2024-01', '2024-02', '2024-03', '2024-04']
+        )
+        self.assertEqual(response.data[0]['balance'], 60.0)
+        self.assertEqual(response.data[1]['income'], 0.0)
+        self.assertEqual(response.data[2]['expenses'], 25.0)
+
+    def test_default_window_is_twelve_months(self):
+        response = self.client.get(reverse('monthly-report'))
+
+        self.assertEqual(len(response.data), 12)
+
+    def test_query_count_does_not_grow_with_window(self):
+        self.create_transaction('100.00', 'income')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('monthly-report'), {'months': 60})
+        self.assertEqual(len(response.data), 60)
+
+    def test_invalid_window(self):
+        response = self.client.get(reverse('monthly-report'), {'months': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('monthly-report'), {
+            'start': '2024-05', 'end': '2024-01'
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class MonthlyBalanceTests(TransactionTestMixin, TestCase):
+
+    def balances(self):
+        return {
+            (b.month, b.type, b.category_id): (b.total, b.count)
+            for b in MonthlyBalance.objects.filter(user=self.user)
+        }
+
+    def expected_balances(self):
+        expected = {}
+        for t in Transaction.objects.filter(user=self.user):
+            key = (t.date.replace(day=1), t.type, t.category_id)
+            total, count = expected.get(key, (Decimal('0'), 0))
+            expected[key] = (total + t.amount, count + 1)
+        return expected
+
+    def test_balances_follow_create_update_delete(self):
+        transaction = self.create_transaction('100.00', 'expense')
+        self.create_transaction('50.00', 'expense', day=date(2024, 3, 20))
+        self.create_transaction('900.00', 'income')
+        self.assertEqual(self.balances(), self.expected_balances())
+
+        other = Category.objects.create(user=self.user, name='Lazer', type='expense')
+        transaction.amount = Decimal('80.00')
+        transaction.category = other
+        transaction.date = date(2024, 5, 2)
+        transaction.save()
+        self.assertEqual(self.balances(), self.expected_balances())
+
+        transaction.type = 'income'
+        transaction.category = self.salary
+        transaction.save()
+        self.assertEqual(self.balances(), self.expected_balances())
+
+        transaction.delete()
+        self.assertEqual(self.balances(), self.expected_balances())
+
+    def test_deleting_category_moves_balances_to_uncategorized(self):
+        self.create_transaction('100.00', 'expense')
+        self.food.delete()
+
+        self.assertEqual(self.balances(), {
+            (date(2024, 3, 1), 'expense', None): (Decimal('100.00'), 1)
+        })
+
+    def test_rebuild_balances_repairs_drift(self):
+        self.create_transaction('100.00', 'expense')
+        Transaction.objects.filter(user=self.user).update(amount=Decimal('75.00'))
+        self.assertNotEqual(self.balances(), self.expected_balances())
+
+        call_command('rebuild_balances', user=[self.user.pk], stdout=StringIO())
+
+        self.assertEqual(self.balances(), self.expected_balances())
+
+    def test_categories_report_reads_category_stats(self):
+        self.create_transaction('100.00', 'expense')
+        self.create_transaction('20.00', 'expense', day=date(2023, 7, 1))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('categories-report'))
+
+        self.assertEqual(response.data[0]['category'], 'Alimentação')
+        self.assertEqual(response.data[0]['total'], 120.0)
+
+
+class TransactionQueryCountTests(QueryCountMixin, TransactionTestMixin, TestCase):
+
+    def make_rows(self, size):
+        for index in range(size):
+            self.create_transaction(f'{index + 1}.00', 'expense' if index % 2 else 'income')
+
+    def test_list_query_count_is_constant(self):
+        queries = self.assertConstantQueries(reverse('transaction-list'), self.make_rows)
+        # COUNT da paginação + SELECT com JOIN da categoria
+        self.assertEqual(queries, 2)
+
+    def test_recent_query_count_is_constant(self):
+        self.assertConstantQueries(
+            reverse('transaction-recent'), self.make_rows, limit=20
+        )
+
+    def test_by_category_query_count_is_constant(self):
+        self.assertConstantQueries(reverse('transaction-by-category'), self.make_rows)
+
+    def test_retrieve_loads_category_with_join(self):
+        transaction = self.create_transaction('10.00')
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('transaction-detail', args=[transaction.pk]))
+
+
+class ByCategoryTests(TransactionTestMixin, TestCase):
+
+    def test_groups_totals_per_category(self):
+        self.create_transaction('0.10', 'expense')
+        self.create_transaction('0.20', 'expense')
+        self.create_transaction('1000.00', 'income')
+        Transaction.objects.create(
+            user=self.user, description='Sem categoria', amount=Decimal('5.00'),
+            type='expense', date=date(2024, 3, 1)
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('transaction-by-category'))
+
+        groups = {group['category']: group for group in response.data}
+        self.assertEqual(groups['Alimentação']['total_amount'], '0.30')
+        self.assertEqual(groups['Alimentação']['count'], 2)
+        self.assertEqual(groups['Salário']['category_id'], self.salary.pk)
+        self.assertIsNone(groups['Sem categoria']['category_id'])
+        self.assertNotIn('transactions', groups['Alimentação'])
+
+    def test_groups_respect_filters(self):
+        self.create_transaction('10.00', 'expense')
+        self.create_transaction('1000.00', 'income')
+
+        response = self.client.get(reverse('transaction-by-category'), {'type': 'income'})
+
+        self.assertEqual([group['category'] for group in response.data], ['Salário'])
+
+    def test_category_transactions_are_paginated(self):
+        for _ in range(25):
+            self.create_transaction('1.00', 'expense')
+        self.create_transaction('1000.00', 'income')
+
+        url = reverse('transaction-by-category-transactions', args=[self.food.pk])
+        response = self.client.get(url)
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_uncategorized_transactions(self):
+        Transaction.objects.create(
+            user=self.user, description='Sem categoria', amount=Decimal('5.00'),
+            type='expense', date=date(2024, 3, 1)
+        )
+        self.create_transaction('1.00', 'expense')
+
+        url = reverse('transaction-by-category-transactions', args=['none'])
+        response = self.client.get(url)
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertIsNone(response.data['results'][0]['category'])
+
+
+class CursorPaginationTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Várias transações na mesma data para exercitar o desempate
+        for index in range(45):
+            self.create_transaction(f'{index + 1}.00', day=date(2024, 3, 1 + index % 3))
+
+    def walk(self, params):
+        url, pages, ids = reverse('transaction-list'), 0, []
+        while url:
+            response = self.client.get(url, params)
+            params = None
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_cursor_walks_all_rows_in_order(self):
+        ids, pages = self.walk({'pagination': 'cursor'})
+
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-date', '-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(reverse('transaction-list'), {'pagination': 'cursor'})
+        self.assertIsNone(first.data['previous'])
+        self.assertNotIn('count', first.data)
+
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual(previous.data['results'], first.data['results'])
+        self.assertIsNone(previous.data['previous'])
+
+    def test_deep_page_costs_one_query(self):
+        first = self.client.get(reverse('transaction-list'), {'pagination': 'cursor', 'page_size': 5})
+        second = self.client.get(first.data['next'])
+
+        with self.assertNumQueries(1):
+            self.client.get(second.data['next'])
+
+    def test_page_number_stays_default(self):
+        response = self.client.get(reverse('transaction-list'))
+
+        self.assertEqual(response.data['count'], 45)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('transaction-list'), {'cursor': 'invalido'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionExportTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_transaction('10.50', 'expense', description='Mercado', tags='casa')
+        self.create_transaction('1000.00', 'income', description='Salário março')
+        self.create_transaction('5.00', 'expense', description='Padaria', day=date(2024, 2, 1))
+
+    def export(self, **params):
+        response = self.client.get(reverse('transaction-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export(self):
+        content = self.export()
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertEqual(rows[0][:4], ['id', 'date', 'description', 'amount'])
+        self.assertEqual(len(rows), 4)
+        self.assertIn(['Mercado', '10.50'], [row[2:4] for row in rows[1:]])
+
+    def test_ndjson_export_with_filters_and_search(self):
+        content = self.export(export_format='ndjson', type='expense', search='merc')
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['description'], 'Mercado')
+        self.assertEqual(rows[0]['category'], 'Alimentação')
+        self.assertEqual(rows[0]['amount'], '10.50')
+
+    def test_export_only_includes_own_transactions(self):
+        other = User.objects.create_user(
+            username='outro', email='outro@example.com', password='senha-teste-123',
+            first_name='Outro', last_name='Usuário'
+        )
+        Transaction.objects.create(
+            user=other, description='Alheia', amount=Decimal('1.00'),
+            type='expense', date=date(2024, 3, 1)
+        )
+
+        self.assertNotIn('Alheia', self.export())
+
+    def test_invalid_format(self):
+        response = self.client.get(reverse('transaction-export'), {'export_format': 'xml'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionImportTests(TransactionTestMixin, TestCase):
+
+    def post_import(self, data, **params):
+        url = reverse('transaction-import')
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(url, data, format='json')
+
+    def test_json_import(self):
+        response = self.post_import([
+            {'description': 'Mercado', 'amount': '10.50', 'type': 'expense',
+             'date': '2024-03-01', 'category': 'alimentação'},
+            {'description': 'Salário', 'amount': 1000, 'type': 'income',
+             'date': '05/03/2024', 'category': self.salary.pk, 'tags': ['trabalho', 'fixo']},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 2, 'errors': []})
+        salary = Transaction.objects.get(description='Salário')
+        self.assertEqual(salary.date, date(2024, 3, 5))
+        self.assertEqual(salary.tags, 'trabalho, fixo')
+        self.assertEqual(
+            MonthlyBalance.objects.get(user=self.user, type='expense').total, Decimal('10.50')
+        )
+
+    def test_errors_reject_whole_import(self):
+        response = self.post_import([
+            {'description': 'Ok', 'amount': '10.00', 'type': 'expense', 'date': '2024-03-01'},
+            {'description': '', 'amount': 'abc', 'type': 'expense', 'date': '2024-13-01'},
+            {'description': 'Tipo errado', 'amount': '5.00', 'type': 'expense',
+             'date': '2024-03-01', 'category': self.salary.pk},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(
+            set(response.data['errors'][0]['errors']), {'description', 'amount', 'date'}
+        )
+        self.assertIn('category', response.data['errors'][1]['errors'])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_partial_import_keeps_valid_rows(self):
+        response = self.post_import([
+            {'description': 'Ok', 'amount': '10.00', 'type': 'expense', 'date': '2024-03-01'},
+            {'description': 'Sem data', 'amount': '10.00', 'type': 'expense'},
+        ], partial='true')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(len(response.data['errors']), 1)
+
+    def test_other_users_category_is_rejected(self):
+        other = User.objects.create_user(
+            username='outro', email='outro@example.com', password='senha-teste-123',
+            first_name='Outro', last_name='Usuário'
+        )
+        foreign = Category.objects.create(user=other, name='Alheia', type='expense')
+
+        response = self.post_import([
+            {'description': 'X', 'amount': '1.00', 'type': 'expense',
+             'date': '2024-03-01', 'category': foreign.pk},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_csv_upload(self):
+        content = (
+            'description;amount;type;date;category\n'
+            'Mercado;10,50;expense;2024-03-01;Alimentação\n'
+            'Salário;1000.00;income;2024-03-05;Salário\n'
+        ).encode('utf-8')
+        upload = SimpleUploadedFile('extrato.csv', content, content_type='text/csv')
+
+        response = self.client.post(reverse('transaction-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Transaction.objects.get(description='Mercado').amount, Decimal('10.50'))
+
+    def test_ofx_upload(self):
+        content = b"""OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240301120000<TRNAMT>-42.90<FITID>1<MEMO>PADARIA
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240305<TRNAMT>1500.00<FITID>2<NAME>SALARIO
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"""
+        upload = SimpleUploadedFile('extrato.ofx', content)
+
+        response = self.client.post(reverse('transaction-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 201)
+        bakery = Transaction.objects.get(description='PADARIA')
+        self.assertEqual((bakery.type, bakery.amount), ('expense', Decimal('42.90')))
+        self.assertEqual(Transaction.objects.get(description='SALARIO').type, 'income')
+
+    def test_import_query_count_is_constant(self):
+        def rows(count):
+            return [
+                {'description': f'Linha {i}', 'amount': '1.00', 'type': 'expense', 'date': '2024-03-01'}
+                for i in range(count)
+            ]
+
+        # Cria a linha de saldo mensal antes de medir
+        self.post_import(rows(1))
+        with CaptureQueriesContext(connection) as small:
+            self.post_import(rows(5))
+        with CaptureQueriesContext(connection) as large:
+            self.post_import(rows(50))
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_invalid_body(self):
+        response = self.post_import({'foo': 'bar'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ReportCacheTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_transaction('100.00', 'income')
+        self.params = {'start_date': '2024-03-01', 'end_date': '2024-03-31'}
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get(reverse('transaction-summary'), self.params)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('transaction-summary'), self.params)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(reverse('transaction-summary'), self.params)
+
+        response = self.client.get(reverse('transaction-summary'), {
+            'start_date': '2024-04-01', 'end_date': '2024-04-30'
+        })
+
+        self.assertEqual(response.data['transaction_count'], 0)
+
+    def test_transaction_write_invalidates(self):
+        self.client.get(reverse('transaction-summary'), self.params)
+        self.create_transaction('50.00', 'income')
+
+        response = self.client.get(reverse('transaction-summary'), self.params)
+
+        self.assertEqual(Decimal(response.data['total_income']), Decimal('150.00'))
+
+    def test_category_write_invalidates_only_dependent_reports(self):
+        self.client.get(reverse('transaction-summary'), self.params)
+        self.client.get(reverse('categories-report'), {'type': 'income'})
+
+        self.salary.name = 'Salário CLT'
+        self.salary.save()
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('transaction-summary'), self.params)
+        response = self.client.get(reverse('categories-report'), {'type': 'income'})
+        self.assertEqual(response.data[0]['category'], 'Salário CLT')
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(reverse('transaction-summary'), self.params)['ETag']
+
+        response = self.client.get(
+            reverse('transaction-summary'), self.params, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.create_transaction('1.00', 'income')
+        response = self.client.get(
+            reverse('transaction-summary'), self.params, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_default_period_is_part_of_the_key(self):
+        march = timezone.make_aware(timezone.datetime(2024, 3, 31, 12))
+        april = timezone.make_aware(timezone.datetime(2024, 4, 1, 12))
+
+        with mock.patch('django.utils.timezone.now', return_value=march):
+            summary = self.client.get(reverse('transaction-summary')).data
+            monthly = self.client.get(reverse('monthly-report'), {'months': 1}).data
+        self.assertEqual(summary['transaction_count'], 1)
+        self.assertEqual(monthly[0]['income'], 100.0)
+
+        # virada do mês: mesmos parâmetros, outro período
+        with mock.patch('django.utils.timezone.now', return_value=april):
+            summary = self.client.get(reverse('transaction-summary')).data
+            monthly = self.client.get(reverse('monthly-report'), {'months': 1}).data
+        self.assertEqual((summary['period_start'], summary['transaction_count']), ('2024-04-01', 0))
+        self.assertEqual(monthly[0]['income'], 0.0)
+
+    def test_cache_is_per_user(self):
+        self.client.get(reverse('transaction-summary'), self.params)
+        other = User.objects.create_user(
+            username='outro', email='outro@example.com', password='senha-teste-123',
+            first_name='Outro', last_name='Usuário'
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.get(reverse('transaction-summary'), self.params)
+
+        self.assertEqual(response.data['transaction_count'], 0)
+
+
+class RecurrenceTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rent = self.create_transaction(
+            '1500.00', 'expense', day=date(2024, 1, 31),
+            description='Aluguel', is_recurring=True, recurring_frequency='monthly'
+        )
+
+    def occurrence_dates(self, template):
+        return list(
+            Transaction.objects.filter(recurrence_source=template)
+            .order_by('recurrence_date').values_list('recurrence_date', flat=True)
+        )
+
+    def test_due_dates_clamp_to_month_end(self):
+        self.assertEqual(
+            due_dates(date(2024, 1, 31), 'monthly', date(2024, 1, 31), date(2024, 4, 30)),
+            [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+        )
+        self.assertEqual(
+            due_dates(date(2024, 1, 1), 'weekly', date(2024, 1, 15), date(2024, 1, 29)),
+            [date(2024, 1, 22), date(2024, 1, 29)]
+        )
+        self.assertEqual(due_dates(date(2024, 2, 29), 'yearly', date(2024, 2, 29), date(2026, 1, 1)), [date(2025, 2, 28)])
+
+    def test_materializes_due_occurrences(self):
+        created = materialize_recurring(until=date(2024, 4, 15), workers=1)
+
+        self.assertEqual(created, 2)
+        self.assertEqual(self.occurrence_dates(self.rent), [date(2024, 2, 29), date(2024, 3, 31)])
+        occurrence = Transaction.objects.get(recurrence_date=date(2024, 3, 31))
+        self.assertEqual(occurrence.date, date(2024, 3, 31))
+        self.assertEqual(occurrence.amount, Decimal('1500.00'))
+        self.assertEqual(occurrence.category, self.food)
+        self.assertFalse(occurrence.is_recurring)
+        self.assertEqual(
+            MonthlyBalance.objects.get(user=self.user, month=date(2024, 3, 1)).total,
+            Decimal('1500.00')
+        )
+
+    def test_rerun_is_idempotent(self):
+        materialize_recurring(until=date(2024, 4, 15), workers=1)
+
+        self.assertEqual(materialize_recurring(until=date(2024, 4, 15), workers=1), 0)
+        self.assertEqual(materialize_recurring(until=date(2024, 5, 31), workers=1), 2)
+        self.assertEqual(
+            self.occurrence_dates(self.rent),
+            [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)]
+        )
+
+    def test_deleted_occurrence_is_not_recreated(self):
+        materialize_recurring(until=date(2024, 3, 31), workers=1)
+        Transaction.objects.get(recurrence_date=date(2024, 3, 31)).delete()
+
+        self.assertEqual(materialize_recurring(until=date(2024, 4, 30), workers=1), 1)
+        self.assertEqual(self.occurrence_dates(self.rent), [date(2024, 2, 29), date(2024, 4, 30)])
+        self.rent.refresh_from_db()
+        self.assertEqual(self.rent.recurrence_generated_until, date(2024, 4, 30))
+
+    def test_default_until_is_the_local_date(self):
+        # 02:00 UTC de 1º de março ainda é 29 de fevereiro em São Paulo
+        now = timezone.make_aware(timezone.datetime(2024, 3, 1, 2), timezone.utc)
+        with self.settings(TIME_ZONE='America/Sao_Paulo'), mock.patch('django.utils.timezone.now', return_value=now):
+            materialize_recurring(workers=1)
+        self.assertEqual(self.occurrence_dates(self.rent), [date(2024, 2, 29)])
+
+    def test_occurrence_is_unique_per_date(self):
+        materialize_recurring(until=date(2024, 2, 29), workers=1)
+
+        with self.assertRaises(IntegrityError):
+            self.create_transaction(
+                '1500.00', 'expense', day=date(2024, 2, 29),
+                recurrence_source=self.rent, recurrence_date=date(2024, 2, 29)
+            )
+
+    def test_command_accepts_until(self):
+        out = StringIO()
+        call_command('materialize_recurring', until='2024-03-31', workers=1, stdout=out)
+
+        self.assertIn('2 ocorrências geradas', out.getvalue())
+
+
+class RecurrenceWorkerTests(TransactionTestMixin, TransactionTestCase):
+    """Lotes de usuários processados em paralelo por threads"""
+
+    def test_thread_pool_processes_every_user_batch(self):
+        users = [self.user] + [
+            User.objects.create_user(username=f'outro{index}', email=f'outro{index}@example.com', password='x')
+            for index in range(3)
+        ]
+        for user in users:
+            category = Category.objects.create(user=user, name='Contas', type='expense')
+            self.create_transaction(
+                '10.00', 'expense', day=date(2024, 1, 1), category=category, user=user,
+                is_recurring=True, recurring_frequency='weekly'
+            )
+
+        created = materialize_recurring(until=date(2024, 1, 29), workers=2, user_batch_size=1)
+
+        self.assertEqual(created, 16)
+        self.assertEqual(materialize_recurring(until=date(2024, 1, 29), workers=2, user_batch_size=1), 0)
+        for user in users:
+            self.assertEqual(
+                MonthlyBalance.objects.get(user=user, month=date(2024, 1, 1)).count, 5
+            )
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'BEGIN IMMEDIATE é específico do SQLite')
+    def test_write_transactions_begin_immediate(self):
+        template = self.create_transaction(
+            '10.00', 'expense', day=date(2024, 1, 1), is_recurring=True, recurring_frequency='weekly'
+        )
+        writes = [
+            lambda: self.create_transaction('5.00', 'expense', day=date(2024, 1, 2)),
+            lambda: import_transactions(self.user, [
+                {'description': 'Importada', 'amount': '3.00', 'type': 'expense', 'date': '2024-01-03'}
+            ]),
+            lambda: materialize_recurring(until=date(2024, 1, 15), workers=1),
+            lambda: template.delete(),
+        ]
+        for write in writes:
+            with CaptureQueriesContext(connection) as queries:
+                write()
+            statements = [query['sql'] for query in queries]
+            self.assertIn('BEGIN IMMEDIATE', statements)
+            self.assertNotIn('BEGIN', statements)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Planos de execução verificados no SQLite')
+class QueryPlanTests(TransactionTestMixin, TestCase):
+    """Nenhuma consulta de listagem ou relatório pode varrer uma tabela inteira"""
+    APP_TABLES = re.compile(r'\bSCAN ((?:transactions|categories|goals)_\w+)\b(?! VIRTUAL TABLE)')
+
+    def setUp(self):
+        super().setUp()
+        for day in (date(2024, 1, 5), date(2024, 2, 10), date(2024, 3, 15)):
+            self.create_transaction('100.00', 'expense', day=day)
+            self.create_transaction('900.00', 'income', day=day)
+        self.create_transaction('50.00', 'expense', day=date(2024, 3, 20), tags='casa, mercado')
+        Goal.objects.create(
+            user=self.user, title='Reserva', category='emergency',
+            target_amount=Decimal('1000.00'), target_date=date(2030, 1, 1)
+        )
+
+    def query_plans(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, url)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query['sql'].startswith(('SELECT', 'WITH')):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plans.append((query['sql'], [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def test_list_and_report_queries_use_indexes(self):
+        endpoints = [
+            (reverse('transaction-list'), {}),
+            (reverse('transaction-list'), {'type': 'expense'}),
+            (reverse('transaction-list'), {'category': self.food.pk}),
+            (reverse('transaction-list'), {'date': '2024-03-15'}),
+            (reverse('transaction-list'), {'pagination': 'cursor'}),
+            (reverse('transaction-list'), {'search': 'transação'}),
+            (reverse('transaction-list'), {'tag': 'casa'}),
+            (reverse('transaction-facets'), {'type': 'expense'}),
+            (reverse('transaction-recent'), {}),
+            (reverse('transaction-by-category'), {}),
+            (reverse('transaction-by-category-transactions', args=[self.food.pk]), {}),
+            (reverse('transaction-summary'), {'start_date': '2024-01-10', 'end_date': '2024-03-10'}),
+            (reverse('transaction-summary'), {}),
+            (reverse('monthly-report'), {}),
+            (reverse('categories-report'), {}),
+            (reverse('tags-report'), {}),
+            (reverse('category-list'), {}),
+            (reverse('category-by-type'), {}),
+            (reverse('goal-list'), {}),
+            (reverse('goal-summary'), {}),
+        ]
+        for url, params in endpoints:
+            for sql, plan in self.query_plans(url, params):
+                scans = [line for line in plan if self.APP_TABLES.search(line)]
+                self.assertEqual(scans, [], f'{url} {params}: {sql}')
+
+    def test_reports_are_answered_from_covering_indexes(self):
+        cases = [
+            (reverse('transaction-summary'), {'start_date': '2024-01-10', 'end_date': '2024-03-10'},
+             'transaction_user_date_idx'),
+            (reverse('transaction-by-category'), {}, 'transaction_user_category_idx'),
+            (reverse('transaction-facets'), {}, 'transaction_user_facets_idx'),
+            (reverse('monthly-report'), {}, 'balance_user_month_idx'),
+        ]
+        for url, params, index in cases:
+            plan_lines = [line for _, plan in self.query_plans(url, params) for line in plan]
+            self.assertTrue(
+                any(f'COVERING INDEX {index}' in line for line in plan_lines),
+                f'{url}: {plan_lines}'
+            )
+
+
+@unittest.skipUnless(search_backend(connection) == 'fts5', 'Busca textual via FTS5 do SQLite')
+class TransactionSearchTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.market = self.create_transaction('80.00', description='Mercado do bairro', tags='casa')
+        self.note = self.create_transaction('15.00', description='Padaria', notes='perto do mercado')
+        self.salary = self.create_transaction('5000.00', 'income', description='Salário de março')
+
+    def search(self, term, **params):
+        response = self.client.get(reverse('transaction-list'), {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_ranks_description_matches_first(self):
+        self.assertEqual(self.search('mercado'), [self.market.pk, self.note.pk])
+
+    def test_prefix_and_accent_insensitive(self):
+        self.assertEqual(self.search('salario'), [self.salary.pk])
+        self.assertEqual(self.search('merc bairro'), [self.market.pk])
+        self.assertEqual(self.search('casa'), [self.market.pk])
+
+    def test_explicit_ordering_is_respected(self):
+        self.assertEqual(self.search('mercado', ordering='amount'), [self.note.pk, self.market.pk])
+
+    def test_only_own_transactions(self):
+        other = User.objects.create_user(username='outro', email='outro@example.com', password='x')
+        category = Category.objects.create(user=other, name='Alimentação', type='expense')
+        self.create_transaction('10.00', user=other, category=category, description='Mercado')
+
+        self.assertEqual(self.search('mercado'), [self.market.pk, self.note.pk])
+
+    def test_index_follows_updates_deletes_and_bulk_inserts(self):
+        self.market.description = 'Feira livre'
+        self.market.save()
+        self.note.delete()
+        import_transactions(self.user, [
+            {'description': 'Mercado atacadista', 'amount': '300.00', 'type': 'expense', 'date': '2024-03-01'}
+        ])
+        Transaction.objects.filter(pk=self.salary.pk).update(notes='bônus de mercado')
+
+        imported = Transaction.objects.get(description='Mercado atacadista')
+        self.assertEqual(self.search('mercado'), [imported.pk, self.salary.pk])
+        self.assertEqual(self.search('feira'), [self.market.pk])
+
+    def test_search_without_words_falls_back_to_icontains(self):
+        self.create_transaction('1.00', description='Taxa ???')
+
+        self.assertEqual(len(self.search('???')), 1)
+
+    def test_export_and_by_category_accept_search(self):
+        response = self.client.get(reverse('transaction-export'), {'search': 'mercado'})
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(len(rows), 3)
+
+        response = self.client.get(reverse('transaction-by-category'), {'search': 'mercado'})
+        self.assertEqual(response.data[0]['count'], 2)
+
+    def test_common_terms_follow_default_ordering(self):
+        with mock.patch('transactions.search.RANK_LIMIT', 1):
+            self.assertEqual(self.search('mercado'), [self.note.pk, self.market.pk])
+            self.assertEqual(self.search('salario'), [self.salary.pk])
+
+    def test_migrate_restores_dropped_triggers(self):
+        # Como após um remake da tabela de transações pelo SQLite
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {search.FTS_TABLE}_insert')
+        created = self.create_transaction('20.00', description='Mercado central')
+        self.assertNotIn(created.pk, self.search('central'))
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        self.assertEqual(self.search('central'), [created.pk])
+        self.assertFalse(search.restore_triggers(connection))
+
+
+class TransactionTagTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.home = self.create_transaction('80.00', tags='Casa, mercado', day=date(2024, 3, 5))
+        self.wedding = self.create_transaction('500.00', tags='casamento', day=date(2024, 3, 8))
+        self.trip = self.create_transaction('300.00', tags='viagem, casa', day=date(2024, 4, 2))
+
+    def tag_names(self, transaction):
+        return sorted(
+            TransactionTag.objects
+            .filter(transaction=transaction)
+            .values_list('tag__name', flat=True)
+        )
+
+    def filter_by_tag(self, tag):
+        response = self.client.get(reverse('transaction-list'), {'tag': tag})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['id'] for item in response.data['results'])
+
+    def test_tags_are_normalized_per_user(self):
+        self.assertEqual(self.tag_names(self.home), ['casa', 'mercado'])
+        self.assertEqual(
+            sorted(Tag.objects.filter(user=self.user).values_list('name', flat=True)),
+            ['casa', 'casamento', 'mercado', 'viagem']
+        )
+
+    def test_filter_matches_whole_tag_ignoring_case(self):
+        self.assertEqual(self.filter_by_tag('CASA'), sorted([self.home.pk, self.trip.pk]))
+        self.assertEqual(self.filter_by_tag('casam'), [])
+        self.assertEqual(self.filter_by_tag('casamento'), [self.wedding.pk])
+
+    def test_filter_only_sees_own_tags(self):
+        other = User.objects.create_user(username='outro', email='outro@example.com', password='x')
+        category = Category.objects.create(user=other, name='Alimentação', type='expense')
+        self.create_transaction('10.00', user=other, category=category, tags='casa')
+
+        self.assertEqual(self.filter_by_tag('casa'), sorted([self.home.pk, self.trip.pk]))
+
+    def test_links_follow_updates_and_bulk_inserts(self):
+        self.home.tags = 'mercado, feira'
+        self.home.save()
+        self.trip.tags = ''
+        self.trip.save()
+        import_transactions(self.user, [
+            {'description': 'Feira', 'amount': '20.00', 'type': 'expense',
+             'date': '2024-03-01', 'tags': ['Feira', 'casa']}
+        ])
+
+        imported = Transaction.objects.get(description='Feira')
+        self.assertEqual(self.tag_names(self.home), ['feira', 'mercado'])
+        self.assertEqual(self.tag_names(self.trip), [])
+        self.assertEqual(self.filter_by_tag('feira'), sorted([self.home.pk, imported.pk]))
+
+    def test_api_keeps_csv_fields(self):
+        response = self.client.get(reverse('transaction-detail', args=[self.home.pk]))
+
+        self.assertEqual(response.data['tags'], 'Casa, mercado')
+        self.assertEqual(response.data['tags_list'], ['Casa', 'mercado'])
+
+    def test_backfill_links_existing_transactions(self):
+        TransactionTag.objects.all().delete()
+        Tag.objects.all().delete()
+
+        self.assertEqual(backfill(chunk_size=2), 5)
+        self.assertEqual(backfill(chunk_size=2), 5)
+        self.assertEqual(TransactionTag.objects.count(), 5)
+        self.assertEqual(self.filter_by_tag('casa'), sorted([self.home.pk, self.trip.pk]))
+
+    def test_tags_report(self):
+        response = self.client.get(reverse('tags-report'))
+        self.assertEqual(response.data, [
+            {'tag': 'casamento', 'total': 500.0, 'count': 1},
+            {'tag': 'casa', 'total': 380.0, 'count': 2},
+            {'tag': 'viagem', 'total': 300.0, 'count': 1},
+            {'tag': 'mercado', 'total': 80.0, 'count': 1},
+        ])
+
+        response = self.client.get(reverse('tags-report'), {'start_date': '2024-04-01'})
+        self.assertEqual([row['tag'] for row in response.data], ['casa', 'viagem'])
+
+        response = self.client.get(reverse('tags-report'), {'end_date': '2024-13-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionFacetTests(TransactionTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_transaction('100.00', description='Mercado', payment_method='pix', tags='casa')
+        self.create_transaction('50.50', description='Padaria', payment_method='cash')
+        self.create_transaction('30.00', category=Category.objects.create(
+            user=self.user, name='Transporte', type='expense'
+        ), description='Uber', payment_method='pix')
+        self.create_transaction('20.00', description='Sem categoria', payment_method='pix')
+        Transaction.objects.filter(description='Sem categoria').update(category=None)
+        self.create_transaction('3000.00', 'income', description='Salário', payment_method='bank_transfer')
+
+    def facets(self, **params):
+        response = self.client.get(reverse('transaction-facets'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def buckets(self, data, facet):
+        return {bucket['value']: (bucket['count'], bucket['total_amount']) for bucket in data[facet]}
+
+    def test_counts_and_sums_per_facet(self):
+        data = self.facets()
+
+        self.assertEqual((data['count'], data['total_amount']), (5, '3200.50'))
+        self.assertEqual(self.buckets(data, 'type'), {
+            'expense': (4, '200.50'), 'income': (1, '3000.00'),
+        })
+        self.assertEqual(self.buckets(data, 'payment_method'), {
+            'pix': (3, '150.00'), 'cash': (1, '50.50'), 'bank_transfer': (1, '3000.00'),
+        })
+        categories = {bucket['label']: bucket['count'] for bucket in data['category']}
+        self.assertEqual(categories, {
+            'Alimentação': 2, 'Transporte': 1, 'Salário': 1, 'Sem categoria': 1,
+        })
+        self.assertEqual(data['payment_method'][0]['label'], 'PIX')
+
+    def test_facets_match_the_filtered_list(self):
+        for params in [
+            {'type': 'expense'},
+            {'payment_method': 'pix'},
+            {'category': self.food.pk},
+            {'tag': 'casa'},
+            {'search': 'mercado'},
+            {'date': '2024-01-01'},
+        ]:
+            listed = self.client.get(reverse('transaction-list'), params).data['count']
+            data = self.facets(**params)
+            self.assertEqual(data['count'], listed, params)
+            self.assertEqual(sum(bucket['count'] for bucket in data['type']), listed, params)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.facets(type='expense', search='mercado')
+
+    def test_only_own_transactions(self):
+        other = User.objects.create_user(username='outro', email='outro@example.com', password='x')
+        category = Category.objects.create(user=other, name='Alimentação', type='expense')
+        self.create_transaction('10.00', user=other, category=category)
+
+        self.assertEqual(self.facets()['count'], 5)
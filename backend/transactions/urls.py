@@ -7,7 +7,10 @@ router.register(r'transactions', views.TransactionViewSet, basename='transaction
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('export/', views.TransactionViewSet.as_view({'get': 'export'}), name='transaction-export'),
+    path('facets/', views.TransactionViewSet.as_view({'get': 'facets'}), name='transaction-facets'),
     path('summary/', views.TransactionSummaryView.as_view(), name='transaction-summary'),
     path('monthly-report/', views.MonthlyReportView.as_view(), name='monthly-report'),
     path('categories-report/', views.CategoriesReportView.as_view(), name='categories-report'),
+    path('tags-report/', views.TagsReportView.as_view(), name='tags-report'),
 ]
@@ -2,14 +2,31 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Q
+from django.db.models import Count, Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
+from django_filters.rest_framework import DjangoFilterBackend
+from finance_api.report_cache import cached_report
+from .filters import RankedOrderingFilter, TransactionFilter, TransactionSearchFilter
 from .models import Transaction
+from .exports import EXPORT_FORMATS, stream_export
+from .facets import facet_counts
+from .imports import IMPORT_MAX_ROWS, ImportFormatError, import_transactions, read_upload
+from .pagination import TransactionCursorPagination
+from .reports import (
+    period_summary,
+    tag_totals,
+    month_bounds,
+    add_months,
+    monthly_rollup
+)
 from .serializers import (
     TransactionSerializer, 
     TransactionCreateSerializer, 
-    TransactionSummarySerializer
+    TransactionSummarySerializer,
+    CategoryTransactionsSummarySerializer,
+    TransactionFacetsSerializer
 )
 
 
@@ -17,20 +34,63 @@ class TransactionViewSet(viewsets.ModelViewSet):
     """ViewSet para operações CRUD de transações"""
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filterset_fields = ['type', 'category', 'payment_method', 'date']
+    # Busca pelo índice textual do banco, ordenada por relevância
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter, RankedOrderingFilter]
+    filterset_class = TransactionFilter
     search_fields = ['description', 'notes', 'tags']
     ordering_fields = ['date', 'amount', 'created_at']
     ordering = ['-date', '-created_at']
     
+    # Relacionamentos carregados junto com as transações, por ação.
+    # update/partial_update incluem a categoria porque Transaction.save()
+    # valida o tipo da categoria.
+    select_related_by_action = {
+        'list': ['category'],
+        'retrieve': ['category'],
+        'recent': ['category'],
+        'by_category_transactions': ['category'],
+        'update': ['category'],
+        'partial_update': ['category'],
+    }
+    prefetch_related_by_action = {}
+    
     def get_queryset(self):
         # Usuários só veem suas próprias transações
-        return Transaction.objects.filter(user=self.request.user)
+        queryset = Transaction.objects.filter(user=self.request.user)
+        return self.optimize_queryset(queryset)
+    
+    def optimize_queryset(self, queryset):
+        """Aplica os joins e prefetches adequados à ação atual"""
+        select_related = self.select_related_by_action.get(self.action)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = self.prefetch_related_by_action.get(self.action)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create':
             return TransactionCreateSerializer
         return TransactionSerializer
     
+    @property
+    def paginator(self):
+        """
+        Paginação por número de página (padrão) ou por cursor, quando o
+        cliente envia `?pagination=cursor` ou um `?cursor=`.
+        """
+        if not hasattr(self, '_paginator') and self.wants_cursor_pagination():
+            self._paginator = TransactionCursorPagination()
+        return super().paginator
+    
+    def wants_cursor_pagination(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+    
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Retorna as transações mais recentes"""
@@ -41,168 +101,277 @@ class TransactionViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_category(self, request):
-        """Retorna transações agrupadas por categoria"""
-        queryset = self.get_queryset()
-        
-        # Agrupar por categoria
-        categories_data = {}
-        for transaction in queryset:
-            category_name = transaction.category.name if transaction.category else 'Sem categoria'
-            if category_name not in categories_data:
-                categories_data[category_name] = {
-                    'category': category_name,
-                    'transactions': [],
-                    'total_amount': 0,
-                    'count': 0
-                }
-            
-            categories_data[category_name]['transactions'].append(
-                TransactionSerializer(transaction).data
-            )
-            categories_data[category_name]['total_amount'] += float(transaction.amount)
-            categories_data[category_name]['count'] += 1
-        
-        return Response(list(categories_data.values()))
+        """
+        Retorna totais e contagens por categoria em uma única consulta.
+        As transações de cada categoria são listadas sob demanda, com
+        paginação, em `by_category/<id>/` (ou `by_category/none/`).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        groups = (
+            queryset
+            .values('category_id', 'category__name', 'category__color', 'category__icon')
+            .annotate(total_amount=Sum('amount'), count=Count('id'))
+            .order_by('-total_amount')
+        )
+        
+        categories_data = [{
+            'category_id': group['category_id'],
+            'category': group['category__name'] or 'Sem categoria',
+            'color': group['category__color'],
+            'icon': group['category__icon'],
+            'total_amount': group['total_amount'],
+            'count': group['count'],
+        } for group in groups]
+        
+        serializer = CategoryTransactionsSummarySerializer(categories_data, many=True)
+        return Response(serializer.data)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'by_category/(?P<category_id>\d+|none)',
+        url_name='by-category-transactions'
+    )
+    def by_category_transactions(self, request, category_id=None):
+        """Lista paginada das transações de uma categoria"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if category_id == 'none':
+            queryset = queryset.filter(category__isnull=True)
+        else:
+            queryset = queryset.filter(category_id=category_id)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_transactions(self, request):
+        """
+        Importa transações em lote: lista JSON (ou {"transactions": [...]})
+        ou arquivo CSV/OFX no campo `file`. Com `?partial=true`, importa as
+        linhas válidas mesmo quando há erros; caso contrário, nada é criado.
+        """
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                rows = read_upload(upload, request.data.get('file_format'))
+            else:
+                rows = request.data
+                if isinstance(rows, dict):
+                    rows = rows.get('transactions')
+                if not isinstance(rows, list):
+                    raise ImportFormatError(
+                        'Envie uma lista de transações ou um arquivo no campo "file".'
+                    )
+        except ImportFormatError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not rows:
+            return Response({'error': 'Nenhuma transação para importar.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > IMPORT_MAX_ROWS:
+            return Response({
+                'error': f'Máximo de {IMPORT_MAX_ROWS} transações por importação.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        partial = request.query_params.get('partial', '').lower() in ('1', 'true')
+        created, errors = import_transactions(request.user, rows, partial=partial)
+        
+        if errors and not created:
+            return Response({'created': 0, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': created, 'errors': errors}, status=status.HTTP_201_CREATED)
+    
+    def export(self, request):
+        """
+        Exporta as transações filtradas em CSV (padrão) ou NDJSON, via
+        streaming. Aceita os mesmos filtros e busca da listagem.
+        Exposta em /api/transactions/export/.
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'error': f"Formato inválido. Use: {', '.join(EXPORT_FORMATS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream_export(queryset, export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        filename = f"transacoes-{timezone.now():%Y%m%d}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    @cached_report('transactions', 'categories')
+    def facets(self, request):
+        """
+        Contagens e somas por tipo, categoria e método de pagamento das
+        transações filtradas, com os mesmos filtros e busca da listagem.
+        Exposta em /api/transactions/facets/.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = TransactionFacetsSerializer(facet_counts(queryset))
+        return Response(serializer.data)
 
 
 class TransactionSummaryView(APIView):
     """View para resumo financeiro"""
     permission_classes = [permissions.IsAuthenticated]
     
+    @cached_report('transactions')
     def get(self, request):
         """Retorna resumo financeiro do usuário"""
         user = request.user
+        start_date, end_date = self.get_period(request.query_params)
         
-        # Parâmetros de período
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        # Se não especificado, usar mês atual
-        if not start_date or not end_date:
-            now = timezone.now()
-            start_date = now.replace(day=1).date()
-            end_date = (start_date.replace(month=start_date.month + 1) - timedelta(days=1))
-        else:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        
-        # Filtrar transações do período
-        transactions = Transaction.objects.filter(
-            user=user,
-            date__range=[start_date, end_date]
-        )
-        
-        # Calcular totais
-        income_total = transactions.filter(type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        expense_total = transactions.filter(type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        # Contar transações
-        total_count = transactions.count()
-        income_count = transactions.filter(type='income').count()
-        expense_count = transactions.filter(type='expense').count()
+        # Totais e contagens do período em uma única consulta
+        totals = period_summary(user, start_date, end_date)
         
         summary_data = {
-            'total_income': income_total,
-            'total_expenses': expense_total,
-            'balance': income_total - expense_total,
-            'transaction_count': total_count,
-            'income_count': income_count,
-            'expense_count': expense_count,
+            **totals,
             'period_start': start_date,
             'period_end': end_date
         }
         
         serializer = TransactionSummarySerializer(summary_data)
         return Response(serializer.data)
+    
+    def get_period(self, params):
+        """Intervalo `start_date`/`end_date`; se não especificado, o mês atual"""
+        start_date = params.get('start_date')
+        end_date = params.get('end_date')
+        if not start_date or not end_date:
+            return month_bounds(timezone.now().date())
+        return (
+            datetime.strptime(start_date, '%Y-%m-%d').date(),
+            datetime.strptime(end_date, '%Y-%m-%d').date()
+        )
+    
+    def get_cache_period(self, request):
+        return self.get_period(request.query_params)
 
 
 class MonthlyReportView(APIView):
     """View para relatório mensal"""
     permission_classes = [permissions.IsAuthenticated]
     
+    max_months = 120
+    
+    @cached_report('transactions')
     def get(self, request):
-        """Retorna dados para gráfico mensal"""
-        user = request.user
+        """
+        Retorna dados para gráfico mensal.
+        Aceita `months=N` (padrão 12, terminando no mês atual) ou o
+        intervalo `start`/`end` (YYYY-MM ou YYYY-MM-DD).
+        """
+        try:
+            start_date, end_date = self.get_period(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Últimos 12 meses
-        end_date = timezone.now().date()
-        start_date = end_date.replace(month=1) if end_date.month == 12 else end_date.replace(year=end_date.year-1, month=end_date.month+1)
+        monthly_data = monthly_rollup(request.user, start_date, end_date)
+        for month in monthly_data:
+            month['income'] = float(month['income'])
+            month['expenses'] = float(month['expenses'])
+            month['balance'] = float(month['balance'])
         
-        monthly_data = []
-        current_date = start_date
+        return Response(monthly_data)
+    
+    def get_cache_period(self, request):
+        return self.get_period(request.query_params)
+    
+    def get_period(self, params):
+        """Resolve o intervalo de meses a partir dos parâmetros da requisição"""
+        start = params.get('start')
+        end = params.get('end')
         
-        while current_date <= end_date:
-            # Primeiro e último dia do mês
-            month_start = current_date.replace(day=1)
-            if current_date.month == 12:
-                month_end = current_date.replace(year=current_date.year+1, month=1, day=1) - timedelta(days=1)
-            else:
-                month_end = current_date.replace(month=current_date.month+1, day=1) - timedelta(days=1)
-            
-            # Transações do mês
-            month_transactions = Transaction.objects.filter(
-                user=user,
-                date__range=[month_start, month_end]
-            )
-            
-            income = month_transactions.filter(type='income').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            expenses = month_transactions.filter(type='expense').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            monthly_data.append({
-                'month': current_date.strftime('%Y-%m'),
-                'month_name': current_date.strftime('%B %Y'),
-                'income': float(income),
-                'expenses': float(expenses),
-                'balance': float(income - expenses)
-            })
-            
-            # Próximo mês
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year+1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month+1)
+        if start or end:
+            end_date = self.parse_month(end) if end else timezone.now().date()
+            start_date = self.parse_month(start) if start else add_months(end_date, -11)
+        else:
+            try:
+                months = int(params.get('months', 12))
+            except ValueError:
+                raise ValueError("Parâmetro 'months' deve ser um número inteiro")
+            if months < 1:
+                raise ValueError("Parâmetro 'months' deve ser maior que zero")
+            end_date = timezone.now().date()
+            start_date = add_months(end_date, -(min(months, self.max_months) - 1))
         
-        return Response(monthly_data)
+        if start_date > end_date:
+            raise ValueError("'start' deve ser anterior a 'end'")
+        if add_months(start_date, self.max_months) <= end_date:
+            raise ValueError(f"O período máximo é de {self.max_months} meses")
+        return start_date, end_date
+    
+    @staticmethod
+    def parse_month(value):
+        """Converte YYYY-MM ou YYYY-MM-DD em data"""
+        for fmt in ('%Y-%m-%d', '%Y-%m'):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Data inválida: '{value}'. Use YYYY-MM ou YYYY-MM-DD")
 
 
 class CategoriesReportView(APIView):
     """View para relatório por categorias"""
     permission_classes = [permissions.IsAuthenticated]
     
+    @cached_report('transactions', 'categories')
     def get(self, request):
-        """Retorna gastos por categoria"""
-        user = request.user
+        """Retorna gastos por categoria, lidos dos agregados das categorias"""
         transaction_type = request.query_params.get('type', 'expense')
         
-        # Agrupar por categoria
         from categories.models import Category
-        categories = Category.objects.filter(user=user, type=transaction_type)
-        
-        categories_data = []
-        for category in categories:
-            total = category.transactions.aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            
-            categories_data.append({
-                'category': category.name,
-                'color': category.color,
-                'icon': category.icon,
-                'total': float(total),
-                'percentage': 0  # Será calculado no frontend
-            })
-        
-        # Ordenar por valor
-        categories_data.sort(key=lambda x: x['total'], reverse=True)
+        categories = (
+            Category.objects
+            .filter(user=request.user, type=transaction_type)
+            .order_by('-total_amount', 'name')
+            .values('name', 'color', 'icon', 'total_amount')
+        )
+        
+        categories_data = [{
+            'category': category['name'],
+            'color': category['color'],
+            'icon': category['icon'],
+            'total': float(category['total_amount']),
+            'percentage': 0  # Será calculado no frontend
+        } for category in categories]
         
         return Response(categories_data)
+
+
+class TagsReportView(APIView):
+    """View para relatório por tags"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @cached_report('transactions')
+    def get(self, request):
+        """
+        Retorna total e quantidade por tag, do maior para o menor total.
+        Aceita `type` (padrão expense) e o intervalo `start_date`/`end_date`.
+        """
+        transaction_type = request.query_params.get('type', 'expense')
+        try:
+            start_date, end_date = [
+                datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                for value in (
+                    request.query_params.get('start_date'),
+                    request.query_params.get('end_date')
+                )
+            ]
+        except ValueError:
+            return Response({
+                'error': 'Datas inválidas. Use YYYY-MM-DD.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        tags_data = [
+            {'tag': row['tag__name'], 'total': float(row['total']), 'count': row['count']}
+            for row in tag_totals(request.user, transaction_type, start_date, end_date)
+        ]
+        return Response(tags_data)
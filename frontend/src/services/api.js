@@ -195,6 +195,13 @@ class ApiService {
     return this.request('/transactions/monthly-report/');
   }
 
+  async getDashboard(include = []) {
+    const params = new URLSearchParams();
+    if (include.length) params.append('include', include.join(','));
+    const queryString = params.toString();
+    return this.request(`/dashboard/${queryString ? `?${queryString}` : ''}`);
+  }
+
   async getCategoriesReport(type = 'expense') {
     return this.request(`/transactions/categories-report/?type=${type}`);
   }